@@ -1,11 +1,18 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from models import User, Project, Assessment, QuestionBank, Question, UserAlgorithm
 from routes import user_router, project_router, assessment_router, question_bank_router, question_router, question_generation_router, user_algorithm_router
 from config import Config
+from utils.execution_helper import create_execution_backend
+from utils.worker_pool import WorkerPool
+from utils.import_report_helper import build_import_report, format_import_report, measure_import_times
+from utils.registry_helper import RegistryWatcher, build_class_registry
+from utils.warmup_helper import warm_up
 # Load configuration
 config = Config()
 
@@ -15,11 +22,47 @@ app = FastAPI()
 client = AsyncIOMotorClient(config.MONGO_URI)
 db = client[config.MONGO_DBNAME]
 
+async def report_import_times(app: FastAPI) -> None:
+    """Measure the cold import time of the app and log the per-package breakdown."""
+    try:
+        app.state.import_report = build_import_report(await asyncio.to_thread(measure_import_times))
+        print(format_import_report(app.state.import_report))
+    except Exception as e:
+        print(f"Error measuring import times: {e}")
+
+async def warm_up_app(app: FastAPI) -> None:
+    """Warm up the registry, caches and renderers, then mark the app as ready if every step succeeded."""
+    try:
+        app.state.warmup_report = await asyncio.to_thread(warm_up, app.state.class_registry)
+    except Exception as e:
+        print(f"Error warming up: {e}")
+        app.state.warmup_report = {'warmup': {'ok': False, 'error': str(e)}}
+    app.state.ready = all(step['ok'] for step in app.state.warmup_report.values())
+
 # Define lifespan context manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_beanie(database=db, document_models=[User, Project, Assessment, QuestionBank, Question, UserAlgorithm])
+    app.state.class_registry = build_class_registry()
+    app.state.worker_pool = WorkerPool(config.WORKER_POOL, config.WORKER_POOL_SIZE)
+    app.state.execution_backend = create_execution_backend(config.EXECUTION_BACKEND, app.state.worker_pool)
+    app.state.ready = not config.WARMUP
+    app.state.warmup_report = None
+    warmup_task = asyncio.create_task(warm_up_app(app)) if config.WARMUP else None
+    app.state.import_report = None
+    report_task = asyncio.create_task(report_import_times(app)) if config.IMPORT_REPORT else None
+    watcher = None
+    if config.REGISTRY_WATCH:
+        watcher = RegistryWatcher(app.state, config.REGISTRY_WATCH_INTERVAL)
+        watcher.start()
     yield
+    if watcher:
+        await watcher.stop()
+    for task in (warmup_task, report_task):
+        if task:
+            task.cancel()
+    app.state.execution_backend.close()
+    app.state.worker_pool.close()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -29,6 +72,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Catalog-Fingerprint"],
 )
 
 # Include routers
@@ -44,6 +88,20 @@ app.include_router(user_algorithm_router, prefix="/users_algorithms")
 async def index():
     return {"message": "Edcraft API"}
 
+@app.get("/ready")
+async def ready():
+    if not getattr(app.state, 'ready', False):
+        return JSONResponse(status_code=503, content={"ready": False, "warmup": getattr(app.state, "warmup_report", None)})
+    return {"ready": True, "warmup": app.state.warmup_report}
+
+if config.IMPORT_REPORT:
+    # Measured once, at startup; only mounted when IMPORT_REPORT is set.
+    @app.get("/debug/imports")
+    async def import_report():
+        if app.state.import_report is None:
+            return JSONResponse(status_code=503, content={"detail": "Import report is not available"})
+        return app.state.import_report
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=5000, log_level="info")
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -6,3 +7,36 @@ load_dotenv()
 class Config:
     MONGO_URI = os.getenv('MONGO_URI')
     MONGO_DBNAME = os.getenv('MONGO_DBNAME')
+    REGISTRY_WATCH = os.getenv('REGISTRY_WATCH', 'false').lower() == 'true'
+    REGISTRY_WATCH_INTERVAL = float(os.getenv('REGISTRY_WATCH_INTERVAL', '1.0'))
+    CATALOG_MAX_AGE = int(os.getenv('CATALOG_MAX_AGE', '86400'))
+    # Imports every class module and starts the graph and table renderers; /ready
+    # answers 503 until it is done, and for good if one of its steps fails.
+    WARMUP = os.getenv('WARMUP', 'false').lower() == 'true'
+    USER_CODE_CACHE_SIZE = int(os.getenv('USER_CODE_CACHE_SIZE', '256'))
+    EXECUTION_BACKEND = os.getenv('EXECUTION_BACKEND', 'inprocess')
+    SANDBOX_MODE = os.getenv('SANDBOX_MODE', 'local')
+    SANDBOX_IMAGE = os.getenv('SANDBOX_IMAGE', 'sandbox_image')
+    SANDBOX_POOL_SIZE = int(os.getenv('SANDBOX_POOL_SIZE', '2'))
+    SANDBOX_MAX_JOBS = int(os.getenv('SANDBOX_MAX_JOBS', '100'))
+    SANDBOX_ACQUIRE_TIMEOUT = float(os.getenv('SANDBOX_ACQUIRE_TIMEOUT', '30'))
+    BUDGET_CPU_SECONDS = float(os.getenv('BUDGET_CPU_SECONDS', '10'))
+    BUDGET_WALL_SECONDS = float(os.getenv('BUDGET_WALL_SECONDS', '30'))
+    # Enforced in worker processes and sandboxes only: the inprocess backend runs
+    # generation in threads of the API, which cannot limit the memory of one thread.
+    BUDGET_MEMORY_MB = int(os.getenv('BUDGET_MEMORY_MB', '512'))
+    BUDGET_INSTRUCTIONS = int(os.getenv('BUDGET_INSTRUCTIONS', '0'))
+    # The subinterpreter backend needs Python 3.14 (concurrent.futures.InterpreterPoolExecutor)
+    # and generation modules that load in subinterpreters; otherwise sandbox workers are used.
+    SUBINTERPRETER_POOL_SIZE = int(os.getenv('SUBINTERPRETER_POOL_SIZE', str(os.cpu_count() or 2)))
+    WORKER_POOL = os.getenv('WORKER_POOL', 'thread')
+    WORKER_POOL_SIZE = int(os.getenv('WORKER_POOL_SIZE', str(os.cpu_count() or 2)))
+    # Only used by the sandbox and subinterpreter backends and a process worker pool; see ExecutionBackend.
+    PARALLEL_SUBQUESTIONS = os.getenv('PARALLEL_SUBQUESTIONS', 'false').lower() == 'true'
+    BATCH_MAX_VARIANTS = int(os.getenv('BATCH_MAX_VARIANTS', '1000'))
+    BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', str(os.cpu_count() or 2)))
+    DISCONNECT_POLL_INTERVAL = float(os.getenv('DISCONNECT_POLL_INTERVAL', '0.25'))
+    SHARED_ARRAYS = os.getenv('SHARED_ARRAYS', 'false').lower() == 'true'
+    SHARED_ARRAY_DIR = os.getenv('SHARED_ARRAY_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+    SHARED_ARRAY_MIN_ITEMS = int(os.getenv('SHARED_ARRAY_MIN_ITEMS', '4096'))
+    IMPORT_REPORT = os.getenv('IMPORT_REPORT', 'false').lower() == 'true'
@@ -1,3 +1,4 @@
+from .execution_budget import ExecutionBudget
 from .user import User, UserCreate
 from .project import Project, ProjectCreate, ProjectTitleUpdate
 from .assessment import Assessment, AssessmentCreate, AddQuestionToAssessment, AssessmentTitleUpdate
@@ -0,0 +1,10 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ExecutionBudget(BaseModel):
+    cpu_seconds: Optional[float] = Field(None, ge=0, description="CPU time a generation may use")
+    wall_seconds: Optional[float] = Field(None, ge=0, description="Wall-clock time a generation may take")
+    memory_mb: Optional[int] = Field(None, ge=0, description="Address space a generation may add to its worker")
+    instructions: Optional[int] = Field(None, ge=0, description="Bytecode instructions user code may execute")
@@ -1,6 +1,11 @@
 from pydantic import BaseModel, Field
 from typing import Any, Dict, List, Literal, Optional
 
+class StepTrace(BaseModel):
+    variables: List[str] = Field(..., description="Local variables of algo recorded at each step")
+    lines: Optional[List[int]] = Field(None, description="Source lines of algo at which a step is recorded, before they run")
+    loops: bool = Field(True, description="Whether a step is recorded at every loop back-edge of algo")
+
 class ContextRequest(BaseModel):
     selectedTopic: str
     selectedSubtopic: str
@@ -13,6 +18,8 @@ class ContextRequest(BaseModel):
     inputInit: Optional[Dict[str, Any]]
     userAlgoCode: Optional[str]
     userEnvCode: Optional[List[str]]
+    userAlgorithmId: Optional[str] = None
+    stepTrace: Optional[StepTrace] = Field(None, description="Record steps of an algorithm that does not call step itself")
 
 class QuestionDetails(BaseModel):
     marks: float
@@ -26,11 +33,20 @@ class SubQuestionContext(BaseModel):
     context: ContextRequest
     questionDetails: QuestionDetails
     userQueryableCode: Optional[str]
+    seed: Optional[int] = Field(None, description="Seed of this subquestion, derived from the seed of the question when not set")
 
 class GenerateQuestionRequest(BaseModel):
     description: str
     context: ContextRequest
     sub_questions: Optional[List[SubQuestionContext]] = Field(None, description="List of subquestions")
+    userId: Optional[str] = Field(None, description="The user whose execution budget applies")
+    seed: Optional[int] = Field(None, description="Seed making the generation reproducible, drawn at random when not set")
+
+class GenerateBatchRequest(BaseModel):
+    template: GenerateQuestionRequest = Field(..., description="The question every variant is generated from")
+    count: Optional[int] = Field(None, ge=1, description="Number of variants, seeded from the seed of the template")
+    seeds: Optional[List[int]] = Field(None, description="Seeds of the variants, one variant per seed")
+    stream: bool = Field(False, description="Stream the variants as they finish, as server-sent events when accepted and newline-delimited JSON otherwise")
 
 class GenerateVariableRequest(BaseModel):
     topic: str
@@ -42,6 +58,8 @@ class GenerateVariableRequest(BaseModel):
     arguments_init: Optional[Dict[str, Any]] = None
     userAlgoCode: Optional[str] = None
     userEnvCode: Optional[List[str]] = None
+    userAlgorithmId: Optional[str] = Field(None, description="A stored algorithm to use when userAlgoCode is not set")
+    userId: Optional[str] = Field(None, description="The user whose execution budget applies")
 
 class VariableResponse(BaseModel):
     context: Dict[str, Any]
@@ -71,6 +89,7 @@ class GenerateInputRequest(BaseModel):
     element_type: Dict[str, str]
     input_init: Optional[Dict[str, Any]] = None
     user_env_code: Optional[str] = None
+    userId: Optional[str] = Field(None, description="The user whose execution budget applies")
 
 class GeneratedContextItem(BaseModel):
     id: str = Field(..., description="The unique identifier of the context item")
@@ -2,12 +2,15 @@ from typing import Optional
 from beanie import Document, PydanticObjectId
 from pydantic import BaseModel, Field
 
+from models.execution_budget import ExecutionBudget
+
 
 class User(Document):
     id: Optional[PydanticObjectId] = Field(None, alias="_id", description="The unique identifier of the user")
     name: str
     email: str
     role: str
+    execution_budget: Optional[ExecutionBudget] = Field(None, description="Limits lowering the default execution budget")
 
     class Settings:
         name = "users"
@@ -17,3 +20,4 @@ class UserCreate(BaseModel):
     name: str = Field(..., description="The name of the user")
     email: str = Field(..., description="The email of the user")
     role: str = Field(..., description="The role of the user")
+    execution_budget: Optional[ExecutionBudget] = Field(None, description="Limits lowering the default execution budget")
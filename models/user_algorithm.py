@@ -1,6 +1,8 @@
 from beanie import Document, PydanticObjectId
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, Optional
+
+from models.execution_budget import ExecutionBudget
 
 
 class UserAlgorithm(Document):
@@ -9,6 +11,11 @@ class UserAlgorithm(Document):
     topic: str = Field(..., description="The topic associated with the algorithm")
     subtopic: str = Field(..., description="The subtopic associated with the algorithm")
     processor_class_code: str = Field(..., description="The code for the processor class")
+    code_hash: Optional[str] = Field(None, description="The hash of the compiled processor class code")
+    metadata: Optional[Dict[str, Any]] = Field(None, description="The variables and queryables extracted from the code")
+    compile_status: str = Field("pending", description="Whether the code compiled: pending, compiled or failed")
+    compile_error: Optional[str] = Field(None, description="The error raised while compiling the code")
+    execution_budget: Optional[ExecutionBudget] = Field(None, description="Limits lowering the budget of the user")
 
     class Settings:
         name = "user_algorithms"
@@ -19,9 +26,11 @@ class UserAlgorithmCreate(BaseModel):
     topic: str = Field(..., description="The topic associated with the algorithm")
     subtopic: str = Field(..., description="The subtopic associated with the algorithm")
     processor_class_code: str = Field(..., description="The code for the processor class")
+    execution_budget: Optional[ExecutionBudget] = Field(None, description="Limits lowering the budget of the user")
 
 
 class UserAlgorithmUpdate(BaseModel):
     topic: Optional[str] = None
     subtopic: Optional[str] = None
     processor_class_code: Optional[str] = None
+    execution_budget: Optional[ExecutionBudget] = None
@@ -1,5 +1,4 @@
 from typing import Type
-from graphviz import Digraph
 
 from question_generation.graph.diagram_output import DiagramOutput
 from question_generation.input.input_subclasses.custom.decision_tree.tree_node import DecisionTreeNode
@@ -14,6 +13,8 @@ class DecisionTreeGraph(DiagramOutput):
         """
         node_label = f"{tree.attribute}_{node_id}" if tree.attribute else f"{tree.label}_{node_id}"
         if graph is None:
+            from graphviz import Digraph
+
             graph = Digraph(format='svg', engine='dot')
             graph.node(node_label, f"{tree.attribute}?" if tree.attribute else str(tree.label), shape='box')
 
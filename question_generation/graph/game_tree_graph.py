@@ -1,9 +1,11 @@
 import string
-from typing import List, Tuple, Any
-from graphviz import Digraph
+from typing import TYPE_CHECKING, List, Tuple, Any
 
 from question_generation.graph.diagram_output import DiagramOutput
 
+if TYPE_CHECKING:
+    from graphviz import Digraph
+
 class GameTreeGraph(DiagramOutput):
     def __init__(self):
         self.count = 0
@@ -19,12 +21,14 @@ class GameTreeGraph(DiagramOutput):
         Returns:
             str: The Graphviz representation in SVG format.
         """
+        from graphviz import Digraph
+
         dot = Digraph(format='svg')
         self._add_nodes_edges(dot, initial_node, 0, pruned_edges)
         return dot.pipe().decode('utf-8')
 
 
-    def _add_nodes_edges(self, graph: Digraph, node: Any, level: int, pruned_edges: List[Tuple[Any, Any]] = None):
+    def _add_nodes_edges(self, graph: 'Digraph', node: Any, level: int, pruned_edges: List[Tuple[Any, Any]] = None):
         """
         Recursively add nodes and edges to the Graphviz graph, highlighting pruned edges in red.
 
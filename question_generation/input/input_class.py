@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
-import copy
 import inspect
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from utils.subclass_registry import SUBCLASS_REGISTRY
 
 
 class Input(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        SUBCLASS_REGISTRY.register(cls)
+
     def generate_input(self) -> Any:
         """
         Generate input data for the algorithm.
@@ -34,6 +39,8 @@ class Input(ABC):
         Returns:
             Dict[str, Any]: A dictionary containing the names and values of the initialization arguments.
         """
+        from utils.clone_helper import clone_value
+
         signature = inspect.signature(self.__init__)
         init_args = {}
         for param in signature.parameters.values():
@@ -41,7 +48,7 @@ class Input(ABC):
                 continue
             if hasattr(self, param.name):
                 # init_args[param.name] = copy.deepcopy(getattr(self, param.name))
-                value = copy.deepcopy(getattr(self, param.name))
+                value = clone_value(getattr(self, param.name))
                 # Skip non-serializable objects and parameters without a value
                 if isinstance(value, (type, inspect.Signature, inspect.Parameter)) or value is param.default:
                     continue
@@ -49,3 +56,19 @@ class Input(ABC):
             # else:
             #     init_args[param.name] = param.default
         return init_args
+
+    def clone(self, memo: Optional[Dict[int, Any]] = None) -> 'Input':
+        """
+        Copy the input for a run of algo to mutate, without deepcopy.
+
+        Args:
+            memo (Optional[Dict[int, Any]]): The copies made so far, by id of the original.
+
+        Returns:
+            Input: An instance with a clone of every attribute, made without calling __init__.
+        """
+        from utils.clone_helper import clone_attributes
+
+        return clone_attributes(self, memo)
+
+SUBCLASS_REGISTRY.track(Input)
@@ -1,8 +1,9 @@
 import random
-from typing import Any, Dict, Generic, List, Type, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
 from question_generation.input.input_class import Input
 from question_generation.input.input_subclasses.primitive.int_type import IntInput
 from question_generation.quantifiable.quantifiable_class import Quantifiable
+from utils.clone_helper import clone_value
 
 T = TypeVar('T', bound=Quantifiable)
 
@@ -28,3 +29,10 @@ class ListInput(list, Input, Quantifiable, Generic[T]):
         shuffled_value = self._value[:]
         random.shuffle(shuffled_value)
         return self.__class__(element_type=self.element_type, input_list=shuffled_value, length=self.length)
+
+    def clone(self, memo: Optional[Dict[int, Any]] = None) -> 'ListInput':
+        """Clone the attributes and the current elements, which can differ from `_value` once algo sorted them."""
+        memo = {} if memo is None else memo
+        clone = super().clone(memo)
+        clone.extend(clone_value(item, memo) for item in self)
+        return clone
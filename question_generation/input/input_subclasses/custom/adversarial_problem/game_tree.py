@@ -2,7 +2,6 @@ import random
 import string
 from typing import List, Tuple, Type
 
-from graphviz import Digraph
 from question_generation.input.input_class import Input
 from question_generation.input.input_subclasses.custom.adversarial_problem.adversarial_element import AdversarialElement
 from question_generation.input.input_subclasses.custom.adversarial_problem.adversarial_env import AdversarialEnv
@@ -84,6 +83,8 @@ class GameTreeInput(AdversarialEnv, Input):
         Returns:
             str: The Graphviz representation in SVG format.
         """
+        from graphviz import Digraph
+
         def _add_nodes_edges(graph: Digraph, node: AdversarialElement, level: int, label_edges: bool = False):
             """
             Recursively add nodes and edges to the Graphviz graph.
@@ -2,7 +2,6 @@ import random
 import string
 from typing import Any, Dict, List, Type
 
-from graphviz import Digraph
 from question_generation.input.input_class import Input
 from question_generation.input.input_subclasses.custom.adversarial_problem.adversarial_element import AdversarialElement
 from question_generation.input.input_subclasses.custom.adversarial_problem.adversarial_env import AdversarialEnv
@@ -105,6 +104,8 @@ class GoldCoinGameEnv(AdversarialEnv, Input, Question, DirectChildren):
         Returns:
             str: The Graphviz representation in SVG format.
         """
+        from graphviz import Digraph
+
         def _add_nodes_edges(graph: Digraph, node: AdversarialElement, level: int, label_edges: bool = False, node_map: Dict[str, str] = None, edge_set: set = None):
             """
             Recursively add nodes and edges to the Graphviz graph.
@@ -1,7 +1,5 @@
 import random
 from typing import List, Dict, Any
-import pandas as pd
-import plotly.graph_objects as go
 from math import log2
 
 from question_generation.input.input_class import Input
@@ -60,6 +58,9 @@ class TabularDataInput(Input, Question, Entropy):
         Returns:
             str: The SVG content representing the table.
         """
+        import pandas as pd
+        import plotly.graph_objects as go
+
         data = self.value()
         if not data:
             return ""
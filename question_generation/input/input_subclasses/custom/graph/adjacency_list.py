@@ -4,7 +4,6 @@ from question_generation.input.input_class import Input
 from question_generation.input.input_subclasses.custom.graph.graph_env import GraphEnv
 from question_generation.input.input_subclasses.primitive.int_type import IntInput
 from question_generation.quantifiable.quantifiable_class import Quantifiable
-from graphviz import Digraph
 
 from utils.conversion_helper import convert_keys
 
@@ -65,6 +64,8 @@ class AdjacencyListInput(GraphEnv, Input, Generic[T]):
         Returns:
             str: The Graphviz representation in SVG format.
         """
+        from graphviz import Digraph
+
         dot = Digraph(format='svg')
         for node, neighbors in self.value.items():
             dot.node(str(id(node)), str(node))
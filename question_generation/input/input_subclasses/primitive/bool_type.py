@@ -1,8 +1,6 @@
-from faker import Faker
 from question_generation.input.input_class import Input
 from question_generation.quantifiable.quantifiable_class import Quantifiable
-
-fake = Faker()
+from utils.faker_factory import get_faker
 
 class BoolInput(Input, Quantifiable):
     _exposed_args = ['value']
@@ -20,7 +18,7 @@ class BoolInput(Input, Quantifiable):
         return int(self._value)
 
     def generate_input(self, chance: int = 50) -> bool:
-        return fake.boolean(chance_of_getting_true=chance)
+        return get_faker().boolean(chance_of_getting_true=chance)
 
     @property
     def value(self) -> bool:
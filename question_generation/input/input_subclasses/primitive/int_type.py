@@ -1,10 +1,8 @@
 from typing import Any, Dict, List
-from faker import Faker
 from question_generation.input.input_class import Input
 from question_generation.quantifiable.quantifiable_class import Quantifiable
 from utils.constants import MIN_VALUE, MAX_INT_VALUE
-
-fake = Faker()
+from utils.faker_factory import get_faker
 
 class IntInput(int, Input, Quantifiable):
     _exposed_args = ['value']
@@ -21,7 +19,7 @@ class IntInput(int, Input, Quantifiable):
         return instance
 
     def generate_input(self, max: int = MAX_INT_VALUE, min: int = MIN_VALUE) -> int:
-        return fake.random_int(min=min, max=max)
+        return get_faker().random_int(min=min, max=max)
 
     def get_init_args(self) -> Dict[str, Any]:
         """Return initialization arguments."""
@@ -1,10 +1,8 @@
 from typing import Any, Dict
-from faker import Faker
 from question_generation.input.input_class import Input
 
 from question_generation.quantifiable.quantifiable_class import Quantifiable
-
-fake = Faker()
+from utils.faker_factory import get_faker
 
 class StringInput(str, Input, Quantifiable):
     _exposed_args = ['value']
@@ -20,7 +18,7 @@ class StringInput(str, Input, Quantifiable):
         return instance
 
     def generate_input(self, length: int = 10) -> str:
-        return fake.text(max_nb_chars=length)
+        return get_faker().text(max_nb_chars=length)
 
     def get_init_args(self) -> Dict[str, Any]:
         """Return initialization arguments."""
@@ -1,10 +1,16 @@
 from typing import Any
 from functools import total_ordering
 
+from utils.subclass_registry import SUBCLASS_REGISTRY
+
 @total_ordering
 class Quantifiable:
     _value: Any
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        SUBCLASS_REGISTRY.register(cls)
+
     def value(self) -> Any:
         return self._value
 
@@ -20,3 +26,5 @@ class Quantifiable:
 
     def __repr__(self):
         return str(self._value)
+
+SUBCLASS_REGISTRY.track(Quantifiable)
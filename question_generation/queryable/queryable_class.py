@@ -1,16 +1,25 @@
-from typing import Any, Callable, List, Tuple
+from typing import Any, Callable, List, Optional, Tuple
+
+from utils.subclass_registry import SUBCLASS_REGISTRY
 
 class Queryable:
+    # The attributes holding what a run of algo recorded, declared by each subclass.
+    # None derives them, once per class, from what __init__ sets.
+    state_fields: Optional[Tuple[str, ...]] = None
+
     def __init__(self):
         self.variable: str = "variable"
         self.generate_input_function: Callable[[], Any] = None
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        SUBCLASS_REGISTRY.register(cls)
+
     def query(self, *args, **kwargs) -> Any:
         return getattr(self, self.variable)
 
     def query_all(self) -> List[Tuple[type, Any, Callable[[], Any]]]:
-        return [
-            (cls, getattr(cls, 'query', None), getattr(cls, 'generate_input', None))
-            for cls in self.__class__.__bases__
-            if issubclass(cls, Queryable)
-        ]
\ No newline at end of file
+        from utils.variable_helper import get_query_dispatch
+        return [(dispatch.queryable, dispatch.query, dispatch.generate_input) for dispatch in get_query_dispatch(self.__class__).values()]
+
+SUBCLASS_REGISTRY.track(Queryable)
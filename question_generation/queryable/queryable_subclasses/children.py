@@ -4,6 +4,8 @@ from question_generation.queryable.queryable_class import Queryable
 
 
 class DirectChildren(Queryable):
+    state_fields = ('direct_children', 'get_children', 'values')
+
     def __init__(self):
         super().__init__()
         self.variable: str = "direct_children"
@@ -5,6 +5,8 @@ from question_generation.queryable.queryable_class import Queryable
 
 
 class Entropy(Queryable):
+    state_fields = ('entropy_value', 'keys')
+
     def __init__(self):
         super().__init__()
         self.variable: str = "entropy_value"
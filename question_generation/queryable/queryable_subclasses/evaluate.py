@@ -5,6 +5,8 @@ from question_generation.queryable.queryable_class import Queryable
 
 
 class Evaluate(Queryable):
+    state_fields = ('evaluation_data', 'evaluation_function', 'generate_input_function')
+
     def __init__(self):
         super().__init__()
         self.variable: str = "evaluation_data"
@@ -5,6 +5,8 @@ from question_generation.queryable.queryable_class import Queryable
 
 
 class Output(Queryable):
+    state_fields = ('out',)
+
     def __init__(self):
         super().__init__()
         self.variable: str = "out"
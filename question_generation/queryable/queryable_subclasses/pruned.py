@@ -4,6 +4,8 @@ from question_generation.graph.diagram_output import DiagramOutput
 from question_generation.queryable.queryable_class import Queryable
 
 class Pruned(Queryable):
+    state_fields = ('nodes', 'pruned_edges')
+
     def __init__(self):
         super().__init__()
         self.variable: str = "pruned_edges"
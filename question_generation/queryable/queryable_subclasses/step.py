@@ -5,6 +5,8 @@ from question_generation.queryable.queryable_class import Queryable
 
 
 class Step(Queryable):
+    state_fields = ('history',)
+
     def __init__(self):
         super().__init__()
         self.variable: str = "history"
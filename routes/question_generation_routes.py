@@ -1,44 +1,64 @@
-import json
-from pathlib import Path
-import subprocess
-from typing import Any, Dict, List, Type
-import docker
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Dict, List, Mapping, Type
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from models import GenerateQuestionRequest
-from models.question_generation import GenerateInputRequest, GenerateVariableRequest, InputRequest, OutputResponse, UserInputVariableRequest, UserQueryableRequest, VariableResponse
-from question_generation.quantifiable.quantifiable_class import Quantifiable
+from models.question_generation import GenerateBatchRequest, GenerateInputRequest, GenerateVariableRequest, InputRequest, OutputResponse, UserInputVariableRequest, UserQueryableRequest, VariableResponse
 from question_generation.queryable.queryable_class import Queryable
-from utils.classes_helper import autoload_classes, get_subclasses_name
-from utils.question_generation_helper import generate_input, generate_output, generate_question, generate_variable
+from utils.batch_helper import batch_seeds, collect_batch, generate_batch, stream_batch
+from utils.budget_helper import BudgetExceededError
+from utils.cancellation_helper import CancellationToken, GenerationCancelled, cancel_on_disconnect
+from utils.catalog_helper import catalog_response
+from utils.conversion_helper import FUNCTION_CACHE
+from utils.execution_helper import ExecutionBackend
+from utils.metadata_helper import get_algo_metadata, get_input_metadata, get_user_algo_metadata, get_user_input_metadata
+from utils.registry_helper import ClassRegistry
+from utils.stream_helper import stream_encoding, stream_question
+from utils.job_runner import run_generate_input, run_generate_output, run_generate_variable
 from utils.variable_helper import list_algo_variable, list_input_queryable_variable, list_input_variable, list_queryable_variable, list_user_algo_variables, list_user_input_queryable_variable, list_user_input_variables, list_user_queryable_variable
-from utils.topics_helper import list_input_queryable, list_keys, list_queryable, list_user_input_queryable, list_user_queryable
+from utils.topics_helper import list_input_queryable, list_queryable, list_user_input_queryable, list_user_queryable
 from utils.types_helper import GeneratedQuestionClassType
+from utils.user__code_helper import USER_CODE_CACHE
+from utils.user_algorithm_helper import resolve_execution_budget, resolve_user_algorithms
+from utils.worker_pool import WorkerPool
 
 question_generation_router = APIRouter()
-# client = docker.from_env()
 
-def get_autoloaded_classes() -> Dict[str, Dict[str, GeneratedQuestionClassType]]:
-    base_package = 'question_generation.algo.algo_subclasses'
-    base_path = Path(__file__).resolve().parent.parent / 'question_generation' / 'algo' / 'algo_subclasses'
-    return autoload_classes(str(base_path), base_package)
+def get_class_registry(request: Request) -> ClassRegistry:
+    registry = getattr(request.app.state, 'class_registry', None)
+    if registry is None:
+        raise HTTPException(status_code=503, detail="Class registry is not initialised")
+    return registry
 
-def get_input_classes() -> Dict[str, Dict[str, Any]]:
-    base_package = 'question_generation.input.input_subclasses'
-    base_path = Path(__file__).resolve().parent.parent / 'question_generation' / 'input' / 'input_subclasses'
-    return autoload_classes(str(base_path), base_package)
+def get_execution_backend(request: Request) -> ExecutionBackend:
+    backend = getattr(request.app.state, 'execution_backend', None)
+    if backend is None:
+        raise HTTPException(status_code=503, detail="Execution backend is not initialised")
+    return backend
+
+def get_worker_pool(request: Request) -> WorkerPool:
+    pool = getattr(request.app.state, 'worker_pool', None)
+    if pool is None:
+        raise HTTPException(status_code=503, detail="Worker pool is not initialised")
+    return pool
+
+def get_autoloaded_classes(registry: ClassRegistry = Depends(get_class_registry)) -> Mapping[str, Mapping[str, GeneratedQuestionClassType]]:
+    return registry.algo_classes
+
+def get_input_classes(registry: ClassRegistry = Depends(get_class_registry)) -> Mapping[str, Mapping[str, Any]]:
+    return registry.input_classes
 
 
 @question_generation_router.get("/algos")
-async def list_algos_route(autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]] = Depends(get_autoloaded_classes)) -> Dict[str, Any]:
+async def list_algos_route(request: Request, registry: ClassRegistry = Depends(get_class_registry)) -> Response:
     try:
-        return list_keys(autoloaded_classes)
+        return catalog_response(request, registry.catalog['algos'], registry.fingerprint)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @question_generation_router.get("/input")
-async def list_input_classes_route(input_classes: Dict[str, Dict[str, Type]] = Depends(get_input_classes)) -> Dict[str, Any]:
+async def list_input_classes_route(request: Request, registry: ClassRegistry = Depends(get_class_registry)) -> Response:
     try:
-        return list_keys(input_classes)
+        return catalog_response(request, registry.catalog['input'], registry.fingerprint)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -174,110 +194,170 @@ async def list_user_input_queryable_variables_route(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@question_generation_router.get("/topics/{topic}/subtopics/{subtopic}/metadata")
+async def get_algo_metadata_route(topic: str, subtopic: str, autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]] = Depends(get_autoloaded_classes)) -> Dict[str, Any]:
+    """Route for getting the variables, queryables and query variables of a subtopic at once."""
+    try:
+        return get_algo_metadata(autoloaded_classes, topic, subtopic)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@question_generation_router.post("/input/metadata")
+async def get_input_metadata_route(request: InputRequest, input_classes: Dict[str, Dict[str, Type]] = Depends(get_input_classes)) -> Dict[str, Any]:
+    """Route for getting the variables, queryables and query variables of an input path at once."""
+    try:
+        return get_input_metadata(request.input_path, input_classes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@question_generation_router.post("/user/metadata")
+async def get_user_algo_metadata_route(request: UserQueryableRequest) -> Dict[str, Any]:
+    """Route for getting the metadata of user-defined algo code at once."""
+    try:
+        return get_user_algo_metadata(request.userAlgoCode, request.userEnvCode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@question_generation_router.post("/user/input/metadata")
+async def get_user_input_metadata_route(request: UserInputVariableRequest) -> Dict[str, Any]:
+    """Route for getting the metadata of user-defined input code at once."""
+    try:
+        return get_user_input_metadata(request.userEnvCode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @question_generation_router.get("/quantifiables")
-async def list_quantifiables_route() -> List[str]:
+async def list_quantifiables_route(request: Request, registry: ClassRegistry = Depends(get_class_registry)) -> Response:
     try:
-        return get_subclasses_name(Quantifiable)
+        return catalog_response(request, registry.catalog['quantifiables'], registry.fingerprint)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@question_generation_router.get("/user_code/cache")
+async def user_code_cache_stats_route() -> Dict[str, Dict[str, int]]:
+    """Route for the hit, miss and eviction counters of the compiled user code caches."""
+    return {
+        "code": USER_CODE_CACHE.stats(),
+        "functions": FUNCTION_CACHE.stats(),
+    }
+
+@question_generation_router.get("/execution/stats")
+async def execution_stats_route(backend: ExecutionBackend = Depends(get_execution_backend), pool: WorkerPool = Depends(get_worker_pool)) -> Dict[str, Any]:
+    """Route for the state of the execution backend and of the worker pool."""
+    return {**backend.stats(), "worker_pool": pool.stats()}
+
 @question_generation_router.post("/generate_variable")
-async def generate_variable_route(request: GenerateVariableRequest, autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]] = Depends(get_autoloaded_classes)) -> VariableResponse:
+async def generate_variable_route(request: GenerateVariableRequest, registry: ClassRegistry = Depends(get_class_registry), pool: WorkerPool = Depends(get_worker_pool)) -> VariableResponse:
     try:
-        result = generate_variable(
-            autoloaded_classes,
-            request.topic,
-            request.subtopic,
-            request.arguments,
-            request.element_type,
-            request.subclasses,
-            request.question_description,
-            request.arguments_init,
-            userAlgoCode = request.userAlgoCode,
-            userEnvCode = request.userEnvCode
-        )
-        result['context'] = {key: str(value) for key, value in result['context'].items()}
-        result['cls_name'] = result['cls'].__name__
-        return result
+        algorithms = await resolve_user_algorithms(request)
+        budget = await resolve_execution_budget(request, algorithms)
+        return await pool.call(run_generate_variable, registry, request.model_dump(), budget.model_dump(), pool.separate_processes)
+    except BudgetExceededError as e:
+        raise HTTPException(status_code=422, detail=e.to_dict())
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @question_generation_router.post("/generate_output")
-async def generate_output_route(request: GenerateVariableRequest, autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]] = Depends(get_autoloaded_classes)) -> OutputResponse:
+async def generate_output_route(request: GenerateVariableRequest, registry: ClassRegistry = Depends(get_class_registry), pool: WorkerPool = Depends(get_worker_pool)) -> OutputResponse:
     try:
-        result = generate_output(
-            autoloaded_classes,
-            request.topic,
-            request.subtopic,
-            request.arguments,
-            request.element_type,
-            request.subclasses,
-            request.arguments_init,
-            userAlgoCode = request.userAlgoCode,
-            userEnvCode = request.userEnvCode
-        )
-        if result['context']:
-            result['context'] = {key: str(value) for key, value in result['context'].items()}
-        return result
+        algorithms = await resolve_user_algorithms(request)
+        budget = await resolve_execution_budget(request, algorithms)
+        return await pool.call(run_generate_output, registry, request.model_dump(), budget.model_dump(), pool.separate_processes)
+    except BudgetExceededError as e:
+        raise HTTPException(status_code=422, detail=e.to_dict())
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @question_generation_router.post("/generate_input")
-async def generate_input_route(request: GenerateInputRequest, input_classes: Dict[str, Dict[str, Type]] = Depends(get_input_classes)) -> VariableResponse:
+async def generate_input_route(request: GenerateInputRequest, registry: ClassRegistry = Depends(get_class_registry), pool: WorkerPool = Depends(get_worker_pool)) -> VariableResponse:
     try:
-        result = generate_input(
-            request.input_path,
-            request.variable_options,
-            input_classes,
-            request.element_type,
-            request.input_init,
-            request.user_env_code
-        )
-        result['context'] = {key: str(value) for key, value in result['context'].items()}
-        result['cls_name'] = result['cls'].__name__
-        result['has_output'] = False
-        return result
+        algorithms = await resolve_user_algorithms(request)
+        budget = await resolve_execution_budget(request, algorithms)
+        return await pool.call(run_generate_input, registry, request.model_dump(), budget.model_dump(), pool.separate_processes)
+    except BudgetExceededError as e:
+        raise HTTPException(status_code=422, detail=e.to_dict())
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# @question_generation_router.post("/generate")
-# async def generate_route(request: GenerateQuestionRequest):
-#     try:
-#         input_data = {
-#             "request": request.model_dump(),
-#         }
-#         input_json = json.dumps(input_data)
-#         result = subprocess.run(
-#             [
-#                 "docker", "run", "--rm", "-i",
-#                 "sandbox_image"
-#             ],
-#             input=input_json,
-#             capture_output=True,
-#             text=True
-#         )
-#         json_start = result.stdout.rfind('{"result"')
-#         if json_start != -1:
-#             valid_json_str = result.stdout[json_start:]
-#             output = json.loads(valid_json_str)
-#             return output['result']
-#         else:
-#             return {"error": "No valid JSON found in the output"}
-
-#     except Exception as e:
-#         raise HTTPException(status_code=500, detail=str(e))
-
 @question_generation_router.post("/generate")
-async def generate_route(request: GenerateQuestionRequest, autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]] = Depends(get_autoloaded_classes), input_classes: Dict[str, Dict[str, Type]] = Depends(get_input_classes)):
+async def generate_route(request: GenerateQuestionRequest, http_request: Request, registry: ClassRegistry = Depends(get_class_registry), backend: ExecutionBackend = Depends(get_execution_backend)):
+    try:
+        algorithms = await resolve_user_algorithms(request)
+        budget = await resolve_execution_budget(request, algorithms)
+        token = CancellationToken()
+        return await cancel_on_disconnect(http_request, token, backend.generate(request, registry, budget, token))
+    except BudgetExceededError as e:
+        raise HTTPException(status_code=422, detail=e.to_dict())
+    except GenerationCancelled:
+        raise HTTPException(status_code=499, detail="Client disconnected")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@question_generation_router.post("/generate/batch")
+async def generate_batch_route(request: GenerateBatchRequest, http_request: Request, registry: ClassRegistry = Depends(get_class_registry), backend: ExecutionBackend = Depends(get_execution_backend)):
+    """
+    Route generating many variants of one question, one per seed.
+
+    The stored algorithms and the budget of the template are resolved once for
+    the whole batch. A variant that fails reports its error in place of its
+    question; the other variants are still generated.
+    """
+    try:
+        batch_seed, seeds = batch_seeds(request)
+        algorithms = await resolve_user_algorithms(request.template)
+        budget = await resolve_execution_budget(request.template, algorithms)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    token = CancellationToken()
+    variants = generate_batch(backend, request.template, seeds, registry, budget, token)
+    if request.stream:
+        encode, media_type = stream_encoding(http_request.headers.get('accept', ''))
+        return StreamingResponse(stream_batch(batch_seed, variants, token, encode), media_type=media_type)
+    try:
+        return await cancel_on_disconnect(http_request, token, collect_batch(batch_seed, variants))
+    except GenerationCancelled:
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
+@question_generation_router.post("/generate/stream")
+async def generate_stream_route(request: GenerateQuestionRequest, http_request: Request, registry: ClassRegistry = Depends(get_class_registry), backend: ExecutionBackend = Depends(get_execution_backend)):
+    """
+    Route streaming a question part by part as it is generated.
+
+    Frames are sent as server-sent events when the Accept header asks for
+    text/event-stream, and as newline-delimited JSON otherwise. Errors once the
+    stream has started are sent as an error frame.
+    """
     try:
-        return generate_question(request, autoloaded_classes, input_classes)
+        algorithms = await resolve_user_algorithms(request)
+        budget = await resolve_execution_budget(request, algorithms)
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    encode, media_type = stream_encoding(http_request.headers.get('accept', ''))
+    return StreamingResponse(stream_question(backend, request, registry, budget, CancellationToken(), encode), media_type=media_type)
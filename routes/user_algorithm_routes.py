@@ -1,14 +1,16 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from beanie import PydanticObjectId
 from models.user_algorithm import UserAlgorithm, UserAlgorithmCreate, UserAlgorithmUpdate
 from typing import List
+from utils.user_algorithm_helper import COMPILE_STATUS_COMPILED, compile_user_algorithm
 
 user_algorithm_router = APIRouter()
 
 
 @user_algorithm_router.post("/", response_model=UserAlgorithm)
 async def add_user_defined_algorithm(algorithm: UserAlgorithmCreate):
-    new_algorithm = UserAlgorithm(**algorithm.dict())
+    new_algorithm = await asyncio.to_thread(compile_user_algorithm, UserAlgorithm(**algorithm.dict()))
     await new_algorithm.insert()
     return new_algorithm
 
@@ -47,6 +49,8 @@ async def update_user_defined_algorithm(algorithm_id: str, update_data: UserAlgo
     update_data_dict = update_data.dict(exclude_unset=True)
     for key, value in update_data_dict.items():
         setattr(algorithm, key, value)
+    if 'processor_class_code' in update_data_dict or algorithm.compile_status != COMPILE_STATUS_COMPILED:
+        await asyncio.to_thread(compile_user_algorithm, algorithm)
 
     await algorithm.save()
     return algorithm
@@ -1,5 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from beanie import PydanticObjectId
 from typing import List
+from models.execution_budget import ExecutionBudget
 from models.user import User, UserCreate
 
 user_router = APIRouter()
@@ -16,3 +18,13 @@ async def add_user(user: UserCreate):
 async def get_users():
     users = await User.find().to_list()
     return users
+
+
+@user_router.put("/{user_id}/execution_budget", response_model=User)
+async def update_execution_budget(user_id: str, budget: ExecutionBudget):
+    user = await User.get(PydanticObjectId(user_id))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.execution_budget = budget
+    await user.save()
+    return user
@@ -1,40 +1,55 @@
-from pathlib import Path
+import os
 import sys
 import json
-from typing import Any, Dict
 from models.question_generation import GenerateQuestionRequest
-from utils.classes_helper import autoload_classes
-from utils.types_helper import GeneratedQuestionClassType
+from utils.job_runner import run_job
+from utils.registry_helper import build_class_registry
 from utils.question_generation_helper import generate_question
+from utils.sandbox_protocol import read_frame, write_frame
 
 
-def get_autoloaded_classes() -> Dict[str, Dict[str, GeneratedQuestionClassType]]:
-    try:
-        base_package = 'question_generation.algo.algo_subclasses'
-        base_path = Path(__file__).resolve().parent / 'question_generation' / 'algo' / 'algo_subclasses'
-        return autoload_classes(str(base_path), base_package)
-    except Exception as e:
-        return str(e)
-
-def get_input_classes() -> Dict[str, Dict[str, Any]]:
-    try:
-        base_package = 'question_generation.input.input_subclasses'
-        base_path = Path(__file__).resolve().parent.parent / 'question_generation' / 'input' / 'input_subclasses'
-        return autoload_classes(str(base_path), base_package)
-    except Exception as e:
-        return str(e)
-
 def execute_user_code(request: GenerateQuestionRequest):
     try:
-        autoloaded_classes = get_autoloaded_classes()
-        input_classes = get_input_classes()
-        result = generate_question(request, autoloaded_classes, input_classes)
+        registry = build_class_registry()
+        result = generate_question(request, registry.algo_classes, registry.input_classes)
         return result
     except Exception as e:
         return str(e)
 
+def open_protocol_streams(fd_in=None, fd_out=None):
+    """
+    Return the binary streams jobs are read from and frames written to.
+
+    Without dedicated descriptors the protocol runs over stdin/stdout: they are
+    duplicated for the protocol and fd 1 is pointed at stderr, so that nothing
+    written to stdout by user code can end up in the frame stream.
+    """
+    if fd_in is None:
+        fd_in = os.dup(0)
+        os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+    if fd_out is None:
+        fd_out = os.dup(1)
+        os.dup2(2, 1)
+    return os.fdopen(fd_in, "rb"), os.fdopen(fd_out, "wb")
+
+def serve(fd_in=None, fd_out=None):
+    """Run framed jobs until the job stream closes, keeping the class registry between jobs."""
+    jobs, frames = open_protocol_streams(fd_in, fd_out)
+    registry = build_class_registry()
+    while True:
+        job = read_frame(jobs)
+        if job is None:
+            break
+        write_frame(frames, run_job(job, registry, frames))
+
+def descriptor_argument(name):
+    return int(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else None
+
 if __name__ == "__main__":
-    input_data = json.loads(sys.stdin.read())
-    request = GenerateQuestionRequest(**input_data["request"])
-    result = execute_user_code(request)
-    print(json.dumps({"result": result}))
\ No newline at end of file
+    if "--serve" in sys.argv:
+        serve(descriptor_argument("--fd-in"), descriptor_argument("--fd-out"))
+    else:
+        input_data = json.loads(sys.stdin.read())
+        request = GenerateQuestionRequest(**input_data["request"])
+        result = execute_user_code(request)
+        print(json.dumps({"result": result}))
@@ -0,0 +1,52 @@
+"""User algorithm code the tests generate from."""
+
+SORT_ALGO = '''
+from question_generation.algo.algo import Algo
+from question_generation.input.input_subclasses.composite.list_type import ListInput
+from question_generation.quantifiable.quantifiable_class import Quantifiable
+from question_generation.queryable.queryable_subclasses.output import Output
+from question_generation.queryable.queryable_subclasses.step import Step
+from question_generation.question.question import Question
+
+class TestSort(Algo, Question, Output, Step):
+    def algo(self, input: ListInput[Quantifiable]):
+        for i in range(len(input)):
+            for j in range(len(input) - 1):
+                if input[j] > input[j + 1]:
+                    input[j], input[j + 1] = input[j + 1], input[j]
+            self.step(input)
+        self.output(input)
+        return input
+'''
+LOOPING_ALGO = SORT_ALGO.replace("for i in range(len(input)):", "while True:\n            pass\n        for i in range(len(input)):", 1)
+# Prints text that looks like a result frame, to stdout and straight to file descriptor 1.
+PRINTING_ALGO = SORT_ALGO.replace(
+    "        self.output(input)",
+    "        print('{\"id\": 0, \"type\": \"result\", \"result\": {}}')\n"
+    "        import os, struct\n"
+    "        os.write(1, struct.pack('>I', 2) + b'{}')\n"
+    "        self.output(input)",
+    1,
+)
+# Records steps and prunes every element that is not smaller than the first one.
+PRUNING_ALGO = '''
+from question_generation.algo.algo import Algo
+from question_generation.input.input_subclasses.composite.list_type import ListInput
+from question_generation.quantifiable.quantifiable_class import Quantifiable
+from question_generation.queryable.queryable_subclasses.output import Output
+from question_generation.queryable.queryable_subclasses.pruned import Pruned
+from question_generation.queryable.queryable_subclasses.step import Step
+from question_generation.question.question import Question
+
+class TestPrune(Algo, Question, Output, Step, Pruned):
+    def algo(self, input: ListInput[Quantifiable]):
+        smaller = []
+        for index in range(1, len(input)):
+            if input[index] < input[0]:
+                smaller.append(input[index])
+                self.step(smaller)
+            else:
+                self.prune(str(index), input[0], input[index])
+        self.output(smaller)
+        return smaller
+'''
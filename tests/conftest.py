@@ -0,0 +1,58 @@
+import os
+
+os.environ.setdefault('MONGO_URI', 'mongodb://localhost:1')
+os.environ.setdefault('MONGO_DBNAME', 'test')
+os.environ.setdefault('WARMUP', 'false')
+
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+from models.question_generation import GenerateQuestionRequest
+from utils.registry_helper import ClassRegistry, build_class_registry
+
+
+def context(**fields: Any) -> Dict[str, Any]:
+    base = dict(
+        selectedTopic="Sort", selectedSubtopic="bubble_sort", inputPath={}, selectedSubclasses={},
+        selectedQuantifiables={"input": "IntInput"}, arguments={"input": {"length": 5}}, inputArguments={},
+        argumentsInit=None, inputInit=None, userAlgoCode=None, userEnvCode=None,
+    )
+    base.update(fields)
+    return base
+
+def subquestion(queryable: str, **fields: Any) -> Dict[str, Any]:
+    return dict(
+        description="What is {step}?", queryable=queryable, inputQueryable="",
+        context=context(selectedTopic="", selectedSubtopic="", **fields),
+        questionDetails={"marks": 1, "number_of_options": 4}, userQueryableCode=None,
+    )
+
+
+@pytest.fixture(scope='session')
+def registry() -> ClassRegistry:
+    return build_class_registry()
+
+@pytest.fixture
+def make_request() -> Callable[..., GenerateQuestionRequest]:
+    """Build a sort question, from the built-in bubble sort or from `code`, with a Step and an Output subquestion."""
+    def build(code: Optional[str] = None, seed: Optional[int] = None) -> GenerateQuestionRequest:
+        outer = context(selectedTopic="", selectedSubtopic="", userAlgoCode=code) if code else context()
+        return GenerateQuestionRequest(
+            description="Sort {input}", context=outer, seed=seed,
+            sub_questions=[subquestion("Step"), subquestion("Output")],
+        )
+    return build
+
+@pytest.fixture
+def client(monkeypatch):
+    """A client of the app, started without a database."""
+    from fastapi.testclient import TestClient
+    import app as app_module
+
+    async def skip_database(*args: Any, **kwargs: Any) -> None:
+        return None
+
+    monkeypatch.setattr(app_module, 'init_beanie', skip_database)
+    with TestClient(app_module.app) as test_client:
+        yield test_client
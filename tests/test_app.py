@@ -0,0 +1,44 @@
+import time
+
+import app as app_module
+
+
+def test_import_report_is_only_mounted_when_enabled(client):
+    # IMPORT_REPORT is off by default, and the report is never measured per request.
+    assert not app_module.config.IMPORT_REPORT
+    assert client.get('/debug/imports').status_code == 404
+
+
+def ready_after_warm_up(monkeypatch, report):
+    """Start the app with a warm-up that reports `report` and return its /ready response once it is done."""
+    from fastapi.testclient import TestClient
+
+    async def skip_database(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(app_module, 'init_beanie', skip_database)
+    monkeypatch.setattr(app_module.config, 'WARMUP', True)
+    monkeypatch.setattr(app_module, 'warm_up', lambda registry: report)
+    with TestClient(app_module.app) as client:
+        for _ in range(100):
+            response = client.get('/ready')
+            if response.json()['warmup'] is not None:
+                return response
+            time.sleep(0.05)
+    raise AssertionError("warm-up did not finish")
+
+
+def test_warm_up_is_off_by_default(client):
+    assert not app_module.config.WARMUP
+    assert client.get('/ready').status_code == 200
+
+
+def test_ready_after_a_successful_warm_up(monkeypatch):
+    response = ready_after_warm_up(monkeypatch, {'metadata': {'ok': True, 'seconds': 0.1}})
+    assert response.status_code == 200
+
+
+def test_not_ready_when_a_warm_up_step_fails(monkeypatch):
+    response = ready_after_warm_up(monkeypatch, {'metadata': {'ok': True, 'seconds': 0.1}, 'graph': {'ok': False, 'error': 'dot not found', 'seconds': 0.0}})
+    assert response.status_code == 503
+    assert response.json()['warmup']['graph']['error'] == 'dot not found'
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from models.question_generation import GenerateBatchRequest
+from utils.batch_helper import batch_seeds, collect_batch, generate_batch
+from utils.budget_helper import default_budget
+from utils.execution_helper import InProcessBackend
+
+
+def batch(make_request, **fields):
+    return GenerateBatchRequest(template=make_request(seed=fields.pop('seed', None)), **fields)
+
+
+def test_count_above_the_cap_is_rejected_before_deriving_seeds(make_request):
+    started = time.monotonic()
+    with pytest.raises(ValueError, match="at most 10 variants"):
+        batch_seeds(batch(make_request, count=10**9), max_variants=10)
+    assert time.monotonic() - started < 1
+
+def test_seed_list_above_the_cap_is_rejected(make_request):
+    with pytest.raises(ValueError):
+        batch_seeds(batch(make_request, seeds=list(range(11))), max_variants=10)
+
+@pytest.mark.parametrize('fields', [{}, {'count': 2, 'seeds': [1, 2]}, {'seeds': []}])
+def test_batch_needs_exactly_one_non_empty_variant_source(make_request, fields):
+    with pytest.raises(ValueError):
+        batch_seeds(batch(make_request, **fields))
+
+def test_count_must_be_positive(make_request):
+    with pytest.raises(ValueError):
+        batch(make_request, count=0)
+
+def test_counted_seeds_are_reproducible_from_the_batch_seed(make_request):
+    batch_seed, seeds = batch_seeds(batch(make_request, count=5, seed=42))
+    assert batch_seed == 42
+    assert len(set(seeds)) == 5
+    assert batch_seeds(batch(make_request, count=5, seed=42)) == (42, seeds)
+    assert batch_seeds(batch(make_request, count=5, seed=43))[1] != seeds
+
+def test_listed_seeds_are_used_as_given(make_request):
+    assert batch_seeds(batch(make_request, seeds=[7, 7, 3])) == (None, [7, 7, 3])
+
+def test_variant_matches_a_single_generation_with_its_seed(make_request, registry):
+    backend = InProcessBackend()
+    _, seeds = batch_seeds(batch(make_request, count=3, seed=5))
+
+    async def run():
+        result = await collect_batch(5, generate_batch(backend, make_request(), seeds, registry, default_budget()))
+        single = await backend.generate(make_request(seed=seeds[2]), registry)
+        return result, single
+
+    result, single = asyncio.run(run())
+    assert (result['count'], result['succeeded'], result['failed']) == (3, 3, 0)
+    assert [variant['index'] for variant in result['variants']] == [0, 1, 2]
+    assert json.dumps(result['variants'][2]['question'], sort_keys=True) == json.dumps(single, sort_keys=True)
+
+def test_failed_variant_does_not_abort_the_batch(make_request, registry):
+    broken = make_request()
+    broken.context.selectedSubtopic = 'missing'
+    result = asyncio.run(collect_batch(None, generate_batch(InProcessBackend(), broken, [1, 2], registry, default_budget())))
+    assert (result['count'], result['failed']) == (2, 2)
+    assert all(variant['error']['status_code'] == 500 for variant in result['variants'])
@@ -0,0 +1,97 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from config import Config
+from models.execution_budget import ExecutionBudget
+from models.user import User
+from tests.algorithms import LOOPING_ALGO, SORT_ALGO
+from utils import user_algorithm_helper
+from utils.budget_helper import BudgetExceededError, apply_budget, default_budget, merge_budgets
+from utils.execution_helper import InProcessBackend
+from utils.user__code_helper import runs_user_code
+
+
+def generate(request, registry, budget):
+    return asyncio.run(InProcessBackend().generate(request, registry, budget))
+
+
+def test_wall_limit_stops_infinite_loop_without_instruction_budget(make_request, registry):
+    started = time.monotonic()
+    with pytest.raises(BudgetExceededError) as raised:
+        generate(make_request(LOOPING_ALGO), registry, ExecutionBudget(wall_seconds=0.5))
+    assert raised.value.limit == 'wall_seconds'
+    assert time.monotonic() - started < 5
+
+def test_cpu_limit_stops_infinite_loop_in_thread(make_request, registry):
+    with pytest.raises(BudgetExceededError) as raised:
+        generate(make_request(LOOPING_ALGO), registry, ExecutionBudget(cpu_seconds=0.5))
+    assert raised.value.limit == 'cpu_seconds'
+
+def test_default_budget_is_enforced_in_process(make_request, registry, monkeypatch):
+    monkeypatch.setattr(Config, 'BUDGET_INSTRUCTIONS', 0)
+    monkeypatch.setattr(Config, 'BUDGET_WALL_SECONDS', 0.5)
+    with pytest.raises(BudgetExceededError):
+        generate(make_request(LOOPING_ALGO), registry, default_budget())
+
+def test_instruction_limit(make_request, registry):
+    with pytest.raises(BudgetExceededError) as raised:
+        generate(make_request(LOOPING_ALGO), registry, ExecutionBudget(instructions=100000))
+    assert raised.value.limit == 'instructions'
+
+def test_budget_allows_terminating_code(make_request, registry):
+    assert generate(make_request(), registry, ExecutionBudget(wall_seconds=10, cpu_seconds=10))['subquestions']
+
+@pytest.mark.parametrize('route', ['generate_variable', 'generate_output'])
+def test_variable_routes_run_under_budget(client, monkeypatch, route):
+    monkeypatch.setattr(Config, 'BUDGET_WALL_SECONDS', 0.5)
+    response = client.post(f'/question_generation/{route}', json=dict(
+        topic="", subtopic="", element_type={"input": "IntInput"}, subclasses={},
+        arguments={"input": {"length": 4}}, question_description="Sort {input}", userAlgoCode=LOOPING_ALGO,
+    ))
+    assert response.status_code == 422
+    assert response.json()['detail']['limit'] == 'wall_seconds'
+
+@pytest.mark.parametrize('route', ['generate_variable', 'generate_output'])
+def test_variable_routes_run_under_the_user_budget(client, monkeypatch, route):
+    async def user_with_budget(user_id):
+        return User.model_construct(execution_budget=ExecutionBudget(wall_seconds=0.3))
+
+    monkeypatch.setattr(user_algorithm_helper, 'get_user', user_with_budget)
+    response = client.post(f'/question_generation/{route}', json=dict(
+        topic="", subtopic="", element_type={"input": "IntInput"}, subclasses={},
+        arguments={"input": {"length": 4}}, question_description="Sort {input}", userAlgoCode=LOOPING_ALGO,
+        userId="000000000000000000000000",
+    ))
+    assert response.status_code == 422
+    assert response.json()['detail']['limit'] == 'wall_seconds'
+    assert response.json()['detail']['value'] == 0.3
+
+def test_user_and_algorithm_budgets_only_lower_the_defaults():
+    defaults = ExecutionBudget(cpu_seconds=10, wall_seconds=30, memory_mb=512, instructions=0)
+    user = ExecutionBudget(cpu_seconds=1000, wall_seconds=5, memory_mb=0)
+    algorithm = ExecutionBudget(wall_seconds=3600, instructions=10**6)
+    merged = merge_budgets(defaults, user, algorithm)
+    assert merged == ExecutionBudget(cpu_seconds=10, wall_seconds=5, memory_mb=512, instructions=10**6)
+
+def test_negative_limits_are_rejected():
+    with pytest.raises(ValueError):
+        ExecutionBudget(wall_seconds=-1)
+
+
+def test_requests_running_user_code_are_recognised(make_request):
+    assert not runs_user_code(make_request())
+    assert runs_user_code(make_request(SORT_ALGO))
+    with_queryable = make_request()
+    with_queryable.sub_questions[1].userQueryableCode = "class Q: pass"
+    assert runs_user_code(with_queryable)
+    assert runs_user_code({'topic': 'Sort', 'userEnvCode': ["class E: pass"]})
+    assert not runs_user_code({'topic': 'Sort', 'user_env_code': None})
+
+def test_no_tracer_without_user_code():
+    with apply_budget(default_budget(), process_limits=False, user_code=False):
+        assert sys.gettrace() is None
+    with apply_budget(default_budget(), process_limits=False):
+        assert sys.gettrace() is not None
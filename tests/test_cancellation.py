@@ -0,0 +1,39 @@
+import asyncio
+import threading
+
+import pytest
+
+from tests.algorithms import LOOPING_ALGO
+from utils.budget_helper import default_budget
+from utils.cancellation_helper import CancellationToken, GenerationCancelled, run_with_token
+from utils.execution_helper import InProcessBackend, SandboxBackend
+from utils.sandbox_pool import SandboxPool, local_worker_command
+
+
+def test_cancelled_generation_stops_at_the_next_stage(registry, make_request):
+    token = CancellationToken()
+    parts = []
+
+    def on_part(part):
+        parts.append(part['type'])
+        if part['type'] == 'description':
+            token.cancel()
+
+    with pytest.raises(GenerationCancelled):
+        run_with_token(token, InProcessBackend().run, make_request(seed=1), registry, default_budget(), on_part)
+    assert parts == ['description']
+
+
+def test_cancelled_sandbox_job_kills_its_worker(registry, make_request):
+    pool = SandboxPool(local_worker_command(), size=1)
+    backend = SandboxBackend(pool)
+    token = CancellationToken()
+    try:
+        threading.Timer(0.5, token.cancel).start()
+        with pytest.raises(GenerationCancelled):
+            asyncio.run(backend.generate(make_request(LOOPING_ALGO, seed=1), registry, token=token))
+        assert pool.stats()['restarts'] == 1
+        result = asyncio.run(backend.generate(make_request(seed=1), registry))
+    finally:
+        backend.close()
+    assert len(result['subquestions']) == 2
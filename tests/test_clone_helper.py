@@ -0,0 +1,41 @@
+from question_generation.input.input_class import Input
+from question_generation.input.input_subclasses.composite.list_type import ListInput
+from question_generation.input.input_subclasses.primitive.int_type import IntInput
+from utils.clone_helper import clone_context, clone_value
+
+
+class CountsInput(dict, Input):
+    """An input that keeps its values in the dict itself, as user env code can."""
+
+    def __init__(self, counts=None):
+        super().__init__(counts or {'a': [1]})
+        self.total = sum(len(value) for value in self.values())
+
+
+def test_container_inputs_keep_their_contents():
+    counts = CountsInput({'a': [1], 'b': [2, 3]})
+    clone = clone_value(counts)
+    assert type(clone) is CountsInput
+    assert clone == counts and clone.total == 3
+    assert clone['b'] is not counts['b']
+
+
+def test_clone_keeps_aliasing():
+    shared = [1, [2]]
+    context = {'a': shared, 'b': shared, 'pair': (shared, shared)}
+    clone = clone_context(context)
+    assert clone['a'] is clone['b'] is clone['pair'][0] is clone['pair'][1]
+    assert clone['a'] is not shared and clone['a'][1] is not shared[1]
+    clone['a'][1].append(3)
+    assert shared == [1, [2]]
+
+
+def test_cloned_list_input_keeps_its_current_elements():
+    numbers = ListInput(input_list=[IntInput(3), IntInput(1), IntInput(2)])
+    numbers.sort()
+    clone = clone_value(numbers)
+    assert type(clone) is ListInput
+    assert [int(item) for item in clone] == [1, 2, 3]
+    assert clone.length == 3 and clone.element_type is IntInput
+    clone.reverse()
+    assert [int(item) for item in numbers] == [1, 2, 3]
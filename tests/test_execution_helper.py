@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from utils.execution_helper import (
+    ExecutionBackend, InProcessBackend, SandboxBackend, SubinterpreterBackend, SubquestionParts,
+    create_execution_backend, merge_subquestion_results, subinterpreters_supported,
+)
+
+
+class PartsBackend(ExecutionBackend):
+    """Runs each subquestion as its own part and fails the Output ones, like generate_question does."""
+    isolated_workers = True
+    parallel_subquestions = True
+
+    async def execute(self, request, registry, budget, token=None, on_part=None, question_context=True):
+        queryable = request.sub_questions[0].queryable
+        return {} if queryable == 'Output' else {'description': 'Sort', 'subquestions': [{'queryable': queryable}], 'seed': request.seed}
+
+
+class SplitBackend(InProcessBackend):
+    """Runs the parts of a request one after the other, in this thread, as isolated workers would run them."""
+    isolated_workers = True
+    parallel_subquestions = True
+
+    async def execute(self, request, registry, budget, token=None, on_part=None, question_context=True):
+        return self.run(request, registry, budget, on_part, question_context)
+
+
+def test_merge_keeps_request_order():
+    merged = merge_subquestion_results([{'seed': 1, 'subquestions': ['a']}, {'seed': 1, 'subquestions': ['b']}])
+    assert merged == {'seed': 1, 'subquestions': ['a', 'b']}
+
+
+def test_a_failed_part_fails_the_question(registry, make_request):
+    with pytest.raises(HTTPException) as failure:
+        asyncio.run(PartsBackend().generate(make_request(seed=1), registry))
+    assert failure.value.status_code == 500
+    assert 'subquestion 1' in failure.value.detail
+
+
+def test_split_question_matches_the_whole_one(registry, make_request):
+    request = make_request(seed=5)
+    # A subquestion on its own variable, which its part generates without the question's.
+    request.sub_questions.append(request.sub_questions[1].model_copy(update={'context': request.context}))
+    whole = asyncio.run(InProcessBackend().generate(request, registry))
+    assert len(whole['subquestions']) == 3
+    assert asyncio.run(SplitBackend().generate(request, registry)) == whole
+
+
+def test_split_question_streams_its_context_first():
+    sent = []
+    parts = SubquestionParts(sent.append)
+    parts.forwarder(2)({'type': 'subquestion', 'index': 0, 'subquestion': 'c'})
+    parts.forwarder(0)({'type': 'description', 'description': 'Sort'})
+    parts.forwarder(1)({'type': 'subquestion', 'index': 0, 'subquestion': 'b'})
+    parts.forwarder(0)({'type': 'svg', 'svg': '<svg/>'})
+    parts.forwarder(0)({'type': 'subquestion', 'index': 0, 'subquestion': 'a'})
+    assert [part['type'] for part in sent] == ['description', 'svg', 'subquestion', 'subquestion', 'subquestion']
+    assert [part['index'] for part in sent[2:]] == [0, 2, 1]
+
+
+def test_subinterpreter_jobs_match_inprocess_ones(registry, make_request):
+    # The same encoded jobs as in subinterpreters, run in threads of this interpreter.
+    backend = SubinterpreterBackend(1, executor_class=ThreadPoolExecutor)
+    try:
+        result = asyncio.run(backend.generate(make_request(seed=11), registry))
+    finally:
+        backend.close()
+    assert result == asyncio.run(InProcessBackend().generate(make_request(seed=11), registry))
+
+
+@pytest.mark.skipif(not subinterpreters_supported(), reason="needs the InterpreterPoolExecutor of Python 3.14")
+def test_subinterpreter_backend_generates(registry, make_request):
+    try:
+        backend = SubinterpreterBackend(1)
+    except Exception as e:
+        pytest.skip(f"the generation modules cannot be loaded in a subinterpreter: {e}")
+    try:
+        result = asyncio.run(backend.generate(make_request(seed=11), registry))
+    finally:
+        backend.close()
+    assert result == asyncio.run(InProcessBackend().generate(make_request(seed=11), registry))
+
+
+@pytest.mark.skipif(subinterpreters_supported(), reason="this Python has a subinterpreter pool")
+def test_subinterpreter_backend_falls_back_to_sandbox_workers():
+    backend = create_execution_backend('subinterpreter')
+    try:
+        assert isinstance(backend, SandboxBackend)
+    finally:
+        backend.close()
@@ -0,0 +1,48 @@
+import shutil
+
+import pytest
+
+from tests.algorithms import PRUNING_ALGO
+from utils.question_generation_helper import answer_query, generate_variable, process_query_result
+from utils.seed_helper import seeded
+from utils.user__code_helper import load_user_class
+from utils.variable_helper import get_query_dispatch, get_query_variables, load_queryable_state
+
+
+@pytest.mark.parametrize('topic, subtopic, code, queryables', [
+    ('Sort', 'merge_sort', None, ['Step', 'Output']),
+    ('', '', PRUNING_ALGO, ['Step', 'Output', 'Pruned']),
+    pytest.param(
+        'Adversarial_search', 'alpha-beta', None, ['Output', 'Pruned'],
+        marks=pytest.mark.skipif(shutil.which('dot') is None, reason="adversarial inputs are drawn with Graphviz"),
+    ),
+])
+def test_answers_from_the_shared_run_match_fresh_runs(registry, topic, subtopic, code, queryables):
+    cls = load_user_class(code) if code else registry.algo_classes[topic][subtopic]
+    arguments = {'input': {'length': 8}} if topic != 'Adversarial_search' else {}
+    with seeded(1):
+        outer = generate_variable(registry.algo_classes, topic, subtopic, arguments, {'input': 'IntInput'}, {}, '', userAlgoCode=code)
+    assert outer['run_context']
+    # Asked twice over: answering one subquestion must leave the shared state as the next one needs it.
+    for queryable in queryables * 2:
+        args = (queryable, {}, get_query_variables(cls, queryable), {})
+        with seeded(2):
+            shared = answer_query(outer['cls_instance'], outer['run_context'], *args)
+        with seeded(2):
+            fresh = process_query_result(cls(), outer['context'], *args)
+        assert shared[0] and shared[0] == fresh[0], queryable
+        assert shared[2] == fresh[2]
+
+
+def test_dispatch_tables_load_only_the_declared_state(registry):
+    cls = load_user_class(PRUNING_ALGO)
+    dispatch = get_query_dispatch(cls)
+    assert set(dispatch) == {'Output', 'Step', 'Pruned'}
+    assert dispatch['Pruned'].state_fields == ('nodes', 'pruned_edges')
+    assert get_query_dispatch(cls) is dispatch
+    with seeded(1):
+        outer = generate_variable(registry.algo_classes, '', '', {'input': {'length': 8}}, {'input': 'IntInput'}, {}, '', userAlgoCode=PRUNING_ALGO)
+    state = load_queryable_state(dispatch['Step'], outer['cls_instance'])
+    assert type(state) is dispatch['Step'].queryable
+    assert state.history is outer['cls_instance'].history
+    assert not hasattr(state, 'pruned_edges') and not hasattr(state, 'out')
@@ -0,0 +1,98 @@
+import os
+import time
+
+import pytest
+
+from tests.algorithms import PRINTING_ALGO, SORT_ALGO
+from utils.sandbox_pool import SandboxError, SandboxPool, SandboxWorker, local_worker_command
+from utils.sandbox_protocol import RESULT
+
+
+def worker_environ(worker: SandboxWorker, timeout: float = 5.0) -> dict:
+    """Read the environment of a worker, which can show as empty until its process has finished exec'ing."""
+    deadline = time.monotonic() + timeout
+    while True:
+        with open(f'/proc/{worker.process.pid}/environ', 'rb') as environ:
+            raw = environ.read()
+        if raw or time.monotonic() > deadline:
+            return dict(entry.decode().split('=', 1) for entry in raw.split(b'\0') if entry)
+        time.sleep(0.01)
+
+
+def test_workers_do_not_inherit_secrets(monkeypatch):
+    monkeypatch.setenv('MONGO_URI', 'mongodb://user:secret@db')
+    monkeypatch.setenv('API_TOKEN', 'secret')
+    worker = SandboxWorker(local_worker_command())
+    try:
+        environ = worker_environ(worker)
+    finally:
+        worker.close(timeout=1.0)
+    assert 'MONGO_URI' not in environ and 'API_TOKEN' not in environ
+    assert environ['PYTHON_DOTENV_DISABLED'] == '1'
+    assert environ['PATH'] == os.environ['PATH']
+
+
+def test_pool_replaces_a_dead_worker(make_request):
+    pool = SandboxPool(local_worker_command(), size=1)
+    try:
+        pool._idle.queue[0].process.kill()
+        with pytest.raises(SandboxError):
+            pool.run(make_request(seed=1).model_dump())
+        response = pool.run(make_request(seed=1).model_dump())
+    finally:
+        pool.close()
+    assert response['type'] == RESULT
+    assert pool.stats()['restarts'] == 1
+
+
+def test_pool_keeps_the_slot_of_a_worker_that_fails_to_restart(make_request, monkeypatch):
+    pool = SandboxPool(local_worker_command(), size=1, acquire_timeout=1.0)
+    try:
+        pool._idle.queue[0].process.kill()
+        with monkeypatch.context() as patch:
+            patch.setattr(pool, 'command', ['/nonexistent/python'])
+            with pytest.raises(SandboxError):
+                pool.run(make_request(seed=1).model_dump())
+            with pytest.raises(SandboxError, match="failed to start"):
+                pool.run(make_request(seed=1).model_dump())
+        response = pool.run(make_request(seed=1).model_dump())
+        idle = pool.stats()['idle']
+    finally:
+        pool.close()
+    assert response['type'] == RESULT
+    assert idle == 1
+
+
+def test_pool_replaces_a_worker_killed_after_it_answered(make_request):
+    pool = SandboxPool(local_worker_command(), size=1)
+    try:
+        worker = pool._idle.queue[0]
+        run = worker.run
+
+        def answer_then_time_out(*args, **kwargs):
+            # As when the kill timer fires between the final frame and its cancellation.
+            response = run(*args, **kwargs)
+            worker.kill()
+            return response
+
+        worker.run = answer_then_time_out
+        first = pool.run(make_request(seed=1).model_dump())
+        second = pool.run(make_request(seed=1).model_dump())
+    finally:
+        pool.close()
+    assert first['type'] == second['type'] == RESULT
+    assert first['result'] == second['result']
+    assert pool.stats()['restarts'] == 1
+
+
+def test_printed_frames_do_not_replace_the_result(make_request):
+    pool = SandboxPool(local_worker_command(), size=1)
+    try:
+        printing = pool.run(make_request(PRINTING_ALGO, seed=1).model_dump())
+        plain = pool.run(make_request(SORT_ALGO, seed=1).model_dump())
+    finally:
+        pool.close()
+    assert printing['type'] == RESULT
+    assert printing['result'] == plain['result'] and printing['result']['subquestions']
+    printed = ''.join(frame['data'] for frame in printing['output'] if frame['stream'] == 'stdout')
+    assert '"type": "result"' in printed
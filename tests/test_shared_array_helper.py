@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from config import Config
+from utils.shared_array_helper import SHARED_ARRAY_KEY, SHARED_ARRAY_PREFIX, SharedArrayWriter, read_shared_arrays
+
+
+def test_shared_arrays_round_trip():
+    value = {
+        'ints': list(range(-5, 100)),
+        'floats': [index / 3 for index in range(50)],
+        'nested': [{'values': [2 ** 40] * 20}],
+        'small': [1, 2],
+        'mixed': [1, 2.0] * 10,
+        'bools': [True] * 20,
+        'huge': [2 ** 70] * 20,
+    }
+    with SharedArrayWriter(min_items=10) as writer:
+        shared = writer.share(value)
+        manifest = writer.manifest()
+        assert shared['ints'] == {SHARED_ARRAY_KEY: 0} and shared['nested'][0]['values'] == {SHARED_ARRAY_KEY: 2}
+        assert shared['small'] == value['small'] and shared['mixed'] == value['mixed'] and shared['bools'] == value['bools']
+        assert len(manifest['arrays']) == 3
+        restored = read_shared_arrays(shared, manifest)
+    assert restored == value
+    assert type(restored['floats'][1]) is float
+    assert not os.path.exists(manifest['path'])
+
+
+def test_nothing_to_share_writes_no_file():
+    with SharedArrayWriter(min_items=10) as writer:
+        assert writer.share({'small': [1, 2]}) == {'small': [1, 2]}
+        assert writer.manifest() is None
+
+
+def test_refuses_to_map_files_outside_the_shared_array_dir(tmp_path):
+    outside = tmp_path / f'{SHARED_ARRAY_PREFIX}stolen'
+    outside.write_bytes(b'\0' * 8)
+    manifest = {'path': str(outside), 'arrays': [{'format': 'q', 'offset': 0, 'length': 1}]}
+    with pytest.raises(ValueError, match="Refusing to map"):
+        read_shared_arrays({'data': {SHARED_ARRAY_KEY: 0}}, manifest)
+
+
+def test_refuses_files_it_did_not_write():
+    inside = os.path.join(Config.SHARED_ARRAY_DIR, f'other-{os.getpid()}')
+    with open(inside, 'wb') as stream:
+        stream.write(b'\0' * 8)
+    try:
+        with pytest.raises(ValueError, match="Refusing to map"):
+            read_shared_arrays({'data': {SHARED_ARRAY_KEY: 0}}, {'path': inside, 'arrays': []})
+    finally:
+        os.unlink(inside)
@@ -0,0 +1,47 @@
+import pytest
+
+from models.question_generation import StepTrace
+from question_generation.queryable.queryable_subclasses.step import Step
+from utils.step_trace_helper import MONITORING, run_algo
+
+
+class RunningTotal(Step):
+    def algo(self, values):
+        total = 0
+        for value in values:
+            total += value
+        return total
+
+
+def test_each_loop_iteration_is_a_step():
+    for _ in range(2):
+        instance = RunningTotal()
+        assert run_algo(instance, {'values': [1, 2, 3]}, StepTrace(variables=['total'])) == 6
+        assert instance.history['value'] == [1, 3, 6]
+
+
+@pytest.mark.skipif(MONITORING is None, reason="sys.monitoring needs Python 3.12")
+def test_tracing_leaves_the_events_of_other_tools_alone():
+    run_algo(RunningTotal(), {'values': [1]}, StepTrace(variables=['total']))
+    tool_id = next(tool_id for tool_id in range(6) if MONITORING.get_tool(tool_id) is None)
+    code = RunningTotal.algo.__code__
+    lines = []
+
+    def disable_after_first(code, line_number):
+        lines.append(line_number)
+        return MONITORING.DISABLE
+
+    MONITORING.use_tool_id(tool_id, 'test')
+    try:
+        MONITORING.register_callback(tool_id, MONITORING.events.LINE, disable_after_first)
+        MONITORING.set_local_events(tool_id, code, MONITORING.events.LINE)
+        run_algo(RunningTotal(), {'values': [1, 2]})
+        seen = len(lines)
+        instance = RunningTotal()
+        run_algo(instance, {'values': [1, 2]}, StepTrace(variables=['total']))
+        assert instance.history['value'] == [1, 3]
+        assert len(lines) == seen
+    finally:
+        MONITORING.set_local_events(tool_id, code, MONITORING.events.NO_EVENTS)
+        MONITORING.register_callback(tool_id, MONITORING.events.LINE, None)
+        MONITORING.free_tool_id(tool_id)
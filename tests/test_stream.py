@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+from models.execution_budget import ExecutionBudget
+from tests.algorithms import LOOPING_ALGO
+from utils.budget_helper import default_budget
+from utils.cancellation_helper import CancellationToken
+from utils.execution_helper import InProcessBackend
+from utils.stream_helper import stream_question
+
+
+def stream(request, registry, budget=None):
+    async def frames():
+        return [json.loads(line) async for line in stream_question(InProcessBackend(), request, registry, budget or default_budget(), CancellationToken())]
+    return asyncio.run(frames())
+
+
+def test_frames_come_in_question_order(make_request, registry):
+    frames = stream(make_request(seed=3), registry)
+    types = [frame['type'] for frame in frames]
+    assert types[0] == 'description'
+    assert types[-1] == 'summary'
+    assert [frame['index'] for frame in frames if frame['type'] == 'subquestion'] == [0, 1]
+    assert frames[-1]['seed'] == 3 and frames[-1]['subquestions'] == 2
+
+def test_frames_add_up_to_the_generated_question(make_request, registry):
+    frames = stream(make_request(seed=3), registry)
+    question = asyncio.run(InProcessBackend().generate(make_request(seed=3), registry))
+    assert frames[0]['description'] == question['description']
+    assert [frame['subquestion'] for frame in frames if frame['type'] == 'subquestion'] == json.loads(json.dumps(question['subquestions']))
+
+def test_budget_overrun_ends_the_stream_with_an_error_frame(make_request, registry):
+    frames = stream(make_request(LOOPING_ALGO, seed=3), registry, ExecutionBudget(wall_seconds=0.5))
+    assert 'summary' not in [frame['type'] for frame in frames]
+    assert frames[-1]['type'] == 'error'
+    assert frames[-1]['status_code'] == 422
+    assert frames[-1]['detail']['limit'] == 'wall_seconds'
+
+def test_failed_generation_ends_the_stream_with_an_error_frame(make_request, registry):
+    broken = make_request(seed=3)
+    broken.context.selectedSubtopic = 'no_such_algorithm'
+    frames = stream(broken, registry)
+    assert frames[-1]['type'] == 'error'
+    assert frames[-1]['status_code'] == 500
+
+def test_route_sends_server_sent_events(client, make_request):
+    response = client.post('/question_generation/generate/stream', json=make_request(seed=3).model_dump(), headers={'accept': 'text/event-stream'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/event-stream')
+    events = [block.split('\n')[0] for block in response.text.strip().split('\n\n')]
+    assert events[0] == 'event: description' and events[-1] == 'event: summary'
@@ -0,0 +1,38 @@
+import gc
+
+from question_generation.input.input_subclasses.composite.list_type import ListInput
+from question_generation.input.input_class import Input
+from tests.algorithms import SORT_ALGO
+from utils.subclass_registry import SUBCLASS_REGISTRY
+from utils.user__code_helper import load_user_class, new_user_namespace
+
+SHADOWING_CODE = """
+from question_generation.input.input_subclasses.composite.list_type import ListInput as BuiltinListInput
+
+class ListInput(BuiltinListInput):
+    pass
+
+SpoofedListInput = type('ListInput', (BuiltinListInput,), {'__module__': BuiltinListInput.__module__})
+"""
+
+
+def test_user_code_cannot_shadow_a_builtin_class():
+    namespace = new_user_namespace()
+    exec(SHADOWING_CODE, namespace)
+    assert SUBCLASS_REGISTRY.find(Input, 'ListInput') is ListInput
+
+
+def test_user_classes_are_found_by_their_own_names():
+    namespace = new_user_namespace()
+    exec("from question_generation.input.input_class import Input\nclass TreeOfLists(Input):\n    pass\n", namespace)
+    assert SUBCLASS_REGISTRY.find(Input, 'TreeOfLists') is namespace['TreeOfLists']
+
+
+def test_classes_of_user_code_leave_the_index_once_collected():
+    load_user_class(SORT_ALGO)
+    gc.collect()
+    size = SUBCLASS_REGISTRY.index_size()
+    for _ in range(200):
+        load_user_class(SORT_ALGO)
+    gc.collect()
+    assert SUBCLASS_REGISTRY.index_size() == size
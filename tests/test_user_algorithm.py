@@ -0,0 +1,24 @@
+import time
+
+from models.execution_budget import ExecutionBudget
+from models.user_algorithm import UserAlgorithm
+from tests.algorithms import SORT_ALGO
+from utils.user_algorithm_helper import COMPILE_STATUS_COMPILED, COMPILE_STATUS_FAILED, compile_user_algorithm
+
+
+def algorithm(code: str) -> UserAlgorithm:
+    # Built without validation: documents cannot be created before beanie is initialised.
+    return UserAlgorithm.model_construct(user_id='user', topic='Sort', subtopic='custom', processor_class_code=code, execution_budget=None)
+
+
+def test_module_level_infinite_loop_fails_the_compilation_under_budget():
+    started = time.monotonic()
+    compiled = compile_user_algorithm(algorithm("while True:\n    pass\n"), ExecutionBudget(wall_seconds=0.5))
+    assert compiled.compile_status == COMPILE_STATUS_FAILED
+    assert 'wall_seconds' in compiled.compile_error
+    assert time.monotonic() - started < 5
+
+def test_valid_algorithm_compiles():
+    compiled = compile_user_algorithm(algorithm(SORT_ALGO))
+    assert compiled.compile_status == COMPILE_STATUS_COMPILED
+    assert compiled.compile_error is None
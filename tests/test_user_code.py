@@ -0,0 +1,64 @@
+import threading
+import time
+
+from utils.conversion_helper import deserialize_function
+from utils.lru_cache import LRUCache
+from utils.user__code_helper import USER_CODE_CACHE, load_user_class
+
+STATEFUL_ALGO = """
+calls = []
+
+class Counter:
+    instances = 0
+
+    def algo(self, value):
+        calls.append(value)
+        Counter.instances += 1
+        return len(calls), Counter.instances
+"""
+
+STATEFUL_FUNCTION = """
+def remember(value, seen=[]):
+    seen.append(value)
+    return len(seen)
+"""
+
+
+def test_each_load_gets_its_own_classes_and_globals():
+    first = load_user_class(STATEFUL_ALGO)
+    hits = USER_CODE_CACHE.hits
+    second = load_user_class(STATEFUL_ALGO)
+    assert USER_CODE_CACHE.hits == hits + 1
+    assert first is not second
+    assert first().algo(1) == (1, 1)
+    assert second().algo(1) == (1, 1)
+
+
+def test_deserialized_functions_do_not_share_state():
+    assert deserialize_function(STATEFUL_FUNCTION)(1) == 1
+    assert deserialize_function(STATEFUL_FUNCTION)(1) == 1
+
+
+def test_concurrent_misses_create_once():
+    cache = LRUCache(maxsize=4)
+    created = []
+    start = threading.Barrier(8)
+
+    def factory():
+        created.append(1)
+        time.sleep(0.05)
+        return object()
+
+    def load(results):
+        start.wait()
+        results.append(cache.get_or_create('key', factory))
+
+    results = []
+    threads = [threading.Thread(target=load, args=(results,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert len({id(result) for result in results}) == 1
+    assert not cache._creating
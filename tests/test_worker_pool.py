@@ -0,0 +1,33 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from utils.worker_pool import WorkerPool
+
+
+def exit_worker(registry):
+    os._exit(1)
+
+def echo(registry, value):
+    return value
+
+
+def test_process_pool_recovers_after_a_worker_dies():
+    pool = WorkerPool('process', 1)
+    try:
+        assert pool.submit(echo, None, 'before').result(timeout=60) == 'before'
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(exit_worker, None).result(timeout=60)
+        assert pool.submit(echo, None, 'after').result(timeout=60) == 'after'
+        assert pool.stats()['restarts'] == 1
+    finally:
+        pool.close()
+
+def test_thread_pool_passes_the_registry():
+    pool = WorkerPool('thread', 1)
+    try:
+        assert pool.submit(echo, 'registry', 'value').result(timeout=10) == 'value'
+        assert pool.submit(lambda registry: registry, 'registry').result(timeout=10) == 'registry'
+    finally:
+        pool.close()
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from config import Config
+from models.execution_budget import ExecutionBudget
+from models.question_generation import GenerateBatchRequest, GenerateQuestionRequest
+from utils.budget_helper import BudgetExceededError
+from utils.cancellation_helper import CancellationToken
+from utils.execution_helper import ExecutionBackend, generation_error
+from utils.registry_helper import ClassRegistry
+from utils.seed_helper import derive_seed, new_seed
+from utils.stream_helper import FrameEncoder, ndjson_line
+
+
+def batch_seeds(request: GenerateBatchRequest, max_variants: int = Config.BATCH_MAX_VARIANTS) -> Tuple[Optional[int], List[int]]:
+    """
+    Return the seed of a batch and the seeds of its variants.
+
+    Variants counted with `count` derive their seeds from the seed of the
+    template, drawn at random when it has none, so a batch is reproducible from
+    the seed it reports. Variants listed with `seeds` use them as given.
+    """
+    if (request.count is None) == (request.seeds is None):
+        raise ValueError("A batch needs either a count or a list of seeds")
+    count = request.count if request.seeds is None else len(request.seeds)
+    if count < 1:
+        raise ValueError("A batch needs at least one variant")
+    if count > max_variants:
+        raise ValueError(f"A batch has at most {max_variants} variants, got {count}")
+    if request.seeds is not None:
+        return None, list(request.seeds)
+    batch_seed = request.template.seed if request.template.seed is not None else new_seed()
+    return batch_seed, [derive_seed(batch_seed, 'variant', index) for index in range(count)]
+
+async def generate_variant(
+    backend: ExecutionBackend,
+    template: GenerateQuestionRequest,
+    index: int,
+    seed: int,
+    registry: ClassRegistry,
+    budget: ExecutionBudget,
+    token: Optional[CancellationToken] = None
+) -> Dict[str, Any]:
+    """
+    Generate one variant of a template and return its outcome.
+
+    A failed variant reports its error the way /generate would have, with its
+    status code, instead of failing the batch. Only cancellation propagates.
+    """
+    outcome: Dict[str, Any] = {'index': index, 'seed': seed}
+    started = time.perf_counter()
+    try:
+        question = await backend.generate(template.model_copy(update={'seed': seed}), registry, budget, token)
+        if not question:
+            raise HTTPException(status_code=500, detail="Question generation failed")
+        outcome['question'] = question
+    except (BudgetExceededError, Exception) as e:
+        outcome['error'] = generation_error(e)
+    outcome['elapsed'] = round(time.perf_counter() - started, 6)
+    return outcome
+
+async def generate_batch(
+    backend: ExecutionBackend,
+    template: GenerateQuestionRequest,
+    seeds: List[int],
+    registry: ClassRegistry,
+    budget: ExecutionBudget,
+    token: Optional[CancellationToken] = None,
+    concurrency: int = Config.BATCH_CONCURRENCY
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate a variant of `template` per seed and yield each outcome as it finishes.
+
+    The first variant runs alone, so that it resolves the classes, introspects
+    them and compiles the user code of the template once, into the caches the
+    other variants then hit. The rest run `concurrency` at a time on backends
+    with isolated workers. The threads of the other backends share one random
+    state and the GIL, so their variants run one at a time and stay
+    reproducible from their seeds. Each variant runs under the whole budget.
+
+    Args:
+        backend (ExecutionBackend): Where the variants are generated.
+        template (GenerateQuestionRequest): The request every variant is generated from.
+        seeds (List[int]): The seed of each variant.
+        registry (ClassRegistry): The classes to generate from.
+        budget (ExecutionBudget): The budget of each variant.
+        token (Optional[CancellationToken]): Cancels the variants not finished yet.
+        concurrency (int): How many variants run at once on isolated workers.
+
+    Yields:
+        Dict[str, Any]: The outcome of each variant, in the order they finish.
+    """
+    if not seeds:
+        return
+    yield await generate_variant(backend, template, 0, seeds[0], registry, budget, token)
+    semaphore = asyncio.Semaphore(max(1, concurrency) if backend.isolated_workers else 1)
+
+    async def run(index: int, seed: int) -> Dict[str, Any]:
+        async with semaphore:
+            return await generate_variant(backend, template, index, seed, registry, budget, token)
+
+    tasks = [asyncio.ensure_future(run(index, seed)) for index, seed in enumerate(seeds[1:], 1)]
+    try:
+        for next_outcome in asyncio.as_completed(tasks):
+            yield await next_outcome
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def batch_summary(batch_seed: Optional[int], count: int, failed: int, elapsed: float) -> Dict[str, Any]:
+    return {
+        'seed': batch_seed,
+        'count': count,
+        'succeeded': count - failed,
+        'failed': failed,
+        'elapsed': round(elapsed, 6),
+    }
+
+async def collect_batch(batch_seed: Optional[int], variants: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """Wait for every variant of a batch and return them in seed order, after the summary of the batch."""
+    started = time.perf_counter()
+    outcomes = [outcome async for outcome in variants]
+    outcomes.sort(key=lambda outcome: outcome['index'])
+    failed = sum(1 for outcome in outcomes if 'error' in outcome)
+    return {**batch_summary(batch_seed, len(outcomes), failed, time.perf_counter() - started), 'variants': outcomes}
+
+async def stream_batch(batch_seed: Optional[int], variants: AsyncIterator[Dict[str, Any]], token: CancellationToken, encode: FrameEncoder = ndjson_line) -> AsyncIterator[str]:
+    """
+    Stream a batch, as newline-delimited JSON by default.
+
+    A variant frame is sent as soon as each variant finishes and a summary frame
+    ends the stream. Variants are not kept once sent. When the client goes away
+    the variants not finished yet are cancelled.
+    """
+    started = time.perf_counter()
+    count = failed = 0
+    try:
+        async for outcome in variants:
+            count += 1
+            failed += 'error' in outcome
+            yield encode({'type': 'variant', **outcome})
+        yield encode({'type': 'summary', **batch_summary(batch_seed, count, failed, time.perf_counter() - started)})
+    finally:
+        token.cancel()
+        await variants.aclose()
@@ -0,0 +1,249 @@
+import math
+import resource
+import signal
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from config import Config
+from models.execution_budget import ExecutionBudget
+from utils.user__code_helper import USER_MODULE_PREFIX
+
+MEGABYTE = 1024 * 1024
+# How often the resident memory of a worker is sampled, in seconds.
+MEMORY_CHECK_INTERVAL = 0.01
+# The address space limit, as a multiple of the memory budget, stopping allocations too fast to be sampled.
+ADDRESS_SPACE_FACTOR = 2
+# How many traced user code events run between two checks of the wall-clock and CPU deadlines.
+DEADLINE_CHECK_INTERVAL = 1000
+
+CURRENT_STAGE: ContextVar[str] = ContextVar('budget_stage', default='generate')
+
+
+class BudgetExceededError(BaseException):
+    """
+    Raised when a generation runs out of one of its execution budgets.
+
+    It derives from BaseException so that the broad `except Exception` clauses
+    of the generation pipeline, and of user code, cannot swallow it.
+    """
+
+    def __init__(self, limit: str, value: Optional[float], stage: Optional[str] = None):
+        self.limit = limit
+        self.value = value
+        self.stage = stage or CURRENT_STAGE.get()
+        super().__init__(f"Execution budget exceeded: {limit}={value} during {self.stage}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'error': 'budget_exceeded', 'stage': self.stage, 'limit': self.limit, 'value': self.value}
+
+    def __reduce__(self):
+        # Raised in worker processes and re-raised in the API by concurrent.futures.
+        return (self.__class__, (self.limit, self.value, self.stage))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BudgetExceededError':
+        return cls(data['limit'], data.get('value'), data.get('stage'))
+
+
+def default_budget() -> ExecutionBudget:
+    """The budget configured for the whole deployment."""
+    return ExecutionBudget(
+        cpu_seconds=Config.BUDGET_CPU_SECONDS,
+        wall_seconds=Config.BUDGET_WALL_SECONDS,
+        memory_mb=Config.BUDGET_MEMORY_MB,
+        instructions=Config.BUDGET_INSTRUCTIONS,
+    )
+
+def merge_budgets(*budgets: Optional[ExecutionBudget]) -> ExecutionBudget:
+    """
+    Combine budgets, keeping the lowest value set for each limit.
+
+    Unset and zero limits are not enforced, so they never win. A user or
+    algorithm budget can therefore tighten the configured one, never lift it.
+    """
+    limits: Dict[str, Any] = {}
+    for budget in budgets:
+        if budget is None:
+            continue
+        for name, value in budget.model_dump().items():
+            if value:
+                limits[name] = min(limits[name], value) if name in limits else value
+    return ExecutionBudget(**limits)
+
+@contextmanager
+def budget_stage(name: str) -> Iterator[None]:
+    """Name the generation stage reported when a budget runs out inside the block."""
+    token = CURRENT_STAGE.set(name)
+    try:
+        yield
+    finally:
+        CURRENT_STAGE.reset(token)
+
+def is_user_frame(frame: Any) -> bool:
+    return frame.f_globals.get('__name__', '').startswith(USER_MODULE_PREFIX)
+
+def instruction_tracer(instructions: Optional[int], wall_seconds: Optional[float], cpu_seconds: Optional[float] = None):
+    """
+    Return a trace function enforcing a budget on the user code a thread runs.
+
+    Only frames of code compiled from user sources are traced: opcode by opcode
+    when instructions are counted, line by line otherwise. The wall-clock
+    deadline and the CPU time of the thread are checked every
+    DEADLINE_CHECK_INTERVAL events.
+    """
+    executed = 0
+    deadline = time.monotonic() + wall_seconds if wall_seconds else None
+    cpu_deadline = time.thread_time() + cpu_seconds if cpu_seconds else None
+    counted_event = 'opcode' if instructions else 'line'
+    opcodes_enabled = False
+
+    def trace_events(frame: Any, event: str, arg: Any):
+        nonlocal executed
+        if event == counted_event:
+            executed += 1
+            if instructions and executed > instructions:
+                raise BudgetExceededError('instructions', instructions)
+            if executed % DEADLINE_CHECK_INTERVAL == 0:
+                if deadline and time.monotonic() > deadline:
+                    raise BudgetExceededError('wall_seconds', wall_seconds)
+                if cpu_deadline and time.thread_time() > cpu_deadline:
+                    raise BudgetExceededError('cpu_seconds', cpu_seconds)
+        return trace_events
+
+    def trace_calls(frame: Any, event: str, arg: Any):
+        nonlocal opcodes_enabled
+        if event != 'call' or not is_user_frame(frame):
+            return None
+        if instructions:
+            frame.f_trace_opcodes = True
+            if not opcodes_enabled:
+                # From Python 3.12 settrace runs on sys.monitoring, which only starts sending
+                # the opcode events frames ask for once the trace function is set again.
+                opcodes_enabled = True
+                sys.settrace(sys.gettrace())
+        return trace_events
+
+    return trace_calls
+
+def memory_sizes() -> Tuple[int, int]:
+    """The address space and resident memory currently used by this process, in bytes."""
+    with open('/proc/self/statm') as statm:
+        size, resident = statm.read().split()[:2]
+    return int(size) * resource.getpagesize(), int(resident) * resource.getpagesize()
+
+def process_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+@contextmanager
+def traced_budget(budget: ExecutionBudget) -> Iterator[None]:
+    """
+    Enforce the instruction budget, and the wall-clock and CPU ones cooperatively, on user code run in the block.
+
+    This is the only enforcement threads of the API get, so it applies whenever
+    any of these limits is set and the block runs user code. Time spent in
+    native code called by user code, without returning to it, is only noticed
+    once it does.
+    """
+    if not (budget.instructions or budget.wall_seconds or budget.cpu_seconds):
+        yield
+        return
+    previous = sys.gettrace()
+    sys.settrace(instruction_tracer(budget.instructions, budget.wall_seconds, budget.cpu_seconds))
+    try:
+        yield
+    finally:
+        sys.settrace(previous)
+
+@contextmanager
+def process_budget(budget: ExecutionBudget) -> Iterator[None]:
+    """
+    Enforce the CPU, wall-clock and memory budgets on the whole process for the block.
+
+    CPU time is limited with RLIMIT_CPU and wall-clock time with an ITIMER_REAL
+    alarm, whose signals are turned into BudgetExceededError. Linux does not
+    enforce RLIMIT_RSS, so resident memory is sampled by a watchdog thread that
+    signals the main thread once it grows by more than the budget; RLIMIT_AS,
+    set to a multiple of the budget, stops allocations too large or too fast to
+    be sampled. Signals can only be handled on the main thread, so this is meant
+    for dedicated worker processes, not for the API process.
+    """
+    def exceed_cpu(signum: int, frame: Any) -> None:
+        raise BudgetExceededError('cpu_seconds', budget.cpu_seconds)
+
+    def exceed_wall(signum: int, frame: Any) -> None:
+        raise BudgetExceededError('wall_seconds', budget.wall_seconds)
+
+    def exceed_memory(signum: int, frame: Any) -> None:
+        raise BudgetExceededError('memory_mb', budget.memory_mb)
+
+    def watch_memory(limit: int, main_thread: int) -> None:
+        while not stop_watching.wait(MEMORY_CHECK_INTERVAL):
+            if memory_sizes()[1] > limit:
+                signal.pthread_kill(main_thread, signal.SIGUSR1)
+                return
+
+    previous_limits = {}
+    previous_handlers = {}
+    stop_watching = threading.Event()
+    try:
+        if budget.cpu_seconds:
+            previous_limits[resource.RLIMIT_CPU] = resource.getrlimit(resource.RLIMIT_CPU)
+            previous_handlers[signal.SIGXCPU] = signal.signal(signal.SIGXCPU, exceed_cpu)
+            soft = math.ceil(process_cpu_seconds() + budget.cpu_seconds)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, previous_limits[resource.RLIMIT_CPU][1]))
+        if budget.memory_mb:
+            size, resident = memory_sizes()
+            previous_limits[resource.RLIMIT_AS] = resource.getrlimit(resource.RLIMIT_AS)
+            soft = size + ADDRESS_SPACE_FACTOR * budget.memory_mb * MEGABYTE
+            resource.setrlimit(resource.RLIMIT_AS, (soft, previous_limits[resource.RLIMIT_AS][1]))
+            previous_handlers[signal.SIGUSR1] = signal.signal(signal.SIGUSR1, exceed_memory)
+            limit = resident + budget.memory_mb * MEGABYTE
+            threading.Thread(target=watch_memory, args=(limit, threading.main_thread().ident), daemon=True).start()
+        if budget.wall_seconds:
+            previous_handlers[signal.SIGALRM] = signal.signal(signal.SIGALRM, exceed_wall)
+            signal.setitimer(signal.ITIMER_REAL, budget.wall_seconds)
+        yield
+    except MemoryError:
+        if not budget.memory_mb:
+            raise
+        raise BudgetExceededError('memory_mb', budget.memory_mb)
+    finally:
+        stop_watching.set()
+        if budget.wall_seconds:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        for limit, value in previous_limits.items():
+            resource.setrlimit(limit, value)
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
+@contextmanager
+def apply_budget(budget: ExecutionBudget, process_limits: bool = True, user_code: bool = True) -> Iterator[None]:
+    """
+    Run the block under an execution budget.
+
+    The tracer only enforces limits in user code, and slows down every Python
+    call while it is set, so it is only set when the block runs user code.
+
+    Args:
+        budget (ExecutionBudget): The limits to enforce; unset or zero limits are not enforced.
+        process_limits (bool): Whether to also set process-wide limits and signal handlers.
+        user_code (bool): Whether the block runs user code (see runs_user_code).
+
+    Returns:
+        Iterator[None]: A context in which exceeding the budget raises BudgetExceededError.
+    """
+    with ExitStack() as stack:
+        if process_limits:
+            stack.enter_context(process_budget(budget))
+        if user_code:
+            stack.enter_context(traced_budget(budget))
+        yield
+
+def sandbox_kill_timeout(budget: ExecutionBudget, grace_seconds: float = 5.0) -> Optional[float]:
+    """How long the API waits for a sandbox worker before killing it, if the worker cannot stop itself."""
+    return budget.wall_seconds + grace_seconds if budget.wall_seconds else None
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, List, Optional
+
+from fastapi import Request
+
+from config import Config
+
+
+class GenerationCancelled(BaseException):
+    """
+    Raised in a generation whose client went away.
+
+    Like BudgetExceededError it derives from BaseException, so that the broad
+    `except Exception` clauses of the generation pipeline cannot swallow it.
+    """
+
+
+class CancellationToken:
+    """A flag a request sets when its client disconnects, checked by the generation between stages."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Call `callback` on cancellation, right away if the token is already cancelled."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise GenerationCancelled("Generation cancelled")
+
+
+CURRENT_TOKEN: ContextVar[Optional[CancellationToken]] = ContextVar('cancellation_token', default=None)
+
+
+def check_cancelled() -> None:
+    """Stop the current generation if its request has been cancelled."""
+    token = CURRENT_TOKEN.get()
+    if token is not None:
+        token.check()
+
+def run_with_token(token: Optional[CancellationToken], func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call `func` with `token` as the current cancellation token."""
+    reset = CURRENT_TOKEN.set(token)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        CURRENT_TOKEN.reset(reset)
+
+async def watch_disconnect(request: Request, token: CancellationToken, interval: float) -> None:
+    while not token.cancelled:
+        if await request.is_disconnected():
+            token.cancel()
+            return
+        await asyncio.sleep(interval)
+
+async def cancel_on_disconnect(request: Request, token: CancellationToken, work: Awaitable[Any], interval: float = Config.DISCONNECT_POLL_INTERVAL) -> Any:
+    """
+    Await `work`, cancelling `token` if the client of `request` disconnects first.
+
+    Args:
+        request (Request): The request whose client is watched.
+        token (CancellationToken): The token the work checks.
+        work (Awaitable[Any]): The generation to run.
+        interval (float): Seconds between two checks of the connection.
+
+    Returns:
+        Any: What `work` returned.
+    """
+    watcher = asyncio.create_task(watch_disconnect(request, token, interval))
+    try:
+        return await work
+    finally:
+        watcher.cancel()
@@ -0,0 +1,62 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, List, Mapping
+
+from fastapi import Request, Response
+
+from config import Config
+from utils.topics_helper import list_keys
+
+CATALOG_MEDIA_TYPE = 'application/json'
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """A catalog response serialized once, with its strong ETag."""
+    body: bytes
+    etag: str
+
+
+def build_catalog_entry(content: Any) -> CatalogEntry:
+    """Serialize the content canonically and fingerprint it."""
+    body = json.dumps(content, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return CatalogEntry(body=body, etag=f'"{hashlib.sha256(body).hexdigest()}"')
+
+
+def build_catalog(algo_tree: Mapping[str, Any], input_tree: Mapping[str, Any], quantifiables: List[str]) -> Mapping[str, CatalogEntry]:
+    """Build the algo, input and quantifiable catalogs served to the frontend."""
+    return MappingProxyType({
+        'algos': build_catalog_entry(list_keys(algo_tree)),
+        'input': build_catalog_entry(list_keys(input_tree)),
+        'quantifiables': build_catalog_entry(sorted(quantifiables)),
+    })
+
+
+def fingerprint_catalog(catalog: Mapping[str, CatalogEntry]) -> str:
+    """Return a fingerprint covering every catalog entry."""
+    digest = hashlib.sha256()
+    for name in sorted(catalog):
+        digest.update(name.encode('utf-8'))
+        digest.update(catalog[name].etag.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag."""
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+def catalog_response(request: Request, entry: CatalogEntry, fingerprint: str) -> Response:
+    """Return the serialized catalog, or 304 when the client already holds it."""
+    headers = {
+        'ETag': entry.etag,
+        'Cache-Control': f"public, max-age={Config.CATALOG_MAX_AGE}",
+        'X-Catalog-Fingerprint': fingerprint,
+    }
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type=CATALOG_MEDIA_TYPE, headers=headers)
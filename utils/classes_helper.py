@@ -3,10 +3,10 @@ import importlib
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Type
 
-from question_generation.input.input_subclasses.custom.adversarial_problem.adversarial_env import AdversarialEnv
-from question_generation.input.input_subclasses.custom.graph.adjacency_list import AdjacencyListInput
 from utils.types_helper import GeneratedQuestionClassType
 from utils.exceptions import handle_exceptions
+from utils.metadata_cache import cached_class_metadata
+from utils.subclass_registry import SUBCLASS_REGISTRY
 
 
 @handle_exceptions
@@ -52,6 +52,7 @@ def traverse_path(path: Dict[str, Any], classes: Dict[str, Any]) -> Any:
                 return classes[key].get(subpath)
     return None
 
+@cached_class_metadata
 def get_class_path(cls: Type) -> Optional[Dict[str, str]]:
     """
     Get the input path for a given class.
@@ -94,6 +95,8 @@ def get_class_path(cls: Type) -> Optional[Dict[str, str]]:
 
 def get_all_subclasses(cls) -> List[Type]:
     """Recursively get all subclasses of a given class."""
+    if SUBCLASS_REGISTRY.is_tracked(cls):
+        return SUBCLASS_REGISTRY.get_subclasses(cls)
     subclasses = set(cls.__subclasses__())
     for subclass in cls.__subclasses__():
         subclasses.update(get_all_subclasses(subclass))
@@ -125,3 +128,9 @@ def get_input_class(input_path: Dict[str, Any], input_classes: Dict[str, Dict[st
 
 def get_matching_class(subclasses, name):
     return next((cls for cls in subclasses if cls.__name__ == name), None)
+
+def find_subclass(cls: Type, name: str) -> Optional[Type]:
+    """Return the subclass of `cls` with the given name, using the subclass registry when possible."""
+    if SUBCLASS_REGISTRY.is_tracked(cls):
+        return SUBCLASS_REGISTRY.find(cls, name)
+    return get_matching_class(get_all_subclasses(cls), name)
@@ -0,0 +1,168 @@
+import copy
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from models.question_generation import GenerateQuestionRequest
+from utils.clone_helper import deepcopy_clones
+from utils.question_generation_helper import generate_question
+from utils.registry_helper import ClassRegistry, build_class_registry
+from utils.topics_helper import get_queryable_names
+from utils.variable_helper import get_algo_variables
+
+# Arguments for the inputs whose defaults generate nothing to run algo on.
+BENCHMARK_ARGUMENTS = {
+    'TabularDataInput': {
+        'columns': ['outlook', 'windy', 'play'],
+        'values': {'outlook': ['sunny', 'rainy', 'overcast'], 'windy': ['yes', 'no'], 'play': ['yes', 'no']},
+        'probs': {'outlook': [0.4, 0.4, 0.2], 'windy': [0.5, 0.5], 'play': [0.5, 0.5]},
+        'num_samples': 6,
+    },
+}
+
+
+@dataclass(frozen=True)
+class DeepcopyCount:
+    """Calls to copy.deepcopy, and objects they copied, in one generation of a subtopic."""
+    topic: str
+    subtopic: str
+    calls_before: int
+    calls_after: int
+    objects_before: int
+    objects_after: int
+    seconds_before: float
+    seconds_after: float
+
+    @property
+    def eliminated(self) -> int:
+        return self.calls_before - self.calls_after
+
+
+@contextmanager
+def count_deepcopies() -> Iterator[Dict[str, int]]:
+    """
+    Count the calls to copy.deepcopy in the block, and the objects they copied.
+
+    The copy module recurses through its own reference to deepcopy, so only
+    outer calls are counted; the objects they copied are counted from the
+    growth of their memo.
+    """
+    counts = {'calls': 0, 'objects': 0}
+    original = copy.deepcopy
+
+    def counting_deepcopy(value: Any, memo: Optional[Dict[int, Any]] = None, *args: Any) -> Any:
+        memo = {} if memo is None else memo
+        size = len(memo) - (id(memo) in memo)
+        try:
+            return original(value, memo, *args)
+        finally:
+            counts['calls'] += 1
+            # The memo also keeps the originals alive under its own id.
+            counts['objects'] += len(memo) - (id(memo) in memo) - size
+
+    copy.deepcopy = counting_deepcopy
+    try:
+        yield counts
+    finally:
+        copy.deepcopy = original
+
+
+def benchmark_request(topic: str, subtopic: str, cls: Any, number_of_options: int = 4, seed: int = 0) -> GenerateQuestionRequest:
+    """A question on the default inputs of a subtopic, with one subquestion per queryable."""
+    subclasses = {}
+    arguments = {}
+    for variable in get_algo_variables(cls):
+        if variable.get('subclasses'):
+            subclasses[variable['name']] = variable['subclasses'][0]['name']
+        type_name = subclasses.get(variable['name']) or getattr(variable['type'], '__name__', '')
+        if type_name in BENCHMARK_ARGUMENTS:
+            arguments[variable['name']] = BENCHMARK_ARGUMENTS[type_name]
+    context = {
+        'selectedTopic': topic,
+        'selectedSubtopic': subtopic,
+        'inputPath': {},
+        'selectedSubclasses': subclasses,
+        'selectedQuantifiables': {'input': 'IntInput'},
+        'arguments': arguments,
+        'inputArguments': {},
+        'argumentsInit': None,
+        'inputInit': None,
+        'userAlgoCode': None,
+        'userEnvCode': None,
+    }
+    sub_context = {**context, 'selectedTopic': '', 'selectedSubtopic': ''}
+    return GenerateQuestionRequest(
+        description='',
+        context=context,
+        seed=seed,
+        sub_questions=[
+            {
+                'description': '',
+                'queryable': queryable,
+                'inputQueryable': '',
+                'context': sub_context,
+                'questionDetails': {'marks': 1, 'number_of_options': number_of_options},
+                'userQueryableCode': None,
+            }
+            for queryable in get_queryable_names(cls)
+        ],
+    )
+
+
+def measure_generation(request: GenerateQuestionRequest, registry: ClassRegistry, repeat: int) -> Dict[str, float]:
+    with count_deepcopies() as counts:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            generate_question(request, registry.algo_classes, registry.input_classes)
+        seconds = time.perf_counter() - start
+    return {'calls': counts['calls'] // repeat, 'objects': counts['objects'] // repeat, 'seconds': seconds / repeat}
+
+
+def benchmark_deepcopies(registry: ClassRegistry, repeat: int = 5) -> List[DeepcopyCount]:
+    """
+    Generate a question per subtopic with cloning, then with deepcopy everywhere cloning is used.
+
+    Both runs share their seed, so they generate the same inputs and the
+    difference is what cloning saves.
+    """
+    counts = []
+    for topic, subtopics in registry.algo_classes.items():
+        for subtopic, cls in subtopics.items():
+            request = benchmark_request(topic, subtopic, cls)
+            with deepcopy_clones():
+                before = measure_generation(request, registry, repeat)
+            after = measure_generation(request, registry, repeat)
+            counts.append(DeepcopyCount(
+                topic,
+                subtopic,
+                before['calls'],
+                after['calls'],
+                before['objects'],
+                after['objects'],
+                round(before['seconds'], 4),
+                round(after['seconds'], 4),
+            ))
+    return counts
+
+
+def format_deepcopy_counts(counts: List[DeepcopyCount]) -> str:
+    """Render the deepcopy counts of each subtopic as a table."""
+    lines = [
+        f"{'topic':<20} {'subtopic':<24} {'calls before':>12} {'after':>6} {'eliminated':>10}"
+        f" {'objects before':>14} {'after':>6} {'ms before':>10} {'ms after':>9}"
+    ]
+    for count in counts:
+        lines.append(
+            f"{count.topic:<20} {count.subtopic:<24} {count.calls_before:>12} {count.calls_after:>6} {count.eliminated:>10}"
+            f" {count.objects_before:>14} {count.objects_after:>6} {count.seconds_before * 1000:>10.1f} {count.seconds_after * 1000:>9.1f}"
+        )
+    return '\n'.join(lines)
+
+
+def deepcopy_report(counts: List[DeepcopyCount]) -> List[Dict[str, Any]]:
+    return [{**asdict(count), 'eliminated': count.eliminated} for count in counts]
+
+
+if __name__ == "__main__":
+    print(format_deepcopy_counts(benchmark_deepcopies(build_class_registry())))
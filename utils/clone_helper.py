@@ -0,0 +1,84 @@
+import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import BuiltinFunctionType, FunctionType, MethodType
+from typing import Any, Dict, Iterator, Optional
+from uuid import UUID
+
+from question_generation.input.input_class import Input
+
+# Values of these types, and of their subclasses such as IntInput or StringInput, are never copied.
+SHARED_TYPES = (type(None), bool, int, float, complex, str, bytes, frozenset, range, type, UUID, FunctionType, BuiltinFunctionType)
+
+# Inputs that subclass these keep their contents outside __dict__, where Input.clone cannot see them.
+CONTAINER_TYPES = (list, dict, set, bytearray)
+
+# Set by the deepcopy benchmark, to measure what cloning saves.
+CLONE_WITH_DEEPCOPY: ContextVar[bool] = ContextVar('clone_with_deepcopy', default=False)
+
+
+def clone_value(value: Any, memo: Optional[Dict[int, Any]] = None) -> Any:
+    """
+    Copy a generated value for a run of algo to mutate, without deepcopy where possible.
+
+    Immutable values are shared, builtin containers are rebuilt, inputs use
+    their `clone` method, and anything else falls back to deepcopy, as do
+    inputs that subclass a builtin container without a `clone` of their own. As with
+    deepcopy, `memo` keeps objects referenced twice shared in the copy.
+
+    Args:
+        value (Any): The value to copy.
+        memo (Optional[Dict[int, Any]]): The copies made so far, by id of the original.
+
+    Returns:
+        Any: The copy.
+    """
+    if CLONE_WITH_DEEPCOPY.get():
+        return copy.deepcopy(value, memo)
+    if isinstance(value, SHARED_TYPES):
+        return value
+    if memo is None:
+        memo = {}
+    key = id(value)
+    if key in memo:
+        return memo[key]
+    value_type = type(value)
+    if value_type is list:
+        clone = memo[key] = []
+        clone.extend(clone_value(item, memo) for item in value)
+    elif value_type is dict:
+        clone = memo[key] = {}
+        clone.update((item_key, clone_value(item, memo)) for item_key, item in value.items())
+    elif value_type is tuple:
+        clone = memo[key] = tuple(clone_value(item, memo) for item in value)
+    elif value_type is set:
+        clone = memo[key] = {clone_value(item, memo) for item in value}
+    elif value_type is MethodType:
+        clone = memo[key] = MethodType(value.__func__, clone_value(value.__self__, memo))
+    elif isinstance(value, Input) and not (isinstance(value, CONTAINER_TYPES) and value_type.clone is Input.clone):
+        clone = value.clone(memo)
+    else:
+        clone = copy.deepcopy(value, memo)
+    return clone
+
+def clone_attributes(value: Any, memo: Optional[Dict[int, Any]] = None) -> Any:
+    """Create an instance of the class of `value` without calling __init__ and clone its attributes into it."""
+    memo = {} if memo is None else memo
+    cls = type(value)
+    clone = memo[id(value)] = cls.__new__(cls)
+    clone.__dict__.update((name, clone_value(attribute, memo)) for name, attribute in value.__dict__.items())
+    return clone
+
+def clone_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Clone the generated arguments of algo, keeping values shared between arguments shared."""
+    memo: Dict[int, Any] = {}
+    return {name: clone_value(value, memo) for name, value in context.items()}
+
+@contextmanager
+def deepcopy_clones() -> Iterator[None]:
+    """Make clone_value deepcopy everything in the block, as the pipeline did before inputs could be cloned."""
+    reset = CLONE_WITH_DEEPCOPY.set(True)
+    try:
+        yield
+    finally:
+        CLONE_WITH_DEEPCOPY.reset(reset)
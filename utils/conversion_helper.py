@@ -1,4 +1,9 @@
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
+
+from config import Config
+from utils.lru_cache import LRUCache
+
+FUNCTION_CACHE = LRUCache(maxsize=Config.USER_CODE_CACHE_SIZE)
 
 def convert_keys(value: Dict[Any, List[Any]]) -> Dict[Any, List[Any]]:
     """
@@ -17,15 +22,20 @@ def deserialize_function(func_str: str) -> Callable:
     """
     Deserialize a function from its string representation.
 
+    Identical strings are compiled once, into FUNCTION_CACHE, and executed in fresh
+    namespaces, so deserialized functions never share their globals.
+
     Args:
         func_str (str): The string representation of the function.
 
     Returns:
         Callable: The deserialized function.
     """
-    func_dict = {}
-    global_namespace = {}
+    return exec_function(*FUNCTION_CACHE.get_or_create(func_str, lambda: compile_function(func_str)))
+
 
+def compile_function(func_str: str) -> Tuple[Any, Any]:
+    """Compile the import lines and the definition of a function string separately."""
     lines = func_str.strip().split("\n")
     import_lines, func_lines = [], []
 
@@ -36,8 +46,19 @@ def deserialize_function(func_str: str) -> Callable:
             func_lines.append(line)
 
     try:
-        exec("\n".join(import_lines), global_namespace)
-        exec("\n".join(func_lines), global_namespace, func_dict)
+        return compile("\n".join(import_lines), '<function>', 'exec'), compile("\n".join(func_lines), '<function>', 'exec')
+    except SyntaxError as e:
+        raise ValueError(f"Error executing function: {e}")
+
+
+def exec_function(import_code: Any, func_code: Any) -> Callable:
+    """Execute a compiled function definition and return the function it defines."""
+    func_dict = {}
+    global_namespace = {}
+
+    try:
+        exec(import_code, global_namespace)
+        exec(func_code, global_namespace, func_dict)
     except Exception as e:
         raise ValueError(f"Error executing function: {e}")
 
@@ -0,0 +1,367 @@
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from concurrent.futures import InterpreterPoolExecutor
+except ImportError:  # Python < 3.14
+    InterpreterPoolExecutor = None
+
+from fastapi import HTTPException
+
+from config import Config
+from models.execution_budget import ExecutionBudget
+from models.question_generation import GenerateQuestionRequest
+from utils.budget_helper import BudgetExceededError, apply_budget, default_budget, sandbox_kill_timeout
+from utils.cancellation_helper import CancellationToken, GenerationCancelled, run_with_token
+from utils.job_runner import decode_frames, prepare_interpreter, run_encoded_job
+from utils.question_generation_helper import generate_question, subquestion_seed
+from utils.registry_helper import ClassRegistry
+from utils.sandbox_pool import SandboxCancelled, SandboxError, SandboxPool, SandboxTimeout, docker_worker_command, local_worker_command
+from utils.sandbox_protocol import ERROR, JOB, PARTIAL, encode_frame
+from utils.seed_helper import new_seed
+from utils.shared_array_helper import SharedArrayWriter
+from utils.user__code_helper import runs_user_code
+from utils.worker_pool import WorkerPool
+
+EXECUTION_BACKENDS = ('inprocess', 'sandbox', 'subinterpreter', 'pool')
+
+
+def job_result(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the result of a final job frame, raising the budget or HTTP error it reports."""
+    if response.get('budget'):
+        raise BudgetExceededError.from_dict(response['budget'])
+    if response['type'] == ERROR:
+        raise HTTPException(status_code=response.get('status_code', 500), detail=response['error'])
+    return response['result']
+
+def generation_error(e: BaseException) -> Dict[str, Any]:
+    """Return the status code and detail /generate answers a failed generation with."""
+    if isinstance(e, BudgetExceededError):
+        return {'status_code': 422, 'detail': e.to_dict()}
+    if isinstance(e, HTTPException):
+        return {'status_code': e.status_code, 'detail': e.detail}
+    if isinstance(e, ValueError):
+        return {'status_code': 400, 'detail': str(e)}
+    return {'status_code': 500, 'detail': str(e)}
+
+def subinterpreters_supported() -> bool:
+    """Whether this Python has a subinterpreter pool, which it does from 3.14 on."""
+    return InterpreterPoolExecutor is not None
+
+def seeded_request(request: GenerateQuestionRequest) -> GenerateQuestionRequest:
+    """Return the request with a seed, drawing one if it has none."""
+    return request if request.seed is not None else request.model_copy(update={'seed': new_seed()})
+
+def subquestion_requests(request: GenerateQuestionRequest) -> List[GenerateQuestionRequest]:
+    """
+    Split a seeded request into one request per subquestion.
+
+    Each subquestion keeps the seed it would have had in the whole request, so
+    the parts generate what the request would have, subquestion by subquestion.
+    """
+    return [
+        request.model_copy(update={'sub_questions': [subquestion.model_copy(update={'seed': subquestion_seed(request.seed, index, subquestion)})]})
+        for index, subquestion in enumerate(request.sub_questions)
+    ]
+
+def merge_subquestion_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the results of the parts of a request, in request order; a failed part fails the question."""
+    for index, result in enumerate(results):
+        if not result:
+            raise HTTPException(status_code=500, detail=f"Question generation failed at subquestion {index}")
+    merged = dict(results[0])
+    merged['subquestions'] = [subquestion for result in results for subquestion in result.get('subquestions', [])]
+    return merged
+
+async def gather_jobs(jobs: List[Awaitable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Await jobs concurrently, in order, dropping the ones still queued when one of them fails."""
+    tasks = [asyncio.ensure_future(job) for job in jobs]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+async def await_job(future: Future, token: Optional[CancellationToken] = None, on_part: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Wait for an encoded job submitted to an executor and return the result of its final frame.
+
+    The parts in the partial frames of the job are handed to `on_part` first.
+    """
+    if token:
+        # A job that has started cannot be stopped; one still queued is dropped.
+        token.add_callback(future.cancel)
+    try:
+        frames = decode_frames(await asyncio.wrap_future(future))
+    except asyncio.CancelledError:
+        if token and token.cancelled:
+            raise GenerationCancelled("Generation cancelled")
+        raise
+    finally:
+        if token:
+            token.remove_callback(future.cancel)
+    if on_part:
+        for frame in frames[:-1]:
+            if frame.get('type') == PARTIAL:
+                on_part(frame['part'])
+    return job_result(frames[-1])
+
+
+class SubquestionParts:
+    """
+    Forward the parts of the jobs a request was split into, one per subquestion.
+
+    Only the first job generates the description and SVG. The subquestions of
+    the other jobs are held back until it has sent its own, so the description
+    and SVG still come before any subquestion. Each job numbers its only
+    subquestion 0, which is renumbered to its place in the request.
+    """
+
+    def __init__(self, on_part: Callable[[Dict[str, Any]], None]):
+        self.on_part = on_part
+        self.context_sent = False
+        self.held: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def forwarder(self, index: int) -> Callable[[Dict[str, Any]], None]:
+        def forward(part: Dict[str, Any]) -> None:
+            if part['type'] == 'subquestion':
+                part = {**part, 'index': index}
+            with self._lock:
+                if part['type'] != 'subquestion' or self.context_sent:
+                    self.on_part(part)
+                elif index > 0:
+                    self.held.append(part)
+                else:
+                    self.context_sent = True
+                    for ready in [part, *self.held]:
+                        self.on_part(ready)
+                    self.held = []
+        return forward
+
+
+class ExecutionBackend:
+    """
+    Where generation requests, and the user code in them, are executed.
+
+    Backends whose workers each have their own random state can run the
+    subquestions of a request as separate jobs, in parallel, when
+    PARALLEL_SUBQUESTIONS is set. The question context holds live objects that
+    cannot be sent to another worker, so it is generated once per job: only the
+    first job generates the description and SVG, and the others the question
+    variable alone, and only when their subquestion queries it. Distractors stay
+    with their subquestion, which they are generated from. The merged result is
+    the one a single job would have produced. Each part runs under the whole
+    budget.
+
+    With `on_part`, the parts of the question are handed to it as they are
+    generated instead of being returned (see generate_question), from whichever
+    thread runs the generation. Workers in other processes or interpreters
+    send theirs back as their job goes, or, when they cannot, when it ends.
+    """
+    name = 'base'
+    isolated_workers = False
+    parallel_subquestions = Config.PARALLEL_SUBQUESTIONS
+
+    async def generate(
+        self,
+        request: GenerateQuestionRequest,
+        registry: ClassRegistry,
+        budget: Optional[ExecutionBudget] = None,
+        token: Optional[CancellationToken] = None,
+        on_part: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        budget = budget or default_budget()
+        request = seeded_request(request)
+        if not (self.isolated_workers and self.parallel_subquestions and request.sub_questions and len(request.sub_questions) > 1):
+            return await self.execute(request, registry, budget, token, on_part)
+        parts = SubquestionParts(on_part) if on_part else None
+        results = await gather_jobs([
+            self.execute(part, registry, budget, token, parts.forwarder(index) if parts else None, question_context=index == 0)
+            for index, part in enumerate(subquestion_requests(request))
+        ])
+        return merge_subquestion_results(results)
+
+    async def execute(self, request: GenerateQuestionRequest, registry: ClassRegistry, budget: ExecutionBudget, token: Optional[CancellationToken] = None, on_part: Optional[Callable[[Dict[str, Any]], None]] = None, question_context: bool = True) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.name}
+
+    def close(self) -> None:
+        pass
+
+
+class InProcessBackend(ExecutionBackend):
+    """
+    Run generation in a thread of the API process.
+
+    Process-wide limits and signals cannot be used here, so only the instruction,
+    wall-clock and CPU budgets are enforced, cooperatively, on the user code of
+    the request. The memory budget is not enforced at all. Running in a thread
+    keeps the event loop free to notice clients that disconnect; the generation
+    then stops at its next stage.
+    """
+    name = 'inprocess'
+
+    async def execute(self, request: GenerateQuestionRequest, registry: ClassRegistry, budget: ExecutionBudget, token: Optional[CancellationToken] = None, on_part: Optional[Callable[[Dict[str, Any]], None]] = None, question_context: bool = True) -> Dict[str, Any]:
+        return await asyncio.to_thread(run_with_token, token, self.run, request, registry, budget, on_part, question_context)
+
+    def run(self, request: GenerateQuestionRequest, registry: ClassRegistry, budget: ExecutionBudget, on_part: Optional[Callable[[Dict[str, Any]], None]] = None, question_context: bool = True) -> Dict[str, Any]:
+        with apply_budget(budget, process_limits=False, user_code=runs_user_code(request)):
+            return generate_question(request, registry.algo_classes, registry.input_classes, on_part=on_part, question_context=question_context)
+
+
+class SandboxBackend(ExecutionBackend):
+    """
+    Run generation on a pool of pre-started sandbox workers.
+
+    With `shared_arrays`, large numeric lists in a request are passed to the
+    worker through a memory-mapped file instead of the job frame. This needs
+    workers that share the API's filesystem, so it is only used for local ones.
+    """
+    name = 'sandbox'
+    isolated_workers = True
+
+    def __init__(self, pool: SandboxPool, shared_arrays: bool = False):
+        self.pool = pool
+        self.shared_arrays = shared_arrays
+
+    async def execute(self, request: GenerateQuestionRequest, registry: ClassRegistry, budget: ExecutionBudget, token: Optional[CancellationToken] = None, on_part: Optional[Callable[[Dict[str, Any]], None]] = None, question_context: bool = True) -> Dict[str, Any]:
+
+        def on_frame(frame: Dict[str, Any]) -> None:
+            if frame.get('type') == PARTIAL:
+                on_part(frame['part'])
+
+        try:
+            with SharedArrayWriter() as arrays:
+                payload = arrays.share(request.model_dump()) if self.shared_arrays else request.model_dump()
+                response = await asyncio.to_thread(
+                    self.pool.run,
+                    payload,
+                    budget=budget.model_dump(),
+                    kill_after=sandbox_kill_timeout(budget),
+                    arrays=arrays.manifest(),
+                    token=token,
+                    on_frame=on_frame if on_part else None,
+                    stream=on_part is not None,
+                    question_context=question_context,
+                )
+        except SandboxCancelled as e:
+            raise GenerationCancelled(str(e))
+        except SandboxTimeout:
+            raise BudgetExceededError('wall_seconds', budget.wall_seconds, stage='sandbox')
+        except SandboxError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return job_result(response)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, **self.pool.stats()}
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class SubinterpreterBackend(ExecutionBackend):
+    """
+    Run generation on a pool of subinterpreters, each with its own GIL.
+
+    Jobs cross the interpreter boundary as encoded frames and each interpreter
+    imports the generation modules and builds its registry once, so user code
+    runs in parallel without sharing any globals with the API. Subinterpreters
+    cannot be killed and cannot handle signals, so, as in the API process, only
+    the instruction budget and its cooperative wall-clock deadline are enforced.
+
+    This needs the InterpreterPoolExecutor of Python 3.14. The subinterpreter
+    modules of 3.12 and 3.13 are not used: extension modules the generation
+    imports, pydantic_core and numpy among them, refuse to load in an isolated
+    subinterpreter whatever the Python version, so starting the pool fails and
+    create_execution_backend falls back to sandbox workers until they do.
+    """
+    name = 'subinterpreter'
+    isolated_workers = True
+
+    def __init__(self, size: int, executor_class: Any = InterpreterPoolExecutor):
+        self.size = size
+        self.completed = 0
+        self._ids = itertools.count()
+        self.executor = executor_class(max_workers=size)
+        try:
+            # Fails when a module the generation needs cannot be imported in a subinterpreter.
+            self.executor.submit(prepare_interpreter).result()
+        except BaseException:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    async def execute(self, request: GenerateQuestionRequest, registry: ClassRegistry, budget: ExecutionBudget, token: Optional[CancellationToken] = None, on_part: Optional[Callable[[Dict[str, Any]], None]] = None, question_context: bool = True) -> Dict[str, Any]:
+        job = encode_frame({'id': next(self._ids), 'type': JOB, 'request': request.model_dump(), 'budget': budget.model_dump(), 'stream': on_part is not None, 'question_context': question_context})
+        result = await await_job(self.executor.submit(run_encoded_job, None, job), token, on_part)
+        self.completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'size': self.size, 'completed': self.completed}
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class WorkerPoolBackend(ExecutionBackend):
+    """
+    Run generation on the worker pool the other generation routes use.
+
+    In a process pool each job runs in the main thread of its worker, so the
+    whole budget, signals and rlimits included, is enforced. In a thread pool
+    only the instruction budget and its wall-clock deadline are.
+    """
+    name = 'pool'
+
+    def __init__(self, pool: WorkerPool):
+        self.pool = pool
+        self.isolated_workers = pool.separate_processes
+        self._ids = itertools.count()
+
+    async def execute(self, request: GenerateQuestionRequest, registry: ClassRegistry, budget: ExecutionBudget, token: Optional[CancellationToken] = None, on_part: Optional[Callable[[Dict[str, Any]], None]] = None, question_context: bool = True) -> Dict[str, Any]:
+        job = encode_frame({'id': next(self._ids), 'type': JOB, 'request': request.model_dump(), 'budget': budget.model_dump(), 'stream': on_part is not None, 'question_context': question_context})
+        if self.pool.separate_processes:
+            # on_part cannot be sent to another process: the parts come back with the result.
+            return await await_job(self.pool.submit(run_encoded_job, registry, job, True), token, on_part)
+        return await await_job(self.pool.submit(run_encoded_job, registry, job, False, on_part), token)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, **self.pool.stats()}
+
+
+def create_execution_backend(name: str = Config.EXECUTION_BACKEND, worker_pool: Optional[WorkerPool] = None) -> ExecutionBackend:
+    """
+    Create the execution backend selected by EXECUTION_BACKEND.
+
+    The pool backend shares `worker_pool` with the other generation routes.
+
+    The subinterpreter backend falls back to sandbox worker processes when this
+    Python has no subinterpreter pool, or when the generation modules cannot be
+    loaded in a subinterpreter.
+    """
+    if name == 'subinterpreter':
+        if subinterpreters_supported():
+            try:
+                return SubinterpreterBackend(Config.SUBINTERPRETER_POOL_SIZE)
+            except Exception as e:
+                print(f"Error starting subinterpreters, falling back to sandbox workers: {e}")
+        else:
+            print("Subinterpreters are not supported by this Python, falling back to sandbox workers")
+        name = 'sandbox'
+    if name == 'inprocess':
+        return InProcessBackend()
+    if name == 'pool':
+        return WorkerPoolBackend(worker_pool or WorkerPool())
+    if name == 'sandbox':
+        command = docker_worker_command(Config.SANDBOX_IMAGE) if Config.SANDBOX_MODE == 'docker' else local_worker_command()
+        local = Config.SANDBOX_MODE != 'docker'
+        pool = SandboxPool(command, Config.SANDBOX_POOL_SIZE, Config.SANDBOX_MAX_JOBS, dedicated_fds=local, acquire_timeout=Config.SANDBOX_ACQUIRE_TIMEOUT)
+        return SandboxBackend(pool, shared_arrays=Config.SHARED_ARRAYS and local)
+    raise ValueError(f"Unknown execution backend '{name}', expected one of {EXECUTION_BACKENDS}")
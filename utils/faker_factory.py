@@ -0,0 +1,27 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from faker import Faker
+
+# The seed to give the shared Faker instance when it is created, if one was set before.
+_seed: Optional[int] = None
+
+
+@lru_cache(maxsize=None)
+def get_faker() -> 'Faker':
+    """Return the Faker instance shared by the primitive inputs, created on first use."""
+    from faker import Faker
+
+    faker = Faker()
+    if _seed is not None:
+        faker.seed_instance(_seed)
+    return faker
+
+def seed_faker(seed: int) -> None:
+    """Seed the shared Faker instance, without importing Faker before it is needed."""
+    global _seed
+    if get_faker.cache_info().currsize:
+        get_faker().seed_instance(seed)
+    else:
+        _seed = seed
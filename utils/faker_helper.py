@@ -5,7 +5,7 @@ from question_generation.input.input_subclasses.primitive.bool_type import BoolI
 from question_generation.input.input_subclasses.primitive.int_type import IntInput
 from question_generation.input.input_subclasses.primitive.str_type import StringInput
 from question_generation.quantifiable.quantifiable_class import Quantifiable
-from utils.classes_helper import get_all_subclasses, get_matching_class
+from utils.classes_helper import find_subclass
 from utils.constants import MAX_VALUE
 from utils.conversion_helper import deserialize_init_args
 
@@ -28,11 +28,10 @@ def handle_generic_type(data_type: Type, element_type: str, origin: Type, init_a
 
     element = args[0]
 
-    input_subclasses = get_all_subclasses(Input)
-    matching_class = get_matching_class(input_subclasses, origin.__name__)
+    matching_class = find_subclass(Input, origin.__name__)
     if matching_class:
         if element_type:
-            element = get_matching_class(get_all_subclasses(Quantifiable), element_type) or element
+            element = find_subclass(Quantifiable, element_type) or element
             return matching_class(element, **init_args)
         else:
             return matching_class(**init_args)
@@ -66,7 +65,7 @@ def generate_collection_data(origin: Type, args: tuple, element: Type, element_t
 
 def get_quantifiable_instance(data_type: Type, element_type: str, init_args: Dict[str, Any]) -> Any:
     if element_type:
-        matching_class = get_matching_class(get_all_subclasses(Quantifiable), element_type)
+        matching_class = find_subclass(Quantifiable, element_type)
         if matching_class:
             return matching_class(**init_args)
     return data_type(**init_args)
@@ -0,0 +1,74 @@
+import os
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    """Import cost of one module, in microseconds, as reported by `-X importtime`."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_import_times(output: str) -> List[ImportTime]:
+    """Parse the stderr of `python -X importtime`."""
+    records = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportTime(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def measure_import_times(module: str = 'app', timeout: float = 120.0) -> List[ImportTime]:
+    """
+    Import a module in a fresh interpreter with `-X importtime` and return the per-module costs.
+
+    A fresh interpreter is used so that the numbers reflect a cold start and are
+    not affected by modules this process already imported.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing '{module}' failed: {result.stderr.strip().splitlines()[-1:]}")
+    return parse_import_times(result.stderr)
+
+
+def build_import_report(records: List[ImportTime], limit: int = 20) -> Dict[str, Any]:
+    """Summarize import costs by module and by top-level package."""
+    packages: Dict[str, int] = {}
+    for record in records:
+        package = record.module.split('.')[0]
+        packages[package] = packages.get(package, 0) + record.self_us
+    top_level = [record for record in records if record.depth == 0]
+    return {
+        'total_us': sum(record.cumulative_us for record in top_level),
+        'module_count': len(records),
+        'packages': dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]),
+        'slowest_cumulative': [asdict(record) for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:limit]],
+        'slowest_self': [asdict(record) for record in sorted(records, key=lambda r: r.self_us, reverse=True)[:limit]],
+    }
+
+
+def format_import_report(report: Dict[str, Any]) -> str:
+    """Render an import report for the log."""
+    lines = [f"Import time: {report['total_us'] / 1000:.1f} ms over {report['module_count']} modules"]
+    for package, self_us in report['packages'].items():
+        lines.append(f"  {package:<40} {self_us / 1000:>9.1f} ms")
+    return '\n'.join(lines)
@@ -0,0 +1,191 @@
+import io
+from contextlib import redirect_stderr, redirect_stdout
+from functools import wraps
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from models.execution_budget import ExecutionBudget
+from models.question_generation import GenerateInputRequest, GenerateQuestionRequest, GenerateVariableRequest, OutputResponse, VariableResponse
+from utils.budget_helper import BudgetExceededError, apply_budget, default_budget
+from utils.question_generation_helper import generate_input, generate_output, generate_question, generate_variable
+from utils.registry_helper import ClassRegistry, build_class_registry
+from utils.sandbox_protocol import ERROR, PARTIAL, RESULT, FrameWriter, read_frame, write_frame
+from utils.shared_array_helper import read_shared_arrays
+from utils.user__code_helper import runs_user_code
+
+# The class registry of the interpreter this module is imported in.
+_REGISTRY: Optional[ClassRegistry] = None
+
+
+def run_job(
+    job: Dict[str, Any],
+    registry: ClassRegistry,
+    stream: BinaryIO,
+    process_limits: bool = True,
+    on_part: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run one job under its budget and return its result or error frame.
+
+    Whatever the user code prints is written to `stream` as output frames. The
+    parts of a streaming job are written to it as partial frames as soon as
+    they are generated, or handed to `on_part` when given, instead of being
+    sent in the result.
+
+    Args:
+        job (Dict[str, Any]): The job frame, with the request, its budget, its shared arrays and whether to generate the question context.
+        registry (ClassRegistry): The classes to generate from.
+        stream (BinaryIO): Where partial and output frames are written.
+        process_limits (bool): Whether the budget may set process-wide limits and signal handlers.
+        on_part (Optional[Callable[[Dict[str, Any]], None]]): Receives the parts of a streaming job.
+
+    Returns:
+        Dict[str, Any]: The final frame of the job.
+    """
+    job_id = job.get("id")
+
+    def send_partial(part: Dict[str, Any]) -> None:
+        write_frame(stream, {"id": job_id, "type": PARTIAL, "part": part})
+
+    try:
+        request = GenerateQuestionRequest(**read_shared_arrays(job["request"], job.get("arrays")))
+        budget = ExecutionBudget(**(job.get("budget") or {}))
+        parts = (on_part or send_partial) if job.get("stream") else None
+        with redirect_stdout(FrameWriter(stream, job_id, "stdout")), redirect_stderr(FrameWriter(stream, job_id, "stderr")):
+            with apply_budget(budget, process_limits, runs_user_code(request)):
+                result = generate_question(request, registry.algo_classes, registry.input_classes, on_part=parts, question_context=job.get("question_context", True))
+        return {"id": job_id, "type": RESULT, "result": result}
+    except BudgetExceededError as e:
+        return {"id": job_id, "type": ERROR, "error": str(e), "status_code": 422, "budget": e.to_dict()}
+    except HTTPException as e:
+        return {"id": job_id, "type": ERROR, "error": e.detail, "status_code": e.status_code}
+    except ValueError as e:
+        return {"id": job_id, "type": ERROR, "error": str(e), "status_code": 400}
+    except Exception as e:
+        return {"id": job_id, "type": ERROR, "error": str(e), "status_code": 500}
+
+
+def interpreter_registry() -> ClassRegistry:
+    """Build the class registry of the current interpreter once."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = build_class_registry()
+    return _REGISTRY
+
+
+def prepare_interpreter() -> None:
+    """Import the generation modules and build the registry, before the interpreter takes jobs."""
+    interpreter_registry()
+
+
+def run_encoded_job(
+    registry: Optional[ClassRegistry],
+    job_frame: bytes,
+    process_limits: bool = False,
+    on_part: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> bytes:
+    """
+    Run one encoded job and return every frame it produced, the final one last.
+
+    This is the entry point of subinterpreter and worker pool jobs: only bytes
+    cross the interpreter or process boundary, and each interpreter keeps its
+    own registry, used when `registry` is None. Signals belong to the main
+    thread of the main interpreter, so by default only the traced part of the
+    budget applies. Jobs run in a thread of the API can hand the parts of a
+    streaming job to `on_part` as they are generated; elsewhere they come back
+    as partial frames with the others.
+    """
+    frames = io.BytesIO()
+    job = read_frame(io.BytesIO(job_frame))
+    write_frame(frames, run_job(job, registry or interpreter_registry(), frames, process_limits, on_part))
+    return frames.getvalue()
+
+
+def decode_frames(data: bytes) -> List[Dict[str, Any]]:
+    stream = io.BytesIO(data)
+    frames = []
+    while True:
+        frame = read_frame(stream)
+        if frame is None:
+            return frames
+        frames.append(frame)
+
+
+def pool_task(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Make a route task safe to run in the worker pool, under an execution budget.
+
+    The task runs the user code of its request, so it gets the budget of
+    /generate, `budget` or the default one, with process-wide limits only in
+    worker processes. Starlette's HTTPException cannot be unpickled, so it is
+    re-raised as the RuntimeError its message would have become in the route
+    anyway.
+    """
+    @wraps(func)
+    def wrapper(registry: Optional[ClassRegistry], request: Dict[str, Any], budget: Optional[Dict[str, Any]] = None, process_limits: bool = False) -> Any:
+        try:
+            with apply_budget(ExecutionBudget(**budget) if budget else default_budget(), process_limits, runs_user_code(request)):
+                return func(registry, request)
+        except HTTPException as e:
+            raise RuntimeError(str(e))
+    return wrapper
+
+
+@pool_task
+def run_generate_variable(registry: Optional[ClassRegistry], request: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate the variable of a /generate_variable request and return its response."""
+    request = GenerateVariableRequest(**request)
+    result = generate_variable(
+        (registry or interpreter_registry()).algo_classes,
+        request.topic,
+        request.subtopic,
+        request.arguments,
+        request.element_type,
+        request.subclasses,
+        request.question_description,
+        request.arguments_init,
+        userAlgoCode=request.userAlgoCode,
+        userEnvCode=request.userEnvCode
+    )
+    result['context'] = {key: str(value) for key, value in result['context'].items()}
+    result['cls_name'] = result['cls'].__name__
+    return VariableResponse.model_validate(result).model_dump(mode='json')
+
+
+@pool_task
+def run_generate_output(registry: Optional[ClassRegistry], request: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate the output of a /generate_output request and return its response."""
+    request = GenerateVariableRequest(**request)
+    result = generate_output(
+        (registry or interpreter_registry()).algo_classes,
+        request.topic,
+        request.subtopic,
+        request.arguments,
+        request.element_type,
+        request.subclasses,
+        request.arguments_init,
+        userAlgoCode=request.userAlgoCode,
+        userEnvCode=request.userEnvCode
+    )
+    if result['context']:
+        result['context'] = {key: str(value) for key, value in result['context'].items()}
+    return OutputResponse.model_validate(result).model_dump(mode='json')
+
+
+@pool_task
+def run_generate_input(registry: Optional[ClassRegistry], request: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate the input of a /generate_input request and return its response."""
+    request = GenerateInputRequest(**request)
+    result = generate_input(
+        request.input_path,
+        request.variable_options,
+        (registry or interpreter_registry()).input_classes,
+        request.element_type,
+        request.input_init,
+        request.user_env_code
+    )
+    result['context'] = {key: str(value) for key, value in result['context'].items()}
+    result['cls_name'] = result['cls'].__name__
+    result['has_output'] = False
+    return VariableResponse.model_validate(result).model_dump(mode='json')
@@ -0,0 +1,55 @@
+import threading
+import weakref
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Type
+
+
+def copy_metadata(value: Any) -> Any:
+    """Copy the list and dict containers of a metadata value, sharing the leaves."""
+    if isinstance(value, list):
+        return [copy_metadata(item) for item in value]
+    if isinstance(value, dict):
+        return {key: copy_metadata(item) for key, item in value.items()}
+    return value
+
+
+class ClassMetadataCache:
+    """
+    Introspection results keyed by class identity.
+
+    Entries are held in a WeakKeyDictionary so that metadata of exec'd user
+    classes disappears together with the class. The cache is cleared whenever
+    the class registry is rebuilt.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: "weakref.WeakKeyDictionary[type, Dict[Hashable, Any]]" = weakref.WeakKeyDictionary()
+
+    def get(self, cls: Type, key: Hashable, factory: Callable[[], Any]) -> Any:
+        try:
+            entries = self._entries.get(cls)
+        except TypeError:
+            return factory()
+        if entries is not None and key in entries:
+            return entries[key]
+        value = factory()
+        with self._lock:
+            self._entries.setdefault(cls, {})[key] = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+METADATA_CACHE = ClassMetadataCache()
+
+
+def cached_class_metadata(func: Callable) -> Callable:
+    """Memoize a `func(cls, *args)` introspection helper per class and arguments."""
+    @wraps(func)
+    def wrapper(cls: Type, *args: Hashable) -> Any:
+        value = METADATA_CACHE.get(cls, (func.__name__, args), lambda: func(cls, *args))
+        return copy_metadata(value)
+    return wrapper
@@ -0,0 +1,79 @@
+from typing import Any, Dict, List, Mapping, Optional, Type
+
+from utils.classes_helper import get_input_class, get_subtopic_class
+from utils.exceptions import handle_exceptions
+from utils.static_analysis_helper import describe_input_class, describe_user_class
+from utils.topics_helper import get_queryable_names, get_user_queryable_names
+from utils.types_helper import GeneratedQuestionClassType
+from utils.variable_helper import (
+    format_algo_variables,
+    format_input_variable,
+    format_query_variables,
+    get_algo_variables,
+    get_init_arguments,
+    get_query_variables,
+    get_user_init_arguments,
+    get_user_query_variables,
+)
+
+
+def build_metadata(variables: List[Dict[str, Any]], queryables: List[str], query_variables: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    return {
+        "variables": variables,
+        "queryables": queryables,
+        "queryable_variables": query_variables,
+    }
+
+@handle_exceptions
+def get_algo_metadata(autoloaded_classes: Mapping[str, Mapping[str, GeneratedQuestionClassType]], topic: str, subtopic: str) -> Dict[str, Any]:
+    """
+    Return everything the question builder needs for a topic/subtopic in one response.
+
+    Args:
+        autoloaded_classes: The registry of algorithm classes.
+        topic (str): The topic name.
+        subtopic (str): The subtopic name.
+
+    Returns:
+        Dict[str, Any]: The algo variables, the queryables and the query variables of each queryable.
+    """
+    cls = get_subtopic_class(autoloaded_classes, topic, subtopic)
+    queryables = get_queryable_names(cls)
+    return build_metadata(
+        format_algo_variables(get_algo_variables(cls)),
+        queryables,
+        {queryable: format_query_variables(get_query_variables(cls, queryable)) for queryable in queryables},
+    )
+
+@handle_exceptions
+def get_input_metadata(input_path: Dict[str, Any], input_classes: Mapping[str, Mapping[str, Type]]) -> Dict[str, Any]:
+    """Return the input variables, queryables and query variables of an input path in one response."""
+    cls = get_input_class(input_path, input_classes)
+    queryables = get_queryable_names(cls)
+    return build_metadata(
+        [format_input_variable(cls, get_init_arguments(cls))],
+        queryables,
+        {queryable: format_query_variables(get_query_variables(cls, queryable)) for queryable in queryables},
+    )
+
+@handle_exceptions
+def get_user_algo_metadata(userAlgoCode: str, userEnvCode: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Return the metadata of user algorithm code, describing the class once for every part."""
+    user_class = describe_user_class(userAlgoCode, userEnvCode)
+    queryables = get_user_queryable_names(user_class)
+    return build_metadata(
+        format_algo_variables(get_algo_variables(user_class)),
+        queryables,
+        {queryable: format_query_variables(get_user_query_variables(user_class, queryable)) for queryable in queryables},
+    )
+
+@handle_exceptions
+def get_user_input_metadata(userEnvCode: str) -> Dict[str, Any]:
+    """Return the metadata of user input code, describing the class once for every part."""
+    user_class = describe_input_class(userEnvCode)
+    queryables = get_user_queryable_names(user_class)
+    return build_metadata(
+        [format_input_variable(user_class, get_user_init_arguments(user_class))],
+        queryables,
+        {queryable: format_query_variables(get_user_query_variables(user_class, queryable)) for queryable in queryables},
+    )
@@ -0,0 +1,266 @@
+import ast
+import importlib
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple, Type
+
+EXCLUDED_CLASSES = {'AdversarialEnv', 'GraphEnv'}
+ABC_QUALNAME = 'abc.ABC'
+ABSTRACT_DECORATORS = {'abstractmethod', 'abc.abstractmethod'}
+
+
+@dataclass(frozen=True)
+class ClassEntry:
+    """A class found by parsing a module, without importing it."""
+    module: str
+    name: str
+    bases: Tuple[str, ...]
+    abstract_methods: FrozenSet[str]
+    concrete_methods: FrozenSet[str]
+    internal: Optional[bool]
+    abc_metaclass: bool
+
+    @property
+    def qualname(self) -> str:
+        return f"{self.module}.{self.name}"
+
+
+@dataclass
+class ModuleInfo:
+    module: str
+    classes: List[ClassEntry] = field(default_factory=list)
+
+
+def module_name_from_path(path: Path, root_path: Path, root_package: str) -> str:
+    parts = list(path.relative_to(root_path).with_suffix('').parts)
+    if parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join([root_package, *parts])
+
+
+def resolve_import(module: str, is_package: bool, level: int, target: Optional[str]) -> str:
+    """Turn a (possibly relative) import into an absolute module name."""
+    if not level:
+        return target or ''
+    package = module.split('.') if is_package else module.split('.')[:-1]
+    package = package[:len(package) - (level - 1)]
+    return '.'.join(package + ([target] if target else []))
+
+
+def decorator_name(node: ast.expr) -> str:
+    return ast.unparse(node)
+
+
+def parse_module(path: Path, module: str) -> ModuleInfo:
+    """Collect the classes defined at the top level of a module and their bases."""
+    tree = ast.parse(path.read_text(encoding='utf-8'))
+    is_package = path.name == '__init__.py'
+    symbols: Dict[str, str] = {}
+    info = ModuleInfo(module)
+    for statement in tree.body:
+        if isinstance(statement, ast.ImportFrom):
+            source = resolve_import(module, is_package, statement.level, statement.module)
+            for alias in statement.names:
+                symbols[alias.asname or alias.name] = f"{source}.{alias.name}"
+        elif isinstance(statement, ast.Import):
+            for alias in statement.names:
+                symbols[alias.asname or alias.name] = alias.name
+        elif isinstance(statement, ast.ClassDef):
+            bases = []
+            for base in statement.bases:
+                if isinstance(base, ast.Subscript):
+                    base = base.value
+                name = ast.unparse(base)
+                head, _, rest = name.partition('.')
+                qualified = symbols.get(head, f"{module}.{head}")
+                bases.append(f"{qualified}.{rest}" if rest else qualified)
+            methods = [
+                node for node in statement.body
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            abstract = frozenset(
+                node.name for node in methods
+                if any(decorator_name(decorator) in ABSTRACT_DECORATORS for decorator in node.decorator_list)
+            )
+            internal = None
+            for node in statement.body:
+                if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == 'internal' for t in node.targets):
+                    try:
+                        internal = bool(ast.literal_eval(node.value))
+                    except ValueError:
+                        internal = True
+            abc_metaclass = any(
+                keyword.arg == 'metaclass' and ast.unparse(keyword.value) in ('ABCMeta', 'abc.ABCMeta')
+                for keyword in statement.keywords
+            )
+            info.classes.append(ClassEntry(
+                module=module,
+                name=statement.name,
+                bases=tuple(bases),
+                abstract_methods=abstract,
+                concrete_methods=frozenset(node.name for node in methods) - abstract,
+                internal=internal,
+                abc_metaclass=abc_metaclass,
+            ))
+            symbols[statement.name] = f"{module}.{statement.name}"
+    return info
+
+
+class ModuleCatalog:
+    """
+    Static index of the classes defined under a package, built from module ASTs.
+
+    It answers which module defines a class, which classes derive from another and
+    whether a class is abstract or internal, so that the autoloaded class trees can
+    be listed without importing the modules. Modules are imported on demand by
+    `load`, `load_by_name` and `load_subclasses`.
+    """
+
+    def __init__(self, root_path: Path, root_package: str):
+        self.root_path = root_path
+        self.root_package = root_package
+        self.modules: Dict[str, ModuleInfo] = {}
+        self.paths: Dict[str, Path] = {}
+        for path in sorted(root_path.rglob('*.py')):
+            module = module_name_from_path(path, root_path, root_package)
+            self.modules[module] = parse_module(path, module)
+            self.paths[module] = path
+        self.classes: Dict[str, ClassEntry] = {
+            entry.qualname: entry for info in self.modules.values() for entry in info.classes
+        }
+        self.by_name: Dict[str, List[ClassEntry]] = {}
+        for entry in self.classes.values():
+            self.by_name.setdefault(entry.name, []).append(entry)
+        self._ancestors: Dict[str, Set[str]] = {}
+        self._subclass_entries: Dict[str, List[ClassEntry]] = {}
+        self._lock = threading.RLock()
+
+    def ancestors(self, qualname: str) -> Set[str]:
+        """Return the qualified names of all statically known ancestors of a class."""
+        if qualname not in self._ancestors:
+            self._ancestors[qualname] = set()
+            entry = self.classes.get(qualname)
+            if entry:
+                for base in entry.bases:
+                    self._ancestors[qualname] |= {base} | self.ancestors(base)
+        return self._ancestors[qualname]
+
+    def is_subclass(self, qualname: str, base_qualname: str) -> bool:
+        return base_qualname in self.ancestors(qualname)
+
+    def concrete_methods(self, qualname: str) -> Set[str]:
+        entry = self.classes.get(qualname)
+        if entry is None:
+            return set()
+        methods = set(entry.concrete_methods)
+        for base in entry.bases:
+            methods |= self.concrete_methods(base)
+        return methods
+
+    def is_abstract(self, entry: ClassEntry) -> bool:
+        """Approximate inspect.isabstract from the ASTs of the class and its bases."""
+        ancestors = [self.classes[name] for name in self.ancestors(entry.qualname) if name in self.classes]
+        if not (entry.abc_metaclass or ABC_QUALNAME in self.ancestors(entry.qualname) or any(a.abc_metaclass for a in ancestors)):
+            return False
+        if entry.abstract_methods:
+            return True
+        inherited_abstract = set().union(*(ancestor.abstract_methods for ancestor in ancestors)) if ancestors else set()
+        implemented = set(entry.concrete_methods)
+        for base in entry.bases:
+            implemented |= self.concrete_methods(base)
+        return bool(inherited_abstract - implemented)
+
+    def is_internal(self, entry: ClassEntry) -> bool:
+        if entry.internal is not None:
+            return entry.internal
+        for base in entry.bases:
+            base_entry = self.classes.get(base)
+            if base_entry and self.is_internal(base_entry):
+                return True
+        return False
+
+    def module_class(self, module: str) -> Optional[ClassEntry]:
+        """Return the class get_class_from_module would pick for the module."""
+        classes = sorted(self.modules[module].classes, key=lambda entry: entry.name)
+        return classes[0] if classes else None
+
+    def tree(self, base_path: Path, base_package: str) -> Dict[str, Any]:
+        """Build the nested folder/file tree of autoloadable class entries, like traverse_directory."""
+        tree: Dict[str, Any] = {}
+        for item in base_path.iterdir():
+            if item.is_dir() and not item.name.startswith('__'):
+                tree[item.name] = self.tree(item, f"{base_package}.{item.name}")
+            elif item.is_file() and item.suffix == '.py' and item.name != '__init__.py':
+                entry = self.module_class(f"{base_package}.{item.stem}")
+                if entry is None:
+                    raise ValueError(f"No class found in module {base_package}.{item.stem}")
+                if item.stem not in tree and not self.is_abstract(entry) and not self.is_internal(entry) and entry.name not in EXCLUDED_CLASSES:
+                    tree[item.stem] = entry
+        return tree
+
+    def subclass_entries(self, base_qualname: str) -> List[ClassEntry]:
+        """Return the statically known subclasses of a class."""
+        with self._lock:
+            if base_qualname not in self._subclass_entries:
+                self._subclass_entries[base_qualname] = [
+                    entry for entry in self.classes.values() if self.is_subclass(entry.qualname, base_qualname)
+                ]
+            return self._subclass_entries[base_qualname]
+
+    def subclass_names(self, base_qualname: str) -> List[str]:
+        return [entry.name for entry in self.subclass_entries(base_qualname)]
+
+    def load(self, entry: ClassEntry) -> Type:
+        return getattr(importlib.import_module(entry.module), entry.name)
+
+    def load_by_name(self, name: str) -> bool:
+        """Import the modules defining classes with the given name; return whether any exist."""
+        entries = self.by_name.get(name, [])
+        for entry in entries:
+            self.load(entry)
+        return bool(entries)
+
+    def load_subclasses(self, cls: Type) -> None:
+        """Import every module that statically defines a subclass of `cls`."""
+        for entry in self.subclass_entries(f"{cls.__module__}.{cls.__qualname__}"):
+            self.load(entry)
+
+
+class LazyClassMapping(Mapping):
+    """
+    Read-only view over a tree of ClassEntry objects.
+
+    Keys are available without importing anything; a class is imported the first
+    time its entry is looked up.
+    """
+
+    def __init__(self, catalog: ModuleCatalog, tree: Dict[str, Any]):
+        self._catalog = catalog
+        self._tree = {
+            key: LazyClassMapping(catalog, value) if isinstance(value, dict) else value
+            for key, value in tree.items()
+        }
+        self._resolved: Dict[str, Type] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._tree[key]
+        if isinstance(value, ClassEntry):
+            if key not in self._resolved:
+                self._resolved[key] = self._catalog.load(value)
+            return self._resolved[key]
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tree)
+
+    def __len__(self) -> int:
+        return len(self._tree)
+
+    def entries(self) -> Dict[str, Any]:
+        """Return the nested tree of keys and ClassEntry leaves without importing."""
+        return {
+            key: value.entries() if isinstance(value, LazyClassMapping) else value
+            for key, value in self._tree.items()
+        }
@@ -1,19 +1,22 @@
 import ast
-from copy import deepcopy
 import inspect
 import random
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Callable, Dict, List, Optional, Type
 
-from models.question_generation import ContextRequest, GenerateQuestionRequest, SubQuestionContext
+from models.question_generation import ContextRequest, GenerateQuestionRequest, StepTrace, SubQuestionContext
 from question_generation.quantifiable.quantifiable_class import Quantifiable
-from question_generation.queryable.queryable_class import Queryable
 from utils.conversion_helper import deserialize_init_args
 from utils.faker_helper import generate_data_for_type
+from utils.budget_helper import budget_stage
+from utils.cancellation_helper import check_cancelled
+from utils.clone_helper import clone_context, clone_value
+from utils.seed_helper import derive_seed, new_seed, seeded, task_seed
+from utils.step_trace_helper import run_algo
 from utils.types_helper import GeneratedQuestionClassType
-from utils.classes_helper import get_all_subclasses, get_class_path, get_matching_class, get_subtopic_class
+from utils.classes_helper import find_subclass, get_class_path, get_subtopic_class
 from utils.exceptions import handle_exceptions
 from utils.user__code_helper import load_input_class, load_user_class
-from utils.variable_helper import get_algo_variables, get_query_variables
+from utils.variable_helper import get_algo_variables, get_query_dispatch, get_query_variables, load_queryable_state
 
 @handle_exceptions
 def generate_input(
@@ -41,7 +44,7 @@ def generate_input(
         else:
             cls = traverse_path(input_path, input_classes)
         selectedQuantifiable = element_type.get(cls.__name__)
-        quantifiable = get_matching_class(get_all_subclasses(Quantifiable), selectedQuantifiable) or selectedQuantifiable
+        quantifiable = find_subclass(Quantifiable, selectedQuantifiable) or selectedQuantifiable
         if input_init:
             if quantifiable:
                 input_generated_data = cls(quantifiable, **input_init[cls.__name__]) if input_init.get(cls.__name__) else cls(quantifiable)
@@ -75,7 +78,8 @@ def generate_variable(
     arguments_init: Optional[Dict[str, Any]] = None,
     userAlgoCode: Optional[str] = None,
     userEnvCode: Optional[List[str]] = None,
-    userQueryableCode: Optional[str] = None
+    userQueryableCode: Optional[str] = None,
+    step_trace: Optional[StepTrace] = None
 ) -> Dict[str, Any]:
     if userAlgoCode:
         cls = load_user_class(userAlgoCode, userQueryableCode, userEnvCode)
@@ -88,9 +92,10 @@ def generate_variable(
     algo_variables = get_algo_variables(cls)
     for var in algo_variables:
         if var["name"] in subclasses:
-            subclass_type = get_matching_class(get_all_subclasses(var["type"]), subclasses[var["name"]])
+            subclass_type = find_subclass(var["type"], subclasses[var["name"]])
             if subclass_type:
                 var['type'] = subclass_type
+    copy_algo_generated_data = {}
     try:
         algo_generated_data = {}
         filtered_variables = [var for var in algo_variables if not arguments_init or var["name"] not in arguments_init]
@@ -115,13 +120,15 @@ def generate_variable(
                 for innerKey, innerValue in value.items():
                     if innerKey in arguments[key] and callable(innerValue):
                         algo_generated_data_init[key][innerKey] = arguments[key][innerKey]
-        copy_algo_generated_data = deepcopy(algo_generated_data)
-        outcome = cls_instance.algo(**copy_algo_generated_data)
+        copy_algo_generated_data = clone_context(algo_generated_data)
+        outcome = run_algo(cls_instance, copy_algo_generated_data, step_trace)
     except Exception as e:
         print(f"Error generating variable: {e}")
         algo_generated_data = {}
     result = {}
     result['context'] = algo_generated_data
+    # The arguments as algo left them; cls_instance holds the Queryable state of the same run.
+    result['run_context'] = copy_algo_generated_data
     result['context_init'] = algo_generated_data_init
     result['description'] = cls_instance.format_question_description(question_description, {**algo_generated_data})
     result['cls'] = cls
@@ -150,7 +157,7 @@ def generate_output(
     algo_variables = get_algo_variables(cls)
     for var in algo_variables:
         if var["name"] in subclasses:
-            subclass_type = get_matching_class(get_all_subclasses(var["type"]), subclasses[var["name"]])
+            subclass_type = find_subclass(var["type"], subclasses[var["name"]])
             if subclass_type:
                 var['type'] = subclass_type
     try:
@@ -178,7 +185,7 @@ def generate_output(
         algo_generated_data = {}
 
     result = {}
-    copy_algo_generated_data = deepcopy(algo_generated_data)
+    copy_algo_generated_data = clone_context(algo_generated_data)
     outcome = cls_instance.algo(**copy_algo_generated_data)
     if outcome is None:
         return {
@@ -215,48 +222,100 @@ def generate_output(
 def generate_question(
     request: GenerateQuestionRequest,
     autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]],
-    input_classes: Dict[str, Dict[str, Type]]
+    input_classes: Dict[str, Dict[str, Type]],
+    on_part: Optional[Callable[[Dict[str, Any]], None]] = None,
+    question_context: bool = True
 ) -> Dict[str, Any]:
+    """
+    Generate a question and its subquestions.
+
+    With `on_part`, the description, the SVG and each subquestion are handed to
+    it as soon as they are generated, as 'description', 'svg' and 'subquestion'
+    parts, instead of being kept in the result.
+
+    Without `question_context`, only the subquestions are generated: the
+    description and SVG are left out, and so is the question variable when no
+    subquestion queries it. Every subquestion has its own seed, so they come out
+    as they would in the whole question.
+    """
     try:
         result = {}
-        outerContext = deepcopy(request.context)
+        seed = request.seed if request.seed is not None else new_seed()
+        # Only read from, so the request context is not copied.
+        outerContext = request.context
         outer = {}
-        if (request.context.selectedTopic and request.context.selectedSubtopic) or request.context.userAlgoCode:
-            outer = generate_variable(
-                autoloaded_classes,
-                request.context.selectedTopic,
-                request.context.selectedSubtopic,
-                request.context.arguments,
-                request.context.selectedQuantifiables,
-                request.context.selectedSubclasses,
-                request.description,
-                arguments_init=request.context.argumentsInit,
-                userAlgoCode=request.context.userAlgoCode,
-                userEnvCode=request.context.userEnvCode,
-            )
-
         outerInput = {}
-        if request.context.inputPath or request.context.userEnvCode:
-            outerInput = generate_input(request.context.inputPath, request.context.inputArguments, input_classes, input_init=request.context.inputInit, user_env_code=request.context.userEnvCode[0] if (request.context.userEnvCode and len(request.context.userEnvCode) > 0) else None)
-
-        result['description'] = outer.get('description', '')
-        if outer.get('context'):
-            # Generate SVG for main question
-            svg_content = generate_svg(outer['context'])
-            if svg_content:
-                result['svg'] = svg_content
+        needs_outer = question_context or any(uses_question_context(subquestion) for subquestion in request.sub_questions or [])
+        with seeded(derive_seed(seed, 'question')):
+            if needs_outer and ((request.context.selectedTopic and request.context.selectedSubtopic) or request.context.userAlgoCode):
+                check_cancelled()
+                with budget_stage('variable'):
+                    outer = generate_variable(
+                        autoloaded_classes,
+                        request.context.selectedTopic,
+                        request.context.selectedSubtopic,
+                        request.context.arguments,
+                        request.context.selectedQuantifiables,
+                        request.context.selectedSubclasses,
+                        request.description,
+                        arguments_init=request.context.argumentsInit,
+                        userAlgoCode=request.context.userAlgoCode,
+                        userEnvCode=request.context.userEnvCode,
+                        step_trace=request.context.stepTrace,
+                    )
+
+            if needs_outer and (request.context.inputPath or request.context.userEnvCode):
+                check_cancelled()
+                with budget_stage('input'):
+                    outerInput = generate_input(request.context.inputPath, request.context.inputArguments, input_classes, input_init=request.context.inputInit, user_env_code=request.context.userEnvCode[0] if (request.context.userEnvCode and len(request.context.userEnvCode) > 0) else None)
+
+            if question_context:
+                if on_part:
+                    on_part({'type': 'description', 'description': outer.get('description', '')})
+                else:
+                    result['description'] = outer.get('description', '')
+            if question_context and outer.get('context'):
+                # Generate SVG for main question
+                check_cancelled()
+                with budget_stage('svg'):
+                    svg_content = generate_svg(outer['context'])
+                if svg_content:
+                    if on_part:
+                        on_part({'type': 'svg', 'svg': svg_content})
+                    else:
+                        result['svg'] = svg_content
         if request.sub_questions:
-            result['subquestions'] = [
-                generate_subquestion(autoloaded_classes, outer, outerContext, subquestion, outerInput, input_classes)
-                for subquestion in request.sub_questions
-            ]
+            result['subquestions'] = []
+            for index, subquestion in enumerate(request.sub_questions):
+                check_cancelled()
+                with budget_stage(f'subquestion {index}'), seeded(subquestion_seed(seed, index, subquestion)):
+                    sub = generate_subquestion(autoloaded_classes, outer, outerContext, subquestion, outerInput, input_classes)
+                if on_part:
+                    on_part({'type': 'subquestion', 'index': index, 'subquestion': sub})
+                else:
+                    result['subquestions'].append(sub)
+        result['seed'] = seed
 
         return result
 
+    except MemoryError:
+        raise
     except Exception as e:
         print(f"Error generating question: {e}")
         return {}
 
+def subquestion_seed(seed: int, index: int, subquestion: SubQuestionContext) -> int:
+    """Return the seed of a subquestion: its own, or one derived from its position in the question."""
+    return subquestion.seed if subquestion.seed is not None else derive_seed(seed, 'subquestion', index)
+
+def uses_question_context(subquestion: SubQuestionContext) -> bool:
+    """Whether a subquestion is asked about the variable or input of its question rather than its own."""
+    if subquestion.queryable:
+        return not (subquestion.context.selectedSubtopic or subquestion.context.userAlgoCode)
+    if subquestion.inputQueryable:
+        return not (subquestion.context.inputPath or subquestion.context.userEnvCode)
+    return False
+
 def generate_subquestion(
     autoloaded_classes: Dict[str, Dict[str, Any]],
     outer: Dict[str, Any],
@@ -316,16 +375,18 @@ def generate_subquestion_input_queryable(
             {**query_generated_data}
         )
         options = [sub['answer']]
-        for _ in range(subquestion.questionDetails.number_of_options - 1):
+        for option_index in range(subquestion.questionDetails.number_of_options - 1):
+            check_cancelled()
             try:
-                option = generate_input_query_options(
-                    cls_instance,
-                    subquestion.inputQueryable,
-                    {},
-                    query_variables,
-                    sub['answer'],
-                    subquestion.context.inputArguments
-                )
+                with seeded(task_seed('option', option_index)):
+                    option = generate_input_query_options(
+                        cls_instance,
+                        subquestion.inputQueryable,
+                        {},
+                        query_variables,
+                        sub['answer'],
+                        subquestion.context.inputArguments
+                    )
                 options.append(option)
             except Exception as e:
                 print(f"Error generating option: {e}")
@@ -345,9 +406,11 @@ def generate_subquestion_queryable(
     outerContext: ContextRequest,
     subquestion: SubQuestionContext,
 ) -> Dict[str, Any]:
+    step_trace = subquestion.context.stepTrace or outerContext.stepTrace
     try:
-        if subquestion.context.selectedSubtopic or subquestion.context.userAlgoCode:
-            inner = generate_variable(
+        own_variable = bool(subquestion.context.selectedSubtopic or subquestion.context.userAlgoCode)
+        if own_variable:
+            source = generate_variable(
                 autoloaded_classes,
                 subquestion.context.selectedTopic,
                 subquestion.context.selectedSubtopic,
@@ -358,26 +421,38 @@ def generate_subquestion_queryable(
                 arguments_init=subquestion.context.argumentsInit if subquestion.context.argumentsInit else outerContext.argumentsInit,
                 userAlgoCode=subquestion.context.userAlgoCode,
                 userEnvCode=subquestion.context.userEnvCode,
-                userQueryableCode=subquestion.userQueryableCode
+                userQueryableCode=subquestion.userQueryableCode,
+                step_trace=step_trace
             )
-            sub_algo_variables = inner['context']
-            cls_instance = inner['cls_instance']
-            cls = inner['cls']
         else:
-            sub_algo_variables = outer['context']
-            cls_instance = outer['cls_instance']
-            cls = outer['cls']
+            source = outer
+        cls_instance = source['cls_instance']
+        cls = source['cls']
         query_variables = get_query_variables(cls, subquestion.queryable)
         sub = {}
         try:
-            sub['answer'], copy_algo_generated_data, query_generated_data, answer_svg_content = process_query_result(
-                cls_instance,
-                sub_algo_variables,
-                subquestion.queryable,
-                subquestion.context.selectedQuantifiables,
-                query_variables,
-                subquestion.context.arguments
-            )
+            if own_variable or step_trace == outerContext.stepTrace:
+                # Answer from the run generate_variable already made, shared by every subquestion on the outer context.
+                sub['answer'], copy_algo_generated_data, query_generated_data, answer_svg_content = answer_query(
+                    cls_instance,
+                    source['run_context'],
+                    subquestion.queryable,
+                    subquestion.context.selectedQuantifiables,
+                    query_variables,
+                    subquestion.context.arguments
+                )
+            else:
+                # Steps recorded at other places need a run of their own.
+                cls_instance = cls()
+                sub['answer'], copy_algo_generated_data, query_generated_data, answer_svg_content = process_query_result(
+                    cls_instance,
+                    source['context'],
+                    subquestion.queryable,
+                    subquestion.context.selectedQuantifiables,
+                    query_variables,
+                    subquestion.context.arguments,
+                    step_trace
+                )
         except Exception as e:
             print(f"Error processing query result: {e}")
             return {}
@@ -388,17 +463,20 @@ def generate_subquestion_queryable(
 
         # Generate options for subquestion
         options = [sub['answer']]
-        for _ in range(subquestion.questionDetails.number_of_options - 1):
+        for option_index in range(subquestion.questionDetails.number_of_options - 1):
+            check_cancelled()
             try:
-                option = generate_options(
-                    cls,
-                    copy_algo_generated_data,
-                    subquestion.queryable,
-                    subquestion.context.selectedQuantifiables,
-                    query_variables,
-                    sub['answer'],
-                    subquestion.context.arguments
-                )
+                with seeded(task_seed('option', option_index)):
+                    option = generate_options(
+                        cls,
+                        copy_algo_generated_data,
+                        subquestion.queryable,
+                        subquestion.context.selectedQuantifiables,
+                        query_variables,
+                        sub['answer'],
+                        subquestion.context.arguments,
+                        step_trace
+                    )
                 options.append(option)
             except Exception as e:
                 print(f"Error generating option: {e}")
@@ -417,43 +495,45 @@ def generate_subquestion_queryable(
         print(f"Error generating subquestion: {e}")
         return {}
 
-def process_query_result(cls_instance, algo_generated_data, queryable_type, element_type, query_variables, arguments):
+def process_query_result(cls_instance, algo_generated_data, queryable_type, element_type, query_variables, arguments, step_trace=None):
     try:
-        copy_algo_generated_data = deepcopy(algo_generated_data)
-        cls_instance.algo(**copy_algo_generated_data)
-        query_result = cls_instance.query_all()
-        for base, query_method, generate_input in query_result:
-            if base.__name__ == queryable_type and issubclass(base, Queryable):
-                query_base, query_method = base, query_method
-                base_instance = query_base()
-                copy_attributes(cls_instance, base_instance)
-                if generate_input:
-                    query_generated_data = generate_input(base_instance)
-                else:
-                    query_generated_data = generate_data(query_variables, element_type, arguments)
-                query_output = query_method(base_instance, **deepcopy(query_generated_data))
-                value, graph = query_output['value'], query_output['svg']
-                return str(value), copy_algo_generated_data, query_generated_data, graph
+        copy_algo_generated_data = clone_context(algo_generated_data)
+        run_algo(cls_instance, copy_algo_generated_data, step_trace)
+    except Exception as e:
+        print(f"Error processing query result: {e}")
+        return '', {}, {}, {}
+    return answer_query(cls_instance, copy_algo_generated_data, queryable_type, element_type, query_variables, arguments)
+
+def answer_query(cls_instance, run_data, queryable_type, element_type, query_variables, arguments):
+    """Answer a query from the Queryable state a run of algo on `run_data` left on the instance."""
+    try:
+        dispatch = get_query_dispatch(cls_instance.__class__).get(queryable_type)
+        if dispatch:
+            base_instance = load_queryable_state(dispatch, cls_instance)
+            if dispatch.generate_input:
+                query_generated_data = dispatch.generate_input(base_instance)
+            else:
+                query_generated_data = generate_data(query_variables, element_type, arguments)
+            query_output = dispatch.query(base_instance, **clone_context(query_generated_data))
+            value, graph = query_output['value'], query_output['svg']
+            return str(value), run_data, query_generated_data, graph
     except Exception as e:
         print(f"Error processing query result: {e}")
         return '', {}, {}, {}
 
 def process_input_query_result(cls_instance, queryable_type, query_variables, arguments):
     try:
-        query_result = cls_instance.query_all()
-        for base, query_method, generate_input in query_result:
-            if base.__name__ == queryable_type and issubclass(base, Queryable):
-                query_base, query_method = base, query_method
-                base_instance = query_base()
-                copy_attributes(cls_instance, base_instance)
-                if generate_input:
-                    generated_input = generate_input(base_instance)
-                    query_generated_data = { query_variables[0]['name']: generated_input }
-                else:
-                    query_generated_data = generate_data(query_variables, {}, arguments)
-                query_output = query_method(base_instance, **deepcopy(query_generated_data))
-                value, graph = query_output['value'], query_output['svg']
-                return str(value), query_generated_data, graph
+        dispatch = get_query_dispatch(cls_instance.__class__).get(queryable_type)
+        if dispatch:
+            base_instance = load_queryable_state(dispatch, cls_instance)
+            if dispatch.generate_input:
+                generated_input = dispatch.generate_input(base_instance)
+                query_generated_data = { query_variables[0]['name']: generated_input }
+            else:
+                query_generated_data = generate_data(query_variables, {}, arguments)
+            query_output = dispatch.query(base_instance, **clone_context(query_generated_data))
+            value, graph = query_output['value'], query_output['svg']
+            return str(value), query_generated_data, graph
     except Exception as e:
         print(f"Error processing query result: {e}")
         return '', {}, {}
@@ -468,19 +548,15 @@ def generate_data(variables: list, element_type: Dict[str, str], arguments: Dict
         for var in variables
     }
 
-def copy_attributes(source_instance: Any, target_instance: Any) -> None:
-    for attr in dir(source_instance):
-        if not attr.startswith('__') and hasattr(target_instance, attr) and attr != 'variable':
-            setattr(target_instance, attr, getattr(source_instance, attr))
-
-def generate_options(cls, algo_generated_data, queryable_type, element_type, query_variables, query_answer, arguments):
-    option_data = deepcopy(algo_generated_data)
+def generate_options(cls, algo_generated_data, queryable_type, element_type, query_variables, query_answer, arguments, step_trace=None):
+    # Arguments replaced by a generated option are not copied first; generate_options does not modify its input.
+    memo = {}
+    option_data = {
+        var_name: var_value.generate_options() if callable(getattr(var_value, 'generate_options', None)) else clone_value(var_value, memo)
+        for var_name, var_value in algo_generated_data.items()
+    }
     cls_instance = cls(generate_graph=False)  # Create a new instance of the class
-    for var_name, var_value in option_data.items():
-        if hasattr(var_value, 'generate_options') and callable(getattr(var_value, 'generate_options')):
-            option_instance = var_value.generate_options()
-            option_data[var_name] = option_instance
-    query_result_option, _, _, _ = process_query_result(cls_instance, option_data, queryable_type, element_type, query_variables, arguments)
+    query_result_option, _, _, _ = process_query_result(cls_instance, option_data, queryable_type, element_type, query_variables, arguments, step_trace)
     try:
         if str(query_result_option) == query_answer:
             try:
@@ -524,6 +600,7 @@ def generate_svg(algo_generated_data, queryable_type=None) -> Dict[str, Optional
     Returns:
         Dict[str, Optional[str]]: The SVG content for graph and table if available, otherwise None.
     """
+    check_cancelled()
     instance = algo_generated_data.get('input') or algo_generated_data.get('problem')
     svg_content = {}
     if instance:
@@ -0,0 +1,119 @@
+import asyncio
+import importlib
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from utils.catalog_helper import CatalogEntry, build_catalog, fingerprint_catalog
+from utils.metadata_cache import METADATA_CACHE
+from utils.module_catalog import LazyClassMapping, ModuleCatalog
+from utils.subclass_registry import SUBCLASS_REGISTRY
+
+QUESTION_GENERATION_PATH = Path(__file__).resolve().parent.parent / 'question_generation'
+ALGO_PACKAGE = 'question_generation.algo.algo_subclasses'
+ALGO_PATH = QUESTION_GENERATION_PATH / 'algo' / 'algo_subclasses'
+INPUT_PACKAGE = 'question_generation.input.input_subclasses'
+INPUT_PATH = QUESTION_GENERATION_PATH / 'input' / 'input_subclasses'
+QUANTIFIABLE_QUALNAME = 'question_generation.quantifiable.quantifiable_class.Quantifiable'
+
+
+@dataclass(frozen=True)
+class ClassRegistry:
+    """
+    Immutable snapshot of the autoloaded algorithm and input classes.
+
+    The class mappings are lazy: their keys come from the module catalog and a
+    module is only imported the first time its class is looked up.
+    """
+    algo_classes: Mapping[str, Any]
+    input_classes: Mapping[str, Any]
+    catalog: Mapping[str, CatalogEntry]
+    fingerprint: str
+    modules: Optional[ModuleCatalog] = None
+    version: int = 0
+
+
+def build_class_registry(version: int = 0) -> ClassRegistry:
+    """Parse the algorithm and input packages once and return a lazy registry."""
+    METADATA_CACHE.clear()
+    modules = ModuleCatalog(QUESTION_GENERATION_PATH, QUESTION_GENERATION_PATH.name)
+    SUBCLASS_REGISTRY.set_loader(modules)
+    algo_classes = LazyClassMapping(modules, modules.tree(ALGO_PATH, ALGO_PACKAGE))
+    input_classes = LazyClassMapping(modules, modules.tree(INPUT_PATH, INPUT_PACKAGE))
+    catalog = build_catalog(algo_classes.entries(), input_classes.entries(), modules.subclass_names(QUANTIFIABLE_QUALNAME))
+    return ClassRegistry(
+        algo_classes=algo_classes,
+        input_classes=input_classes,
+        catalog=catalog,
+        fingerprint=fingerprint_catalog(catalog),
+        modules=modules,
+        version=version,
+    )
+
+
+def snapshot_module_mtimes(base_path: Path = QUESTION_GENERATION_PATH) -> Dict[Path, float]:
+    """Return the modification time of every module under the given path."""
+    return {path: path.stat().st_mtime for path in base_path.rglob('*.py')}
+
+
+def module_name_for_path(path: Path) -> Optional[str]:
+    """Map a file under question_generation/ to its dotted module name."""
+    try:
+        relative = path.relative_to(QUESTION_GENERATION_PATH.parent).with_suffix('')
+    except ValueError:
+        return None
+    parts = list(relative.parts)
+    if parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join(parts)
+
+
+class RegistryWatcher:
+    """
+    Poll question_generation/ for changed modules and swap in a rebuilt registry.
+
+    Only intended for development: changed modules that are already imported are
+    reloaded before the registry is rebuilt, and the new registry replaces the old
+    one on the application state in a single assignment.
+    """
+
+    def __init__(self, state: Any, interval: float = 1.0):
+        self.state = state
+        self.interval = interval
+        self._mtimes = snapshot_module_mtimes()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                mtimes = snapshot_module_mtimes()
+                changed = [path for path, mtime in mtimes.items() if self._mtimes.get(path) != mtime]
+                removed = set(self._mtimes) - set(mtimes)
+                self._mtimes = mtimes
+                if changed or removed:
+                    await asyncio.to_thread(self.rebuild, changed)
+            except Exception as e:
+                print(f"Error reloading class registry: {e}")
+
+    def rebuild(self, changed: list) -> None:
+        for path in changed:
+            module_name = module_name_for_path(path)
+            if module_name in sys.modules:
+                importlib.reload(sys.modules[module_name])
+        importlib.invalidate_caches()
+        current = self.state.class_registry
+        self.state.class_registry = build_class_registry(current.version + 1)
+        print(f"Class registry reloaded (version {current.version + 1})")
@@ -0,0 +1,283 @@
+import itertools
+import os
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.cancellation_helper import CancellationToken
+from utils.sandbox_protocol import FINAL_FRAMES, JOB, OUTPUT, ProtocolError, read_frame, write_frame
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SANDBOX_SCRIPT = PROJECT_ROOT / 'sandbox' / 'sandbox.py'
+# The only environment variables sandbox workers inherit: untrusted code must not see
+# database credentials or any other secret of the API.
+SANDBOX_ENV_VARS = (
+    'PATH', 'HOME', 'LANG', 'LC_ALL', 'TZ', 'TMPDIR',
+    'DOCKER_HOST', 'DOCKER_CONFIG', 'DOCKER_CONTEXT',
+    'SHARED_ARRAY_DIR', 'USER_CODE_CACHE_SIZE',
+)
+
+
+class SandboxError(Exception):
+    """Raised when a sandbox worker dies or answers with something that is not a response."""
+
+
+class SandboxTimeout(SandboxError):
+    """Raised when a sandbox worker had to be killed because it overran its job's time limit."""
+
+
+class SandboxCancelled(SandboxError):
+    """Raised when a sandbox worker was killed because its job was cancelled."""
+
+
+def sandbox_env() -> Dict[str, str]:
+    """The environment of sandbox workers, which do not load the .env file of the API either."""
+    env = {name: os.environ[name] for name in SANDBOX_ENV_VARS if name in os.environ}
+    env.update(PYTHONPATH=str(PROJECT_ROOT), PYTHON_DOTENV_DISABLED='1')
+    return env
+
+
+def local_worker_command() -> List[str]:
+    """Run the sandbox loop in a local Python process, as a stand-in for the container."""
+    return [sys.executable, str(SANDBOX_SCRIPT), '--serve']
+
+
+def docker_worker_command(image: str) -> List[str]:
+    """Run the sandbox loop in a long-lived container."""
+    return ['docker', 'run', '--rm', '-i', image, 'python', 'sandbox.py', '--serve']
+
+
+class SandboxWorker:
+    """
+    One long-lived sandbox process that runs generation jobs.
+
+    Jobs and responses are length-prefixed frames (see utils.sandbox_protocol).
+    Local workers exchange them over a dedicated pair of pipes passed as extra
+    file descriptors, so stdout stays free for anything else. Containers, which
+    only share stdin/stdout with the API, exchange them over those. The worker
+    keeps its class registry between jobs.
+    """
+
+    def __init__(self, command: List[str], dedicated_fds: bool = True):
+        env = sandbox_env()
+        if dedicated_fds:
+            job_read, job_write = os.pipe()
+            frame_read, frame_write = os.pipe()
+            self.process = subprocess.Popen(
+                [*command, '--fd-in', str(job_read), '--fd-out', str(frame_write)],
+                stdin=subprocess.DEVNULL,
+                pass_fds=(job_read, frame_write),
+                cwd=PROJECT_ROOT,
+                env=env,
+            )
+            os.close(job_read)
+            os.close(frame_write)
+            self.jobs_stream = os.fdopen(job_write, 'wb')
+            self.frames_stream = os.fdopen(frame_read, 'rb')
+        else:
+            self.process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                cwd=PROJECT_ROOT,
+                env=env,
+            )
+            self.jobs_stream = self.process.stdin
+            self.frames_stream = self.process.stdout
+        self.jobs = 0
+        self.killed_by: Optional[str] = None
+
+    def kill(self, reason: str = 'timeout') -> None:
+        self.killed_by = reason
+        self.process.kill()
+
+    def cancel(self) -> None:
+        self.kill('cancelled')
+
+    def alive(self) -> bool:
+        """Whether the worker can take another job: it was not killed and has not exited."""
+        return self.killed_by is None and self.process.poll() is None
+
+    def kill_error(self, kill_after: Optional[float]) -> Optional[SandboxError]:
+        if self.killed_by == 'timeout':
+            return SandboxTimeout(f"Sandbox worker killed after {kill_after} seconds")
+        if self.killed_by == 'cancelled':
+            return SandboxCancelled("Sandbox worker killed because its job was cancelled")
+        return None
+
+    def run(self, job: Dict[str, Any], on_frame: Optional[Callable[[Dict[str, Any]], None]] = None, kill_after: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Send a job and read frames until its result or error.
+
+        Partial and output frames are passed to `on_frame`; output frames are also
+        collected under the 'output' key of the returned frame. Frames left over
+        from an earlier job are skipped by id. A worker that has not answered after
+        `kill_after` seconds is killed, for jobs that do not stop within their budget.
+        """
+        output = []
+        timer = threading.Timer(kill_after, self.kill) if kill_after else None
+        if timer:
+            timer.daemon = True
+            timer.start()
+        try:
+            write_frame(self.jobs_stream, job)
+            while True:
+                frame = read_frame(self.frames_stream)
+                if frame is None:
+                    break
+                if frame.get('id') != job['id']:
+                    continue
+                if frame.get('type') in FINAL_FRAMES:
+                    self.jobs += 1
+                    frame['output'] = output
+                    return frame
+                if frame.get('type') == OUTPUT:
+                    output.append(frame)
+                if on_frame:
+                    on_frame(frame)
+        except (BrokenPipeError, OSError) as e:
+            raise self.kill_error(kill_after) or SandboxError(f"Sandbox worker pipe failed: {e}")
+        except ProtocolError as e:
+            raise self.kill_error(kill_after) or SandboxError(f"Invalid response from sandbox worker: {e}")
+        finally:
+            if timer:
+                # The timer may have fired after the final frame: wait for it, so alive() tells.
+                timer.cancel()
+                timer.join()
+        try:
+            code = self.process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            code = None
+        raise self.kill_error(kill_after) or SandboxError(f"Sandbox worker exited with code {code}")
+
+    def close(self, timeout: float = 5.0) -> None:
+        try:
+            self.jobs_stream.close()
+            self.process.wait(timeout=timeout)
+        except Exception:
+            self.process.kill()
+            self.process.wait()
+        self.frames_stream.close()
+
+
+class SandboxPool:
+    """
+    A fixed number of pre-started sandbox workers shared by the API.
+
+    A job takes an idle worker, or waits up to `acquire_timeout` seconds for
+    one. Workers are replaced after `max_jobs` jobs, and whenever they crash or
+    answer with garbage. A slot whose replacement fails to start stays in the
+    pool, empty, and the next job that takes it starts its worker again.
+    """
+
+    def __init__(self, command: List[str], size: int = 2, max_jobs: int = 100, dedicated_fds: bool = True, acquire_timeout: Optional[float] = 30.0):
+        self.command = command
+        self.dedicated_fds = dedicated_fds
+        self.size = size
+        self.max_jobs = max_jobs
+        self.acquire_timeout = acquire_timeout
+        self.restarts = 0
+        self.completed = 0
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        # None is a slot whose worker could not be started.
+        self._idle: "queue.Queue[Optional[SandboxWorker]]" = queue.Queue()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(SandboxWorker(command, dedicated_fds))
+
+    def _replace(self, worker: SandboxWorker) -> Optional[SandboxWorker]:
+        worker.close(timeout=1.0)
+        with self._lock:
+            self.restarts += 1
+        try:
+            return SandboxWorker(self.command, self.dedicated_fds)
+        except Exception as e:
+            print(f"Error restarting sandbox worker: {e}")
+            return None
+
+    def _acquire(self, timeout: Optional[float]) -> SandboxWorker:
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise SandboxError("No sandbox worker became available")
+        if worker is not None:
+            return worker
+        try:
+            return SandboxWorker(self.command, self.dedicated_fds)
+        except Exception as e:
+            self._idle.put(None)
+            raise SandboxError(f"Sandbox worker failed to start: {e}")
+
+    def run(
+        self,
+        request: Dict[str, Any],
+        timeout: Optional[float] = None,
+        on_frame: Optional[Callable[[Dict[str, Any]], None]] = None,
+        budget: Optional[Dict[str, Any]] = None,
+        kill_after: Optional[float] = None,
+        arrays: Optional[Dict[str, Any]] = None,
+        token: Optional[CancellationToken] = None,
+        stream: bool = False,
+        question_context: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Run one generation request on an idle worker, under the given budget, and return its final frame.
+
+        `timeout` bounds the wait for an idle worker, `acquire_timeout` of the pool
+        by default. `arrays` is the manifest of the shared arrays the request refers
+        to, if any (see utils.shared_array_helper). Cancelling `token` kills the
+        worker running the job, which is then replaced like a crashed one. With
+        `stream`, the parts of the question are sent to `on_frame` as partial frames
+        instead of in the final frame. Without `question_context`, only the
+        subquestions are generated (see generate_question).
+        """
+        if self._closed:
+            raise SandboxError("Sandbox pool is closed")
+        worker: Optional[SandboxWorker] = self._acquire(self.acquire_timeout if timeout is None else timeout)
+        if token and token.cancelled:
+            self._idle.put(worker)
+            raise SandboxCancelled("Job cancelled before it started")
+        cancel = worker.cancel
+        if token:
+            token.add_callback(cancel)
+        try:
+            response = worker.run({'id': next(self._ids), 'type': JOB, 'request': request, 'budget': budget, 'arrays': arrays, 'stream': stream, 'question_context': question_context}, on_frame, kill_after)
+        except SandboxError:
+            worker = self._replace(worker)
+            raise
+        finally:
+            try:
+                if token:
+                    token.remove_callback(cancel)
+                # A worker killed after it answered still answered; only the next job needs a new one.
+                if worker is not None and (worker.jobs >= self.max_jobs or not worker.alive()):
+                    worker = self._replace(worker)
+            finally:
+                # The slot goes back to the pool whatever happened, empty if its worker could not be restarted.
+                self._idle.put(worker)
+        with self._lock:
+            self.completed += 1
+        return response
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': self.size,
+            'idle': self._idle.qsize(),
+            'completed': self.completed,
+            'restarts': self.restarts,
+            'max_jobs': self.max_jobs,
+        }
@@ -0,0 +1,80 @@
+import json
+import struct
+from typing import Any, BinaryIO, Dict, Optional
+
+HEADER = struct.Struct('>I')
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# Frame types sent by the API to a worker.
+JOB = 'job'
+# Frame types sent by a worker back to the API.
+PARTIAL = 'partial'
+OUTPUT = 'output'
+RESULT = 'result'
+ERROR = 'error'
+FINAL_FRAMES = (RESULT, ERROR)
+
+
+class ProtocolError(Exception):
+    """Raised when a frame is truncated, too large or not valid JSON."""
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Serialize a message as compact JSON prefixed by its length."""
+    body = json.dumps(message, separators=(',', ':'), default=str).encode('utf-8')
+    if len(body) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {len(body)} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    return HEADER.pack(len(body)) + body
+
+
+def write_frame(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    stream.write(encode_frame(message))
+    stream.flush()
+
+
+def read_exactly(stream: BinaryIO, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_frame(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """Read one frame, or return None when the stream is closed between frames."""
+    header = read_exactly(stream, HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise ProtocolError("Truncated frame header")
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {size} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    body = read_exactly(stream, size)
+    if len(body) < size:
+        raise ProtocolError("Truncated frame body")
+    try:
+        return json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ProtocolError(f"Invalid frame: {e}")
+
+
+class FrameWriter:
+    """A text stream that forwards everything written to it as output frames of one job."""
+
+    def __init__(self, stream: BinaryIO, job_id: Any, name: str):
+        self.stream = stream
+        self.job_id = job_id
+        self.name = name
+
+    def write(self, data: str) -> int:
+        if data:
+            write_frame(self.stream, {'id': self.job_id, 'type': OUTPUT, 'stream': self.name, 'data': data})
+        return len(data)
+
+    def flush(self) -> None:
+        pass
@@ -0,0 +1,48 @@
+import hashlib
+import random
+import secrets
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from utils.faker_factory import seed_faker
+
+CURRENT_SEED: ContextVar[Optional[int]] = ContextVar('generation_seed', default=None)
+
+
+def new_seed() -> int:
+    return secrets.randbits(32)
+
+def derive_seed(seed: int, *path: Any) -> int:
+    """
+    Derive the seed of a task from the seed of the generation it belongs to.
+
+    The derivation only depends on `seed` and `path`, not on the order tasks run
+    in or on the process running them, unlike hash().
+    """
+    digest = hashlib.blake2b(repr((seed, *path)).encode(), digest_size=4).digest()
+    return int.from_bytes(digest, 'big')
+
+def task_seed(*path: Any) -> Optional[int]:
+    """Derive the seed of a task from the current seed, if there is one."""
+    seed = CURRENT_SEED.get()
+    return None if seed is None else derive_seed(seed, *path)
+
+@contextmanager
+def seeded(seed: Optional[int]) -> Iterator[None]:
+    """
+    Seed the random module and Faker for the block, and make `seed` the current seed.
+
+    What the block generates then only depends on `seed`, whatever ran before
+    it. Both generators are shared by the threads of a process, so concurrent
+    generations in threads are not reproducible; processes and subinterpreters
+    each have their own.
+    """
+    reset = CURRENT_SEED.set(seed)
+    if seed is not None:
+        random.seed(seed)
+        seed_faker(seed)
+    try:
+        yield
+    finally:
+        CURRENT_SEED.reset(reset)
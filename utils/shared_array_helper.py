@@ -0,0 +1,123 @@
+import mmap
+import os
+import tempfile
+from array import array
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+SHARED_ARRAY_KEY = '__shared_array__'
+SHARED_ARRAY_PREFIX = 'qg-arrays-'
+# Typed array formats of the element types that can be shared; bool is excluded on purpose.
+ARRAY_FORMATS = {int: 'q', float: 'd'}
+
+
+def array_format(value: List[Any]) -> Optional[str]:
+    """Return the typed array format of a list whose elements are all ints or all floats."""
+    element_type = type(value[0]) if value else None
+    if element_type not in ARRAY_FORMATS or not all(type(element) is element_type for element in value):
+        return None
+    return ARRAY_FORMATS[element_type]
+
+
+class SharedArrayWriter:
+    """
+    Move the large numeric lists of a job into one memory-mapped file.
+
+    `share` replaces every list of at least `min_items` ints or floats with a
+    small descriptor, and `manifest` writes the raw arrays to a file in
+    `directory` (a tmpfs such as /dev/shm by default) and describes where each
+    one lies. Workers map that file read-only with `read_shared_arrays` instead
+    of parsing the numbers from the job frame. The file is removed on close.
+    """
+
+    def __init__(self, directory: str = Config.SHARED_ARRAY_DIR, min_items: int = Config.SHARED_ARRAY_MIN_ITEMS):
+        self.directory = directory
+        self.min_items = min_items
+        self.arrays: List[array] = []
+        self.path: Optional[str] = None
+
+    def __enter__(self) -> 'SharedArrayWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def share(self, value: Any) -> Any:
+        """Return a copy of a JSON-like value with its large numeric lists replaced by descriptors."""
+        if isinstance(value, dict):
+            if SHARED_ARRAY_KEY in value:
+                raise ValueError(f"'{SHARED_ARRAY_KEY}' is a reserved key")
+            return {key: self.share(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            fmt = array_format(value) if len(value) >= self.min_items else None
+            if fmt is None:
+                return [self.share(item) for item in value]
+            try:
+                self.arrays.append(array(fmt, value))
+            except OverflowError:
+                return list(value)
+            return {SHARED_ARRAY_KEY: len(self.arrays) - 1}
+        return value
+
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        """Write the shared arrays and return where to find them, or None when nothing was shared."""
+        if not self.arrays:
+            return None
+        fd, self.path = tempfile.mkstemp(prefix=SHARED_ARRAY_PREFIX, dir=self.directory)
+        entries = []
+        offset = 0
+        with os.fdopen(fd, 'wb') as stream:
+            for shared in self.arrays:
+                stream.write(shared)
+                entries.append({'format': shared.typecode, 'offset': offset, 'length': len(shared)})
+                offset += len(shared) * shared.itemsize
+        return {'path': self.path, 'arrays': entries}
+
+    def close(self) -> None:
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self.arrays = []
+
+
+def is_shared_array_path(path: str) -> bool:
+    """Only files written by SharedArrayWriter in the configured directory may be mapped."""
+    directory, name = os.path.split(os.path.realpath(path))
+    return directory == os.path.realpath(Config.SHARED_ARRAY_DIR) and name.startswith(SHARED_ARRAY_PREFIX)
+
+def read_shared_arrays(value: Any, manifest: Optional[Dict[str, Any]]) -> Any:
+    """
+    Return a copy of a value shared by SharedArrayWriter with its descriptors replaced by lists.
+
+    Args:
+        value (Any): The value with shared array descriptors.
+        manifest (Optional[Dict[str, Any]]): The manifest of the file holding the arrays.
+
+    Returns:
+        Any: The value with the arrays read from a read-only mapping of the file.
+    """
+    if not manifest:
+        return value
+    if not is_shared_array_path(manifest['path']):
+        raise ValueError(f"Refusing to map '{manifest['path']}' outside {Config.SHARED_ARRAY_DIR}")
+    entries = manifest['arrays']
+    with open(manifest['path'], 'rb') as stream, mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as buffer:
+
+            def restore(item: Any) -> Any:
+                if isinstance(item, dict):
+                    if set(item) == {SHARED_ARRAY_KEY}:
+                        entry = entries[item[SHARED_ARRAY_KEY]]
+                        size = entry['length'] * array(entry['format']).itemsize
+                        with buffer[entry['offset']:entry['offset'] + size].cast(entry['format']) as view:
+                            return view.tolist()
+                    return {key: restore(inner) for key, inner in item.items()}
+                if isinstance(item, list):
+                    return [restore(inner) for inner in item]
+                return item
+
+            return restore(value)
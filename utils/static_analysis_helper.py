@@ -0,0 +1,265 @@
+import ast
+import builtins
+import hashlib
+import importlib
+import inspect
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from utils.lru_cache import LRUCache
+from utils.user__code_helper import load_input_class, load_user_class
+
+SAFE_MODULE_PREFIXES = ('question_generation', 'typing')
+BUILTIN_NAMES = {
+    name: getattr(builtins, name)
+    for name in ('int', 'str', 'bool', 'float', 'list', 'dict', 'tuple', 'set', 'object')
+}
+DEFAULT_NEW_METHODS = (object.__new__, list.__new__)
+
+
+class StaticAnalysisError(Exception):
+    """Raised when user code cannot be described without executing it."""
+
+
+class _Unresolved:
+    """Placeholder for a name whose value is only known at runtime."""
+
+    def __init__(self, name: str, may_be_class: bool = True):
+        self.name = name
+        self.may_be_class = may_be_class
+
+
+class StaticClassInfo:
+    """
+    Description of a class defined in user code, read from its AST.
+
+    The class itself is never created: its bases are resolved to the real classes
+    they name and method signatures are read from the function definitions.
+    """
+
+    def __init__(self, node: ast.ClassDef, symbols: Dict[str, Any], bases: Tuple[Type, ...]):
+        self.node = node
+        self.symbols = symbols
+        self.__name__ = node.name
+        self.__bases__ = bases
+        self.methods = {
+            statement.name: statement
+            for statement in node.body
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef))
+        }
+        self.attributes = {
+            target.id: statement.value
+            for statement in node.body if isinstance(statement, ast.Assign)
+            for target in statement.targets if isinstance(target, ast.Name)
+        }
+
+    def get_attribute(self, name: str, default: Any = None) -> Any:
+        """Return a literal class attribute, falling back to the bases."""
+        if name in self.attributes:
+            try:
+                return ast.literal_eval(self.attributes[name])
+            except ValueError:
+                raise StaticAnalysisError(f"Attribute '{name}' is not a literal")
+        for base in self.__bases__:
+            if hasattr(base, name):
+                return getattr(base, name)
+        return default
+
+    def method_parameters(self, method_name: str, names: Optional[Sequence[str]] = None) -> List[Tuple[str, Any]]:
+        """
+        Return the (name, annotation) pairs of a method, skipping self/cls.
+
+        Only the parameters listed in `names` are resolved when it is given.
+        """
+        node = self.methods.get(method_name)
+        if node is None:
+            for base in self.__bases__:
+                if hasattr(base, method_name):
+                    signature = inspect.signature(getattr(base, method_name))
+                    return [
+                        (param_name, param.annotation)
+                        for param_name, param in signature.parameters.items()
+                        if param_name not in ('self', 'cls') and (names is None or param_name in names)
+                    ]
+            raise StaticAnalysisError(f"Method '{method_name}' not found on class '{self.__name__}'")
+        arguments = node.args
+        if arguments.vararg or arguments.kwarg:
+            raise StaticAnalysisError(f"Method '{method_name}' takes variadic arguments")
+        parameters = []
+        for arg in arguments.posonlyargs + arguments.args + arguments.kwonlyargs:
+            if arg.arg in ('self', 'cls') or (names is not None and arg.arg not in names):
+                continue
+            annotation = inspect.Parameter.empty if arg.annotation is None else resolve_annotation(arg.annotation, self.symbols)
+            parameters.append((arg.arg, annotation))
+        return parameters
+
+    def init_parameters(self) -> List[Tuple[str, Any]]:
+        """Return the exposed constructor parameters, mirroring get_init_arguments."""
+        exposed_args = self.get_attribute('_exposed_args', [])
+        if '__new__' in self.methods:
+            return self.method_parameters('__new__', exposed_args)
+        inherited_new = next((base.__new__ for base in self.__bases__ if base.__new__ not in DEFAULT_NEW_METHODS), None)
+        if inherited_new is not None:
+            raise StaticAnalysisError(f"Class '{self.__name__}' inherits a custom __new__")
+        return self.method_parameters('__init__', exposed_args)
+
+
+UserClass = Union[Type, StaticClassInfo]
+
+
+def resolve_annotation(node: ast.expr, symbols: Dict[str, Any]) -> Any:
+    """Evaluate an annotation expression made of names, attributes and subscripts."""
+    if isinstance(node, ast.Name):
+        value = symbols.get(node.id, BUILTIN_NAMES.get(node.id))
+        if value is None or isinstance(value, (_Unresolved, StaticClassInfo)):
+            raise StaticAnalysisError(f"Cannot resolve annotation '{node.id}'")
+        return value
+    if isinstance(node, ast.Attribute):
+        value = resolve_annotation(node.value, symbols)
+        if not inspect.ismodule(value) or not hasattr(value, node.attr):
+            raise StaticAnalysisError(f"Cannot resolve annotation '{ast.unparse(node)}'")
+        return getattr(value, node.attr)
+    if isinstance(node, ast.Subscript):
+        origin = resolve_annotation(node.value, symbols)
+        if isinstance(node.slice, ast.Tuple):
+            arguments = tuple(resolve_annotation(element, symbols) for element in node.slice.elts)
+        else:
+            arguments = resolve_annotation(node.slice, symbols)
+        try:
+            return origin[arguments]
+        except TypeError as e:
+            raise StaticAnalysisError(f"Cannot resolve annotation '{ast.unparse(node)}': {e}")
+    if isinstance(node, ast.Constant) and node.value is None:
+        return None
+    raise StaticAnalysisError(f"Cannot resolve annotation '{ast.unparse(node)}'")
+
+
+def import_safe_module(module_name: str) -> Any:
+    if module_name.split('.')[0] not in SAFE_MODULE_PREFIXES:
+        raise StaticAnalysisError(f"Module '{module_name}' is not known statically")
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise StaticAnalysisError(f"Cannot import '{module_name}': {e}")
+
+
+def bind(symbols: Dict[str, Any], order: List[str], name: str, value: Any) -> None:
+    if name not in symbols:
+        order.append(name)
+    symbols[name] = value
+
+
+def collect_symbols(sources: Sequence[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Replay the top-level bindings of the sources in exec order.
+
+    Returns the symbol table and the order in which names were first bound, which
+    is the order load_user_class sees in its namespace.
+    """
+    symbols: Dict[str, Any] = {}
+    order: List[str] = []
+    for source in sources:
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as e:
+            raise StaticAnalysisError(f"Invalid syntax: {e}")
+        for statement in tree.body:
+            if isinstance(statement, ast.Import):
+                for alias in statement.names:
+                    name = alias.asname or alias.name.split('.')[0]
+                    try:
+                        value = import_safe_module(alias.name if alias.asname else name)
+                    except StaticAnalysisError:
+                        value = _Unresolved(name)
+                    bind(symbols, order, name, value)
+            elif isinstance(statement, ast.ImportFrom):
+                if statement.level or not statement.module:
+                    raise StaticAnalysisError("Relative imports are not supported")
+                for alias in statement.names:
+                    if alias.name == '*':
+                        raise StaticAnalysisError("Star imports are not supported")
+                    name = alias.asname or alias.name
+                    try:
+                        value = getattr(import_safe_module(statement.module), alias.name)
+                    except (StaticAnalysisError, AttributeError):
+                        value = _Unresolved(name)
+                    bind(symbols, order, name, value)
+            elif isinstance(statement, ast.ClassDef):
+                try:
+                    bases = tuple(resolve_annotation(base, symbols) for base in statement.bases)
+                    value = StaticClassInfo(statement, symbols, bases) if all(inspect.isclass(base) for base in bases) else _Unresolved(statement.name)
+                except StaticAnalysisError:
+                    value = _Unresolved(statement.name)
+                bind(symbols, order, statement.name, value)
+            elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                bind(symbols, order, statement.name, _Unresolved(statement.name, may_be_class=False))
+            elif isinstance(statement, (ast.Assign, ast.AnnAssign)):
+                targets = statement.targets if isinstance(statement, ast.Assign) else [statement.target]
+                for target in targets:
+                    if not isinstance(target, ast.Name):
+                        raise StaticAnalysisError("Only simple top-level assignments are supported")
+                    bind(symbols, order, target.id, _Unresolved(target.id))
+            elif isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant):
+                continue
+            else:
+                raise StaticAnalysisError(f"Unsupported top-level statement '{type(statement).__name__}'")
+    return symbols, order
+
+
+def find_user_class(sources: Sequence[str]) -> UserClass:
+    """Statically find the class load_user_class would return for the sources."""
+    symbols, order = collect_symbols(sources)
+    for name in reversed(order):
+        value = symbols[name]
+        if isinstance(value, _Unresolved):
+            if not value.may_be_class:
+                continue
+            raise StaticAnalysisError(f"Cannot tell statically whether '{name}' is a class")
+        if isinstance(value, StaticClassInfo) or inspect.isclass(value):
+            return value
+    raise StaticAnalysisError("No class found in user-defined code")
+
+
+def source_hash(sources: Sequence[str]) -> str:
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(source.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+_ANALYSIS_CACHE = LRUCache(maxsize=256)
+
+
+def analyze_user_class(sources: Sequence[str]) -> UserClass:
+    """
+    Return the static description of the user class, cached by source hash.
+
+    Raises StaticAnalysisError when the code has to be executed to be described.
+    """
+    key = source_hash(sources)
+    result = _ANALYSIS_CACHE.get(key)
+    if result is None:
+        try:
+            result = find_user_class(sources)
+        except StaticAnalysisError as e:
+            result = e
+        _ANALYSIS_CACHE.put(key, result)
+    if isinstance(result, StaticAnalysisError):
+        raise result
+    return result
+
+
+def describe_user_class(userAlgoCode: str, userEnvCode: Optional[List[str]] = None) -> UserClass:
+    """Describe the user algorithm class, executing the code only when static analysis fails."""
+    try:
+        return analyze_user_class([*(userEnvCode or []), userAlgoCode])
+    except StaticAnalysisError:
+        return load_user_class(userAlgoCode, userEnvCode=userEnvCode)
+
+
+def describe_input_class(userEnvCode: str) -> UserClass:
+    """Describe the user input class, executing the code only when static analysis fails."""
+    try:
+        return analyze_user_class([userEnvCode])
+    except StaticAnalysisError:
+        return load_input_class(userEnvCode)
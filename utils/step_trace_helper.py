@@ -0,0 +1,174 @@
+import sys
+import threading
+from contextlib import contextmanager
+from copy import copy
+from typing import Any, Dict, Iterator, List, Optional
+
+from models.question_generation import StepTrace
+from question_generation.queryable.queryable_subclasses.step import Step
+from utils.cancellation_helper import check_cancelled
+
+# sys.monitoring (PEP 669) is only available from Python 3.12; older versions fall back to sys.settrace.
+MONITORING = getattr(sys, 'monitoring', None)
+TOOL_NAME = 'step_trace'
+# Tool ids tried in order; 0, 1 and 5 are conventionally used by debuggers, coverage and optimizers.
+TOOL_IDS = (3, 4, 2)
+
+# The tracers recording steps, by the code object of the algo they trace and by thread.
+ACTIVE_TRACERS: Dict[Any, Dict[int, List['StepTracer']]] = {}
+TRACERS_LOCK = threading.Lock()
+_tool_id: Optional[int] = None
+
+
+class StepTracer:
+    """Record chosen local variables of algo into the step history of the instance running it."""
+
+    def __init__(self, instance: Step, trace: StepTrace):
+        self.instance = instance
+        self.variables = trace.variables
+        self.lines = set(trace.lines or [])
+        self.loops = trace.loops
+
+    def record(self, frame: Any) -> None:
+        """Append the traced variables, or the only one, to the step history."""
+        values = {name: copy(frame.f_locals[name]) for name in self.variables if name in frame.f_locals}
+        if not values:
+            return
+        self.instance.step(next(iter(values.values())) if len(self.variables) == 1 else values)
+
+
+def code_tracers(code: Any) -> List['StepTracer']:
+    return [tracer for tracers in ACTIVE_TRACERS.get(code, {}).values() for tracer in tracers]
+
+def current_tracer(code: Any) -> Optional['StepTracer']:
+    tracers = ACTIVE_TRACERS.get(code, {}).get(threading.get_ident())
+    return tracers[-1] if tracers else None
+
+def on_line(code: Any, line_number: int) -> Any:
+    tracer = current_tracer(code)
+    if tracer and line_number in tracer.lines:
+        tracer.record(sys._getframe(1))
+    elif not any(line_number in other.lines for other in code_tracers(code)):
+        # Disabling is per location, not per thread: only when no tracer of the code wants the line.
+        return MONITORING.DISABLE
+
+def on_jump(code: Any, offset: int, destination: int) -> Any:
+    if destination >= offset:
+        return MONITORING.DISABLE
+    tracer = current_tracer(code)
+    if tracer and tracer.loops:
+        tracer.record(sys._getframe(1))
+
+def claim_tool_id() -> int:
+    """Claim a sys.monitoring tool id and register the step callbacks, once per interpreter."""
+    global _tool_id
+    if _tool_id is None:
+        tool_id = next((tool_id for tool_id in TOOL_IDS if MONITORING.get_tool(tool_id) is None), None)
+        if tool_id is None:
+            raise RuntimeError("No sys.monitoring tool id is free for step tracing")
+        MONITORING.use_tool_id(tool_id, TOOL_NAME)
+        MONITORING.register_callback(tool_id, MONITORING.events.LINE, on_line)
+        MONITORING.register_callback(tool_id, MONITORING.events.JUMP, on_jump)
+        _tool_id = tool_id
+    return _tool_id
+
+def tracer_events(tracers: List[StepTracer]) -> int:
+    events = MONITORING.events.NO_EVENTS
+    for tracer in tracers:
+        if tracer.lines:
+            events |= MONITORING.events.LINE
+        if tracer.loops:
+            events |= MONITORING.events.JUMP
+    return events
+
+@contextmanager
+def monitored_steps(code: Any, tracer: StepTracer) -> Iterator[None]:
+    """
+    Record steps with sys.monitoring events local to the code of algo.
+
+    No other code is instrumented, and lines and forward jumps that do not
+    record anything are disabled after their first event, so only back-edges
+    and chosen lines keep calling back into Python.
+    """
+    tool_id = claim_tool_id()
+    thread = threading.get_ident()
+    with TRACERS_LOCK:
+        ACTIVE_TRACERS.setdefault(code, {}).setdefault(thread, []).append(tracer)
+        # Re-enable the locations an earlier trace, with other lines, disabled. Setting the
+        # local events of the code anew re-instruments it for this tool only, whereas
+        # restart_events() would re-enable what every other tool disabled too.
+        MONITORING.set_local_events(tool_id, code, MONITORING.events.NO_EVENTS)
+        MONITORING.set_local_events(tool_id, code, tracer_events(code_tracers(code)))
+    try:
+        yield
+    finally:
+        with TRACERS_LOCK:
+            by_thread = ACTIVE_TRACERS[code]
+            by_thread[thread].pop()
+            if not by_thread[thread]:
+                del by_thread[thread]
+            if not by_thread:
+                del ACTIVE_TRACERS[code]
+            MONITORING.set_local_events(tool_id, code, tracer_events(code_tracers(code)))
+
+@contextmanager
+def settrace_steps(code: Any, tracer: StepTracer) -> Iterator[None]:
+    """
+    Record steps with sys.settrace, for Pythons without sys.monitoring.
+
+    Only frames of algo get a line tracer, and a line number going back is taken
+    as a loop back-edge. Any trace function already set, such as the instruction
+    budget, keeps receiving its events.
+    """
+    previous = sys.gettrace()
+
+    def trace_calls(frame: Any, event: str, arg: Any):
+        local = previous(frame, event, arg) if previous else None
+        if frame.f_code is not code:
+            return local
+        last_line = frame.f_lineno
+
+        def trace_lines(frame: Any, event: str, arg: Any):
+            nonlocal local, last_line
+            if local:
+                local = local(frame, event, arg)
+            if event == 'line':
+                if frame.f_lineno in tracer.lines or (tracer.loops and frame.f_lineno < last_line):
+                    tracer.record(frame)
+                last_line = frame.f_lineno
+            return trace_lines
+
+        return trace_lines
+
+    sys.settrace(trace_calls)
+    try:
+        yield
+    finally:
+        sys.settrace(previous)
+
+@contextmanager
+def trace_steps(instance: Step, trace: StepTrace) -> Iterator[None]:
+    """Record the steps of the algo of the instance while the block runs."""
+    code = instance.algo.__code__
+    tracer = StepTracer(instance, trace)
+    steps = monitored_steps if MONITORING else settrace_steps
+    with steps(code, tracer):
+        yield
+
+def run_algo(instance: Any, arguments: Dict[str, Any], trace: Optional[StepTrace] = None) -> Any:
+    """
+    Run the algo of an instance, recording its steps when a trace is given.
+
+    Args:
+        instance (Any): The algorithm instance.
+        arguments (Dict[str, Any]): The arguments of algo.
+        trace (Optional[StepTrace]): The variables and places to record steps at.
+
+    Returns:
+        Any: What algo returned.
+    """
+    check_cancelled()
+    if trace is None or not isinstance(instance, Step):
+        return instance.algo(**arguments)
+    with trace_steps(instance, trace):
+        return instance.algo(**arguments)
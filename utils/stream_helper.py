@@ -0,0 +1,100 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+from models.execution_budget import ExecutionBudget
+from models.question_generation import GenerateQuestionRequest
+from utils.budget_helper import BudgetExceededError
+from utils.cancellation_helper import CancellationToken
+from utils.execution_helper import ExecutionBackend, generation_error
+from utils.registry_helper import ClassRegistry
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+SSE_MEDIA_TYPE = 'text/event-stream'
+
+FrameEncoder = Callable[[Dict[str, Any]], str]
+
+
+def ndjson_line(frame: Dict[str, Any]) -> str:
+    """Encode one frame of a streamed response as a line of newline-delimited JSON."""
+    return json.dumps(jsonable_encoder(frame)) + "\n"
+
+def sse_event(frame: Dict[str, Any]) -> str:
+    """Encode one frame of a streamed response as a server-sent event named after its type."""
+    return f"event: {frame['type']}\ndata: {json.dumps(jsonable_encoder(frame))}\n\n"
+
+def stream_encoding(accept: str) -> Tuple[FrameEncoder, str]:
+    """Pick server-sent events when the Accept header asks for them, newline-delimited JSON otherwise."""
+    if SSE_MEDIA_TYPE in accept:
+        return sse_event, SSE_MEDIA_TYPE
+    return ndjson_line, NDJSON_MEDIA_TYPE
+
+async def stream_question(
+    backend: ExecutionBackend,
+    request: GenerateQuestionRequest,
+    registry: ClassRegistry,
+    budget: ExecutionBudget,
+    token: CancellationToken,
+    encode: FrameEncoder = ndjson_line
+) -> AsyncIterator[str]:
+    """
+    Stream a question as its parts are generated.
+
+    A 'description' frame comes first, then an 'svg' frame when the question
+    has one, then a 'subquestion' frame per subquestion as each one completes.
+    A 'summary' frame with the seed ends the stream, or an 'error' frame with
+    the status code and detail /generate would have answered. Parts are not
+    kept once sent. When the client goes away the generation is cancelled.
+
+    Args:
+        backend (ExecutionBackend): Where the question is generated.
+        request (GenerateQuestionRequest): The request to generate.
+        registry (ClassRegistry): The classes to generate from.
+        budget (ExecutionBudget): The budget of the generation.
+        token (CancellationToken): Cancels the generation.
+        encode (FrameEncoder): Encodes each frame for the response.
+
+    Yields:
+        str: The encoded frames.
+    """
+    loop = asyncio.get_running_loop()
+    loop_thread = threading.get_ident()
+    parts: asyncio.Queue = asyncio.Queue()
+
+    def on_part(part: Dict[str, Any]) -> None:
+        if threading.get_ident() == loop_thread:
+            parts.put_nowait(part)
+        else:
+            loop.call_soon_threadsafe(parts.put_nowait, part)
+
+    started = time.perf_counter()
+    subquestions = 0
+    generation = asyncio.ensure_future(backend.generate(request, registry, budget, token, on_part))
+    try:
+        # Parts handed over from a worker thread are queued before the generation completes.
+        while not generation.done() or not parts.empty():
+            if parts.empty():
+                next_part = asyncio.ensure_future(parts.get())
+                await asyncio.wait({next_part, generation}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_part.done():
+                    next_part.cancel()
+                    continue
+                part = next_part.result()
+            else:
+                part = parts.get_nowait()
+            subquestions += part['type'] == 'subquestion'
+            yield encode(part)
+        result = generation.result()
+        if not result:
+            raise HTTPException(status_code=500, detail="Question generation failed")
+        yield encode({'type': 'summary', 'seed': result.get('seed'), 'subquestions': subquestions, 'elapsed': round(time.perf_counter() - started, 6)})
+    except (BudgetExceededError, Exception) as e:
+        yield encode({'type': 'error', **generation_error(e)})
+    finally:
+        token.cancel()
+        generation.cancel()
@@ -0,0 +1,127 @@
+import sys
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+
+def is_module_class(cls: Type) -> bool:
+    """Whether `cls` is the class its imported module defines under its name, rather than one of `exec`'d code."""
+    return getattr(sys.modules.get(cls.__module__), cls.__name__, None) is cls
+
+
+class SubclassRegistry:
+    """
+    Index of the subclasses of the tracked base classes.
+
+    Base classes call `track` on themselves and `register` from `__init_subclass__`,
+    so every subclass is recorded as it is defined. For each registered class the
+    registry keeps the transitive set of its subclasses and a `name -> class` index,
+    which turns subclass lookups by name into a dictionary access.
+
+    Classes are only held through weak references so that classes created by
+    `exec`'d user code disappear once that code is no longer referenced. The
+    references of dead classes are dropped from the name index at the next
+    registration or lookup.
+
+    Modules that define subclasses may not be imported yet. When a loader is set,
+    lookups first ask it to import the modules that statically define the classes
+    being looked up.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._subclasses: "weakref.WeakKeyDictionary[type, weakref.WeakSet]" = weakref.WeakKeyDictionary()
+        self._names: "weakref.WeakKeyDictionary[type, Dict[str, List[weakref.ref]]]" = weakref.WeakKeyDictionary()
+        self._loader: Optional[Any] = None
+        # Name index entries whose class died, queued by weakref callbacks, which may run
+        # in the middle of any code and so must not touch the index themselves.
+        self._dead: List[Tuple[Dict[str, List[weakref.ref]], str, weakref.ref]] = []
+
+    def set_loader(self, loader: Optional[Any]) -> None:
+        """Set the object whose `load_by_name(name)` and `load_subclasses(cls)` import classes on demand."""
+        self._loader = loader
+
+    def ensure_loaded(self, cls: Type) -> None:
+        """Import the modules that define subclasses of `cls`, if a loader is set."""
+        if self._loader is not None:
+            self._loader.load_subclasses(cls)
+
+    def track(self, base: Type) -> None:
+        """Start indexing the subclasses of a base class."""
+        with self._lock:
+            self._subclasses.setdefault(base, weakref.WeakSet())
+            self._names.setdefault(base, {})
+
+    def register(self, cls: Type) -> None:
+        """Record a new class under every tracked class in its MRO."""
+        with self._lock:
+            if cls in self._subclasses:
+                return
+            self._prune()
+            self.track(cls)
+            for ancestor in cls.__mro__[1:]:
+                if ancestor in self._subclasses:
+                    self._subclasses[ancestor].add(cls)
+                    self._index(self._names[ancestor], cls)
+
+    def _index(self, names: Dict[str, List[weakref.ref]], cls: Type) -> None:
+        name = cls.__name__
+
+        def forget(ref: weakref.ref) -> None:
+            self._dead.append((names, name, ref))
+
+        names.setdefault(name, []).append(weakref.ref(cls, forget))
+
+    def _prune(self) -> None:
+        while self._dead:
+            names, name, ref = self._dead.pop()
+            refs = names.get(name)
+            if refs is None:
+                continue
+            try:
+                refs.remove(ref)
+            except ValueError:
+                pass
+            if not refs:
+                del names[name]
+
+    def is_tracked(self, cls: Type) -> bool:
+        try:
+            return cls in self._subclasses
+        except TypeError:
+            return False
+
+    def get_subclasses(self, cls: Type) -> List[Type]:
+        """Return all transitive subclasses of a tracked class."""
+        self.ensure_loaded(cls)
+        with self._lock:
+            return list(self._subclasses.get(cls, ()))
+
+    def find(self, base: Type, name: str) -> Optional[Type]:
+        """
+        Return the live subclass of `base` with the given name.
+
+        Classes of imported modules win over those of `exec`'d user code, so user
+        code cannot shadow a built-in class by reusing its name. Among classes of
+        the same kind, the most recently defined one wins.
+        """
+        cls = self._find(base, name)
+        if cls is None and self._loader is not None and self._loader.load_by_name(name):
+            cls = self._find(base, name)
+        return cls
+
+    def _find(self, base: Type, name: str) -> Optional[Type]:
+        with self._lock:
+            self._prune()
+            refs = self._names.get(base, {}).get(name, ())
+            classes = [cls for cls in (ref() for ref in reversed(refs)) if cls is not None]
+            return next((cls for cls in classes if is_module_class(cls)), classes[0] if classes else None)
+
+    def index_size(self) -> int:
+        """The number of entries of the name index, once the dead classes collected so far are dropped."""
+        with self._lock:
+            self._prune()
+            return sum(len(refs) for names in self._names.values() for refs in names.values())
+
+
+SUBCLASS_REGISTRY = SubclassRegistry()
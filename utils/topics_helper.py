@@ -1,17 +1,17 @@
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, List, Mapping, Optional, Type
 from question_generation.queryable.queryable_class import Queryable
 from utils.classes_helper import get_input_class, get_subtopic_class
 from utils.exceptions import handle_exceptions
 from utils.types_helper import GeneratedQuestionClassType
-from utils.user__code_helper import load_input_class, load_user_class
+from utils.static_analysis_helper import UserClass, describe_input_class, describe_user_class
 
 @handle_exceptions
-def list_keys(loaded_classes: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+def list_keys(loaded_classes: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
     """Return a nested dictionary of all folder and file names without class values."""
 
     def build_nested_dict(d: Dict[str, Any], key: Any, value: Any) -> None:
         """Helper function to build a nested dictionary, keeping only key names."""
-        if isinstance(value, dict):
+        if isinstance(value, Mapping):
             d[key] = {}
             for subkey, subvalue in value.items():
                 build_nested_dict(d[key], subkey, subvalue)
@@ -24,26 +24,30 @@ def list_keys(loaded_classes: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
     return nested_dict
 
 
+def get_queryable_names(cls: Type) -> List[str]:
+    """Return the names of the Queryable bases of a class."""
+    return [base.__name__ for base in cls.__bases__ if issubclass(base, Queryable)]
+
+def get_user_queryable_names(user_class: UserClass) -> List[str]:
+    """Return the names of the Queryable bases of a user class, without Queryable itself."""
+    return [cls.__name__ for cls in user_class.__bases__ if issubclass(cls, Queryable) and cls is not Queryable and cls is not user_class]
+
 @handle_exceptions
 def list_queryable(autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]], topic: str, subtopic: str) -> List[str]:
     cls = get_subtopic_class(autoloaded_classes, topic, subtopic)
-    queryable_classes = [base.__name__ for base in cls.__bases__ if issubclass(base, Queryable)]
-    return queryable_classes
+    return get_queryable_names(cls)
 
 @handle_exceptions
 def list_user_queryable(userAlgoCode: str, userEnvCode: Optional[List[str]] = None) -> List[str]:
-    user_class = load_user_class(userAlgoCode, userEnvCode=userEnvCode)
-    queryable_subclasses = [cls.__name__ for cls in user_class.__bases__ if issubclass(cls, Queryable) and cls is not Queryable and cls is not user_class]
-    return queryable_subclasses
+    user_class = describe_user_class(userAlgoCode, userEnvCode)
+    return get_user_queryable_names(user_class)
 
 @handle_exceptions
 def list_input_queryable(input_path: Dict[str, Any], input_classes: Dict[str, Dict[str, Type]]) -> List[str]:
     input_class = get_input_class(input_path, input_classes)
-    queryable_subclasses = [cls.__name__ for cls in input_class.__bases__ if issubclass(cls, Queryable)]
-    return queryable_subclasses
+    return get_queryable_names(input_class)
 
 @handle_exceptions
 def list_user_input_queryable(userEnvCode:str) -> List[str]:
-    user_class = load_input_class(userEnvCode)
-    queryable_subclasses = [cls.__name__ for cls in user_class.__bases__ if issubclass(cls, Queryable) and cls is not Queryable and cls is not user_class]
-    return queryable_subclasses
+    user_class = describe_input_class(userEnvCode)
+    return get_user_queryable_names(user_class)
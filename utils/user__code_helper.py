@@ -1,30 +1,79 @@
-from typing import Any, List, Optional
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from pydantic import BaseModel
+
+from config import Config
+from utils.lru_cache import LRUCache
+
+USER_MODULE_PREFIX = 'user_code_'
+# The request fields carrying user code, or referring to a stored algorithm.
+USER_CODE_FIELDS = ('userAlgoCode', 'userEnvCode', 'userQueryableCode', 'userAlgorithmId', 'user_env_code')
+
+
+@dataclass(frozen=True)
+class CompiledUserCode:
+    """User sources compiled once, to be executed in a fresh namespace per load."""
+    code: Tuple[Any, ...]
+
+
+def new_user_namespace() -> Dict[str, Any]:
+    """Return an exec namespace whose classes get a unique module name."""
+    return {'__name__': f"{USER_MODULE_PREFIX}{uuid4().hex}"}
+
+def runs_user_code(request: Union[BaseModel, Dict[str, Any]]) -> bool:
+    """Whether a request runs user code, of its own, of its context or of one of its subquestions."""
+    fields = request if isinstance(request, dict) else vars(request)
+    if any(fields.get(name) for name in USER_CODE_FIELDS):
+        return True
+    nested = [fields.get('context'), *(fields.get('sub_questions') or [])]
+    return any(runs_user_code(part) for part in nested if part is not None)
+
+def user_code_key(kind: str, *sources: Optional[str]) -> str:
+    """Hash the kind of load and its sources, length-prefixed so that no two source lists collide."""
+    digest = hashlib.sha256(kind.encode('utf-8'))
+    for source in sources:
+        encoded = b'' if source is None else source.encode('utf-8')
+        digest.update(b'N' if source is None else b'S' + len(encoded).to_bytes(8, 'big') + encoded)
+    return digest.hexdigest()
+
+# Only compilation is cached. Every load executes the code again and builds new classes,
+# so caches keyed by class, such as METADATA_CACHE, do not carry over from one load of
+# user code to the next.
+USER_CODE_CACHE = LRUCache(maxsize=Config.USER_CODE_CACHE_SIZE)
+
+def compile_user_code(sources: List[str]) -> CompiledUserCode:
+    """Compile the sources without executing them."""
+    return CompiledUserCode(tuple(compile(source, '<user_code>', 'exec') for source in sources))
+
+def execute_user_code(compiled: CompiledUserCode) -> Any:
+    """
+    Execute compiled user code in order in a fresh namespace and return the last class defined.
+
+    Only the code objects are shared: every load gets its own classes and module
+    globals, so no state set by one request is seen by another.
+    """
+    namespace = new_user_namespace()
+    for code_object in compiled.code:
+        exec(code_object, namespace)
+    user_classes = {k: v for k, v in namespace.items() if isinstance(v, type)}
+    if not user_classes:
+        raise ValueError("No valid class found in user-defined code")
+    return next(reversed(user_classes.values()))
 
 def load_user_class(userAlgoCode: str, userQueryableCode: Optional[str] = None, userEnvCode: Optional[List[str]] = None) -> Any:
-    namespace = {}
+    key = user_code_key('algo', userAlgoCode, userQueryableCode, *(userEnvCode or []))
+    sources = [*(userEnvCode or []), *([userQueryableCode] if userQueryableCode else []), userAlgoCode]
     try:
-        if userEnvCode:
-            for env_code in userEnvCode:
-                exec(env_code, namespace)
-        if userQueryableCode:
-            exec(userQueryableCode, namespace)
-        exec(userAlgoCode, namespace)
-
-        user_classes = {k: v for k, v in namespace.items() if isinstance(v, type)}
-        if not user_classes:
-            raise ValueError("No valid class found in user-defined code")
-        return next(reversed(user_classes.values()))
+        return execute_user_code(USER_CODE_CACHE.get_or_create(key, lambda: compile_user_code(sources)))
     except Exception as e:
         raise ValueError(f"Error loading user-defined class: {e}")
 
 def load_input_class(userEnvCode: str) -> Any:
-    namespace = {}
+    key = user_code_key('input', userEnvCode)
     try:
-        exec(userEnvCode, namespace)
-        input_classes = {k: v for k, v in namespace.items() if isinstance(v, type)}
-        if not input_classes:
-            raise ValueError("No valid class found in user-defined code")
-
-        return next(reversed(input_classes.values()))
+        return execute_user_code(USER_CODE_CACHE.get_or_create(key, lambda: compile_user_code([userEnvCode])))
     except Exception as e:
         raise ValueError(f"Error loading user-defined class: {e}")
@@ -0,0 +1,108 @@
+from typing import Any, Dict, List, Optional, Union
+
+from beanie import PydanticObjectId
+
+from models.execution_budget import ExecutionBudget
+from models.question_generation import GenerateInputRequest, GenerateQuestionRequest, GenerateVariableRequest
+from models.user import User
+from models.user_algorithm import UserAlgorithm
+from utils.budget_helper import BudgetExceededError, apply_budget, default_budget, merge_budgets
+from utils.metadata_helper import get_user_algo_metadata
+from utils.user__code_helper import load_user_class, user_code_key
+
+COMPILE_STATUS_COMPILED = 'compiled'
+COMPILE_STATUS_FAILED = 'failed'
+
+GenerationRequest = Union[GenerateQuestionRequest, GenerateVariableRequest, GenerateInputRequest]
+
+
+def compile_user_algorithm(algorithm: UserAlgorithm, budget: Optional[ExecutionBudget] = None) -> UserAlgorithm:
+    """
+    Compile the processor class code of an algorithm and store the result on it.
+
+    The code is compiled into the user code cache, so generating from the algorithm
+    in this worker afterwards does not compile it again. Loading runs the
+    module-level code of the algorithm, so it runs under a budget, and blocks:
+    routes call it in a worker thread.
+
+    Args:
+        algorithm (UserAlgorithm): The algorithm to compile.
+        budget (Optional[ExecutionBudget]): The budget of the compilation, by default the one of the algorithm.
+
+    Returns:
+        UserAlgorithm: The same algorithm with its hash, metadata and compile status set.
+    """
+    algorithm.code_hash = user_code_key('algo', algorithm.processor_class_code, None)
+    try:
+        with apply_budget(budget or merge_budgets(default_budget(), algorithm.execution_budget), process_limits=False):
+            load_user_class(algorithm.processor_class_code)
+            algorithm.metadata = get_user_algo_metadata(algorithm.processor_class_code)
+        algorithm.compile_status = COMPILE_STATUS_COMPILED
+        algorithm.compile_error = None
+    except (BudgetExceededError, Exception) as e:
+        algorithm.metadata = None
+        algorithm.compile_status = COMPILE_STATUS_FAILED
+        algorithm.compile_error = str(e)
+    return algorithm
+
+
+async def get_compiled_algorithm(algorithm_id: str) -> UserAlgorithm:
+    """Fetch a stored algorithm that compiled successfully."""
+    try:
+        algorithm = await UserAlgorithm.get(PydanticObjectId(algorithm_id))
+    except Exception:
+        algorithm = None
+    if algorithm is None:
+        raise ValueError(f"User algorithm '{algorithm_id}' not found")
+    if algorithm.compile_status == COMPILE_STATUS_FAILED:
+        raise ValueError(f"User algorithm '{algorithm_id}' does not compile: {algorithm.compile_error}")
+    return algorithm
+
+
+async def resolve_user_algorithms(request: GenerationRequest) -> Dict[str, UserAlgorithm]:
+    """Replace the userAlgorithmId of the request, or of its contexts, with the stored code and return the algorithms used."""
+    if isinstance(request, GenerateQuestionRequest):
+        contexts: List[Any] = [request.context, *(subquestion.context for subquestion in request.sub_questions or [])]
+    else:
+        contexts = [request]
+    algorithms: Dict[str, Any] = {}
+    for context in contexts:
+        if getattr(context, 'userAlgorithmId', None) and not context.userAlgoCode:
+            if context.userAlgorithmId not in algorithms:
+                algorithms[context.userAlgorithmId] = await get_compiled_algorithm(context.userAlgorithmId)
+            context.userAlgoCode = algorithms[context.userAlgorithmId].processor_class_code
+    return algorithms
+
+
+async def get_user(user_id: Optional[str]) -> Optional[User]:
+    if not user_id:
+        return None
+    try:
+        return await User.get(PydanticObjectId(user_id))
+    except Exception:
+        return None
+
+
+async def resolve_execution_budget(request: GenerationRequest, algorithms: Dict[str, UserAlgorithm]) -> ExecutionBudget:
+    """
+    Determine the budget a generation request runs under.
+
+    The default budget is lowered by the budget of the requesting user, or of
+    the owner of the stored algorithms when no user is given, and by the
+    budgets of the stored algorithms themselves. Each limit is the lowest one
+    set, so none of them can raise the configured defaults.
+
+    Args:
+        request (GenerationRequest): The request to generate.
+        algorithms (Dict[str, UserAlgorithm]): The stored algorithms the request uses.
+
+    Returns:
+        ExecutionBudget: The merged budget.
+    """
+    owner_id = request.userId or next((algorithm.user_id for algorithm in algorithms.values()), None)
+    user = await get_user(owner_id)
+    return merge_budgets(
+        default_budget(),
+        user.execution_budget if user else None,
+        *(algorithm.execution_budget for algorithm in algorithms.values()),
+    )
@@ -1,13 +1,20 @@
 import inspect
 import re
-from types import GenericAlias
-from typing import Any, Dict, List, Optional, Type
+from functools import lru_cache
+from types import GenericAlias, MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Type
 from question_generation.queryable.queryable_class import Queryable
 from utils.classes_helper import get_subtopic_class, traverse_path
 from utils.exceptions import handle_exceptions
+from utils.metadata_cache import cached_class_metadata
 from utils.types_helper import GeneratedQuestionClassType
-from utils.user__code_helper import load_input_class, load_user_class
+from utils.static_analysis_helper import StaticClassInfo, UserClass, describe_input_class, describe_user_class
+from utils.subclass_registry import SUBCLASS_REGISTRY
 
+GENERIC_TYPE_PATTERN = re.compile(r'([\w\.]+)\[([\w\., ]+)\]')
+SIMPLE_TYPE_PATTERN = re.compile(r"<class '([\w\.]+)'>")
+
+@cached_class_metadata
 def get_init_arguments(cls: Type) -> List[Dict[str, Any]]:
     """Get the initialization arguments for a given class."""
     exposed_args = getattr(cls, '_exposed_args', [])
@@ -26,6 +33,7 @@ def get_init_arguments(cls: Type) -> List[Dict[str, Any]]:
 
 def get_subclasses_info(cls: Type) -> List[Dict[str, Any]]:
     """Get the subclasses and their initialization arguments for a given class."""
+    SUBCLASS_REGISTRY.ensure_loaded(cls)
     subclasses = cls.__subclasses__()
     unique_subclasses = {}
     for subclass in subclasses:
@@ -37,27 +45,91 @@ def get_subclasses_info(cls: Type) -> List[Dict[str, Any]]:
     ]
     return subclasses_info
 
-def get_algo_variables(cls: GeneratedQuestionClassType) -> List[Dict[str, Any]]:
-    """Get variable annotations for algo methods."""
-    algo_signature = inspect.signature(cls().algo)
+def describe_algo_parameters(parameters: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+    """Describe (name, annotation) pairs of an algo method."""
     algo_variables = []
 
-    for param_name, param in algo_signature.parameters.items():
+    for param_name, annotation in parameters:
         if param_name != 'self':
-            var_info = {"name": param_name, "type": param.annotation}
+            var_info = {"name": param_name, "type": annotation}
 
-            actual_class = param.annotation.__origin__ if isinstance(param.annotation, GenericAlias) else param.annotation
+            actual_class = annotation.__origin__ if isinstance(annotation, GenericAlias) else annotation
 
             if inspect.isclass(actual_class):
                 var_info["arguments"] = get_init_arguments(actual_class)
-                var_info["subclasses"] = get_subclasses_info(actual_class)
+                var_info["class"] = actual_class
 
             algo_variables.append(var_info)
     return algo_variables
 
-def get_query_variables(cls: GeneratedQuestionClassType, queryable_type: str) -> List[Dict[str, Any]]:
-    """Get variable annotations for query methods."""
-    queryable_methods = cls().query_all()
+def attach_subclasses_info(algo_variables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add the subclasses of each class-typed algo variable."""
+    for var_info in algo_variables:
+        actual_class = var_info.pop("class", None)
+        if actual_class is not None:
+            # Subclasses are looked up on every call since user code can add new ones.
+            var_info["subclasses"] = get_subclasses_info(actual_class)
+    return algo_variables
+
+@cached_class_metadata
+def get_algo_signature(cls: GeneratedQuestionClassType) -> List[Dict[str, Any]]:
+    """Get the parameters of the algo method, read from the class without instantiating it."""
+    algo_signature = inspect.signature(cls.algo)
+    return describe_algo_parameters([(param_name, param.annotation) for param_name, param in algo_signature.parameters.items()])
+
+def get_algo_variables(cls: UserClass) -> List[Dict[str, Any]]:
+    """Get variable annotations for algo methods."""
+    if isinstance(cls, StaticClassInfo):
+        return attach_subclasses_info(describe_algo_parameters(cls.method_parameters('algo')))
+    return attach_subclasses_info(get_algo_signature(cls))
+
+def get_queryable_methods_from_bases(bases: Tuple[type, ...]) -> List[Tuple[type, Any, Any]]:
+    """Get the (queryable, query method, generate_input) triples of the given bases."""
+    return [
+        (base, getattr(base, 'query', None), getattr(base, 'generate_input', None))
+        for base in bases
+        if issubclass(base, Queryable)
+    ]
+
+@cached_class_metadata
+def get_queryable_methods(cls: GeneratedQuestionClassType) -> List[Tuple[type, Any, Any]]:
+    """Get the (queryable, query method, generate_input) triples of a class without instantiating it."""
+    return get_queryable_methods_from_bases(cls.__bases__)
+
+class QueryDispatch(NamedTuple):
+    """How to answer the queries of one Queryable base of an algo class."""
+    queryable: type
+    query: Optional[Callable[..., Any]]
+    generate_input: Optional[Callable[..., Any]]
+    state_fields: Tuple[str, ...]
+
+def get_state_fields(queryable: type) -> Tuple[str, ...]:
+    """Get the state fields a Queryable declares, or those its __init__ sets when it declares none."""
+    # Only the class's own declaration counts: a subclass of a built-in queryable may add fields.
+    declared = queryable.__dict__.get('state_fields')
+    if declared is not None:
+        return tuple(declared)
+    return tuple(name for name in vars(queryable()) if name != 'variable')
+
+@cached_class_metadata
+def get_query_dispatch(cls: GeneratedQuestionClassType) -> Mapping[str, QueryDispatch]:
+    """Get the Queryable bases of a class by name, with their query method, generate_input and state fields."""
+    dispatch: Dict[str, QueryDispatch] = {}
+    for base, query_method, generate_input in get_queryable_methods_from_bases(cls.__bases__):
+        if base.__name__ not in dispatch:
+            dispatch[base.__name__] = QueryDispatch(base, query_method, generate_input, get_state_fields(base))
+    return MappingProxyType(dispatch)
+
+def load_queryable_state(dispatch: QueryDispatch, instance: Any) -> Any:
+    """Create the Queryable of `dispatch` holding the state a run of algo left on `instance`."""
+    queryable = dispatch.queryable()
+    for name in dispatch.state_fields:
+        if hasattr(instance, name):
+            setattr(queryable, name, getattr(instance, name))
+    return queryable
+
+def describe_query_variables(queryable_methods: List[Tuple[type, Any, Any]], queryable_type: str) -> List[Dict[str, Any]]:
+    """Describe the parameters of the query method of the named queryable."""
     query_variables = []
     for base, query_method, _ in queryable_methods:
         if base.__name__ == queryable_type and issubclass(base, Queryable):
@@ -70,28 +142,46 @@ def get_query_variables(cls: GeneratedQuestionClassType, queryable_type: str) ->
 
     return query_variables
 
+@cached_class_metadata
+def get_query_variables(cls: GeneratedQuestionClassType, queryable_type: str) -> List[Dict[str, Any]]:
+    """Get variable annotations for query methods."""
+    return describe_query_variables(get_queryable_methods(cls), queryable_type)
+
+def get_user_query_variables(cls: UserClass, queryable_type: str) -> List[Dict[str, Any]]:
+    """Get query variable annotations for a user class or its static description."""
+    if isinstance(cls, StaticClassInfo):
+        return describe_query_variables(get_queryable_methods_from_bases(cls.__bases__), queryable_type)
+    return get_query_variables(cls, queryable_type)
+
+def get_user_init_arguments(cls: UserClass) -> List[Dict[str, Any]]:
+    """Get the initialization arguments of a user class or its static description."""
+    if isinstance(cls, StaticClassInfo):
+        return [
+            {"name": param_name, "type": format_type(str(annotation))}
+            for param_name, annotation in cls.init_parameters()
+            if annotation != inspect._empty
+        ]
+    return get_init_arguments(cls)
+
+@lru_cache(maxsize=1024)
 def format_type(type_str: str) -> str:
     """Format the type string to a more readable format."""
     # Handle generic types
-    generic_type_pattern = re.compile(r'([\w\.]+)\[([\w\., ]+)\]')
-    match = generic_type_pattern.match(type_str)
+    match = GENERIC_TYPE_PATTERN.match(type_str)
     if match:
         base_type = match.group(1).split('.')[-1]
         arg_types = ', '.join([arg.split('.')[-1] for arg in match.group(2).split(', ')])
         return f'{base_type}[{arg_types}]'
 
     # Handle simple types
-    simple_type_pattern = re.compile(r"<class '([\w\.]+)'>")
-    match = simple_type_pattern.match(type_str)
+    match = SIMPLE_TYPE_PATTERN.match(type_str)
     if match:
         return match.group(1).split('.')[-1]
 
     return type_str
 
-@handle_exceptions
-def list_algo_variable(autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]], topic: str, subtopic: str) -> List[Dict[str, Any]]:
-    cls = get_subtopic_class(autoloaded_classes, topic, subtopic)
-    algo_variables = get_algo_variables(cls)
+def format_algo_variables(algo_variables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Format algo variables, their subclasses and arguments for the frontend."""
     algo_variables_list = [
       {
         "name": var["name"],
@@ -121,136 +211,81 @@ def list_algo_variable(autoloaded_classes: Dict[str, Dict[str, GeneratedQuestion
     ]
     return algo_variables_list
 
-@handle_exceptions
-def list_user_algo_variables(userAlgoCode: str, userEnvCode: Optional[List[str]] = None) -> List[Dict[str, Any]]:
-    user_class = load_user_class(userAlgoCode, userEnvCode=userEnvCode)
-    algo_variables = get_algo_variables(user_class)
-    algo_variables_list = [
+def format_query_variables(query_variables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Format query variables for the frontend."""
+    return [
       {
         "name": var["name"],
         "type": format_type(str(var["type"])),
-        "subclasses": [
-            {
-                "name": subclass["name"],
-                "arguments": [
-                    {
-                        "name": arg["name"],
-                        "type": format_type(str(arg["type"]))
-                    }
-                    for arg in subclass["arguments"]
-                ]
-            }
-            for subclass in var.get("subclasses", [])
-        ],
+        "subclasses": [],
+        "arguments": []
+      }
+      for var in query_variables
+    ]
+
+def format_input_variable(cls: UserClass, init_arguments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Format an input class and its initialization arguments for the frontend."""
+    base_type = cls.__bases__[0].__name__ if cls.__bases__ else "Unknown"
+    return {
+        "name": cls.__name__,
+        "type": base_type,
+        "subclasses": [],
         "arguments": [
             {
                 "name": arg["name"],
                 "type": format_type(str(arg["type"]))
             }
-            for arg in var.get("arguments", [])
+            for arg in init_arguments
         ]
-      }
-      for var in algo_variables
-    ]
-    return algo_variables_list
+    }
+
+@handle_exceptions
+def list_algo_variable(autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]], topic: str, subtopic: str) -> List[Dict[str, Any]]:
+    cls = get_subtopic_class(autoloaded_classes, topic, subtopic)
+    algo_variables = get_algo_variables(cls)
+    return format_algo_variables(algo_variables)
+
+@handle_exceptions
+def list_user_algo_variables(userAlgoCode: str, userEnvCode: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    user_class = describe_user_class(userAlgoCode, userEnvCode)
+    algo_variables = get_algo_variables(user_class)
+    return format_algo_variables(algo_variables)
 
 @handle_exceptions
 def list_user_input_variables(userEnvCode: str) -> List[Dict[str, Any]]:
-    cls = load_input_class(userEnvCode)
+    cls = describe_input_class(userEnvCode)
     if cls:
-        base_type = cls.__bases__[0].__name__ if cls.__bases__ else "Unknown"
-        variable =  {
-            "name": cls.__name__,
-            "type": base_type,
-            "subclasses": [],
-            "arguments": [
-                {
-                    "name": arg["name"],
-                    "type": format_type(str(arg["type"]))
-                }
-                for arg in get_init_arguments(cls)
-            ]
-        }
-        return [variable]
+        return [format_input_variable(cls, get_user_init_arguments(cls))]
 
 @handle_exceptions
 def list_input_variable(input_path: Dict[str, Any], input_classes: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
     for key, subpath in input_path.items():
         cls = traverse_path({key: subpath}, input_classes)
         if cls:
-            base_type = cls.__bases__[0].__name__ if cls.__bases__ else "Unknown"
-            variable =  {
-                "name": cls.__name__,
-                "type": base_type,
-                "subclasses": [],
-                "arguments": [
-                    {
-                        "name": arg["name"],
-                        "type": format_type(str(arg["type"]))
-                    }
-                    for arg in get_init_arguments(cls)
-                ]
-            }
-            return [variable]
+            return [format_input_variable(cls, get_init_arguments(cls))]
 
 @handle_exceptions
 def list_queryable_variable(autoloaded_classes: Dict[str, Dict[str, GeneratedQuestionClassType]], topic: str, subtopic: str, queryable_type: str) -> List[Dict[str, Any]]:
     cls = get_subtopic_class(autoloaded_classes, topic, subtopic)
     query_variables = get_query_variables(cls, queryable_type)
-    query_variables_list = [
-      {
-        "name": var["name"],
-        "type": format_type(str(var["type"])),
-        "subclasses": [],
-        "arguments": []
-      }
-      for var in query_variables
-    ]
-    return query_variables_list
+    return format_query_variables(query_variables)
 
 @handle_exceptions
 def list_user_queryable_variable(queryable_type: str, userAlgoCode: str, userEnvCode: Optional[List[str]] = None) -> List[Dict[str, Any]]:
-    user_class = load_user_class(userAlgoCode, userEnvCode=userEnvCode)
-    query_variables = get_query_variables(user_class, queryable_type)
-    query_variables_list = [
-      {
-        "name": var["name"],
-        "type": format_type(str(var["type"])),
-        "subclasses": [],
-        "arguments": []
-      }
-      for var in query_variables
-    ]
-    return query_variables_list
+    user_class = describe_user_class(userAlgoCode, userEnvCode)
+    query_variables = get_user_query_variables(user_class, queryable_type)
+    return format_query_variables(query_variables)
 
 @handle_exceptions
 def list_input_queryable_variable(input_path: Dict[str, Any], queryable: str, input_classes: Dict[str, Dict[str, Type]]) -> List[Dict[str, Any]]:
     for key, subpath in input_path.items():
         cls = traverse_path({key: subpath}, input_classes)
         query_variables = get_query_variables(cls, queryable)
-        query_variables_list = [
-          {
-            "name": var["name"],
-            "type": format_type(str(var["type"])),
-            "subclasses": [],
-            "arguments": []
-          }
-          for var in query_variables
-        ]
-        return query_variables_list
+        return format_query_variables(query_variables)
     return []
 
 @handle_exceptions
 def list_user_input_queryable_variable(queryable: str, userEnvCode: str) -> List[Dict[str, Any]]:
-    cls = load_input_class(userEnvCode)
-    query_variables = get_query_variables(cls, queryable)
-    query_variables_list = [
-        {
-        "name": var["name"],
-        "type": format_type(str(var["type"])),
-        "subclasses": [],
-        "arguments": []
-        }
-        for var in query_variables
-    ]
-    return query_variables_list
+    cls = describe_input_class(userEnvCode)
+    query_variables = get_user_query_variables(cls, queryable)
+    return format_query_variables(query_variables)
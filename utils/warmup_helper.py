@@ -0,0 +1,82 @@
+import time
+from typing import Any, Callable, Dict, Iterator, Mapping, Type
+
+from utils.faker_factory import get_faker
+from utils.registry_helper import ClassRegistry
+from utils.topics_helper import get_queryable_names
+from utils.variable_helper import get_algo_variables, get_init_arguments, get_query_variables
+
+
+def iter_classes(classes: Mapping[str, Any]) -> Iterator[Type]:
+    """Yield every class of a nested class mapping, importing lazy entries."""
+    for value in classes.values():
+        if isinstance(value, Mapping):
+            yield from iter_classes(value)
+        else:
+            yield value
+
+
+def prime_metadata(registry: ClassRegistry) -> None:
+    """Import every registered class and fill the introspection caches."""
+    for cls in iter_classes(registry.algo_classes):
+        get_algo_variables(cls)
+        for queryable in get_queryable_names(cls):
+            get_query_variables(cls, queryable)
+    for cls in iter_classes(registry.input_classes):
+        get_init_arguments(cls)
+        for queryable in get_queryable_names(cls):
+            get_query_variables(cls, queryable)
+
+
+def load_faker() -> None:
+    """Build the shared Faker and load the providers used by the primitive inputs."""
+    fake = get_faker()
+    fake.random_int()
+    fake.text(max_nb_chars=10)
+    fake.boolean()
+
+
+def render_graph() -> None:
+    """Render a small graph so the first request does not pay for spawning dot."""
+    from question_generation.input.input_subclasses.custom.graph.adjacency_list import AdjacencyListInput
+
+    AdjacencyListInput(num_nodes=3, num_edges=2).to_graph()
+
+
+def render_table() -> None:
+    """Render a small table so the first request does not pay for starting kaleido."""
+    from question_generation.input.input_subclasses.custom.decision_tree.tabular_data import TabularDataInput
+
+    TabularDataInput(
+        columns=['a', 'b'],
+        values={'a': ['x', 'y'], 'b': ['yes', 'no']},
+        probs={'a': [0.5, 0.5], 'b': [0.5, 0.5]},
+        num_samples=2,
+    ).to_table()
+
+
+def warm_up(registry: ClassRegistry) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every warm-up step and report how long each took.
+
+    A failing step is reported and does not stop the others, so a missing
+    renderer only costs its own warm-up.
+    """
+    steps: Dict[str, Callable[[], None]] = {
+        'metadata': lambda: prime_metadata(registry),
+        'faker': load_faker,
+        'graph': render_graph,
+        'table': render_table,
+    }
+    report = {}
+    for name, step in steps.items():
+        start = time.perf_counter()
+        try:
+            step()
+            report[name] = {'ok': True}
+        except Exception as e:
+            error = str(e).strip()
+            print(f"Error warming up {name}: {error}")
+            report[name] = {'ok': False, 'error': error}
+        report[name]['seconds'] = round(time.perf_counter() - start, 4)
+    return report
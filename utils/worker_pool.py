@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from config import Config
+from utils.job_runner import prepare_interpreter
+from utils.registry_helper import ClassRegistry
+
+WORKER_POOL_KINDS = ('thread', 'process')
+
+
+class WorkerPool:
+    """
+    An executor the async routes hand their CPU-bound work to.
+
+    Process pools run the work on all cores and keep the event loop responsive
+    however heavy a generation is. Their workers are spawned rather than forked
+    from the running server, and build their own class registry once, in the
+    initializer. Thread pools suit work that releases the GIL, such as graphviz
+    rendering, and share the registry of the API.
+
+    A worker process that dies, killed by a hard limit or crashing, breaks the
+    whole executor: the jobs it was running fail and a new executor replaces
+    it for the jobs that follow.
+    """
+
+    def __init__(self, kind: str = Config.WORKER_POOL, size: int = Config.WORKER_POOL_SIZE):
+        if kind not in WORKER_POOL_KINDS:
+            raise ValueError(f"Unknown worker pool '{kind}', expected one of {WORKER_POOL_KINDS}")
+        self.kind = kind
+        self.size = size
+        self.executor = self._create_executor()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+        self._lock = threading.Lock()
+
+    @property
+    def separate_processes(self) -> bool:
+        return self.kind == 'process'
+
+    def _create_executor(self) -> Executor:
+        if self.separate_processes:
+            return ProcessPoolExecutor(max_workers=self.size, mp_context=multiprocessing.get_context('spawn'), initializer=prepare_interpreter)
+        return ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='worker-pool')
+
+    def _replace_executor(self, broken: Executor) -> None:
+        """Replace a broken executor, unless a job that failed with it already did."""
+        with self._lock:
+            if self.executor is not broken:
+                return
+            self.executor = self._create_executor()
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _done(self, executor: Executor, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._replace_executor(executor)
+
+    def submit(self, func: Callable[..., Any], registry: Optional[ClassRegistry], *args: Any) -> Future:
+        """
+        Run `func(registry, *args)` in the pool.
+
+        Process workers cannot receive the registry of the API and get None
+        instead, for `func` to use the registry their process built.
+        """
+        with self._lock:
+            self.pending += 1
+        executor = self.executor
+        try:
+            try:
+                future = executor.submit(func, None if self.separate_processes else registry, *args)
+            except BrokenProcessPool:
+                self._replace_executor(executor)
+                executor = self.executor
+                future = executor.submit(func, None if self.separate_processes else registry, *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(partial(self._done, executor))
+        return future
+
+    async def call(self, func: Callable[..., Any], registry: Optional[ClassRegistry], *args: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(func, registry, *args))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'kind': self.kind,
+                'size': self.size,
+                'pending': self.pending,
+                'queued': max(0, self.pending - self.size),
+                'completed': self.completed,
+                'failed': self.failed,
+                'restarts': self.restarts,
+            }
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)